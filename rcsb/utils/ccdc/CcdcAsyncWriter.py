@@ -0,0 +1,117 @@
+##
+# File:    CcdcAsyncWriter.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Bounded background writer overlapping search output I/O with the next search.
+
+Write operations (functions with their arguments) are queued and executed in order by a single
+background thread.  The queue is bounded, so a producer that gets ahead of the file system blocks
+until the writer catches up (backpressure) and the memory held by pending output stays bounded.
+flush() waits until all queued operations are complete, and close() flushes and stops the thread.
+Queued operations are flushed when the interpreter exits, and failing operations are logged and
+counted without stopping the writer.
+
+This module does not depend on the ccdc API.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import atexit
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CcdcAsyncWriter(object):
+    """Bounded background writer executing queued write operations in order."""
+
+    def __init__(self, maxQueueSize=64, verbose=True):
+        """Bounded background writer.
+
+        Args:
+            maxQueueSize (int, optional): maximum number of pending write operations. Defaults to 64.
+            verbose (bool, optional): verbose logging. Defaults to True.
+        """
+        self.__verbose = verbose
+        self.__queue = queue.Queue(maxsize=max(1, int(maxQueueSize)))
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__numOps = 0
+        self.__numErrors = 0
+        self.__blockedSeconds = 0.0
+        self.__writeSeconds = 0.0
+
+    def submit(self, func, *args, **kwargs):
+        """Queue a write operation func(*args, **kwargs), waiting while the queue is full."""
+        with self.__lock:
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, name="CcdcAsyncWriter", daemon=True)
+                self.__thread.start()
+                atexit.register(self.close)
+        startTime = time.time()
+        self.__queue.put((func, args, kwargs))
+        self.__blockedSeconds += time.time() - startTime
+
+    def flush(self):
+        """Wait until all queued write operations are complete."""
+        if self.__thread is not None:
+            self.__queue.join()
+
+    def close(self):
+        """Flush the queued write operations and stop the writer thread."""
+        with self.__lock:
+            thread = self.__thread
+            self.__thread = None
+        if thread is None:
+            return
+        atexit.unregister(self.close)
+        self.__queue.put(None)
+        self.__queue.join()
+        thread.join()
+        if self.__numErrors:
+            logger.error("Background writer completed %d operations with %d failures", self.__numOps, self.__numErrors)
+        elif self.__verbose:
+            logger.info("Background writer completed %d operations in %.3f seconds (producer blocked %.3f seconds)", self.__numOps, self.__writeSeconds, self.__blockedSeconds)
+
+    def getStatistics(self):
+        """Return the writer statistics.
+
+        Returns:
+            (dict): {"num_ops", "num_errors", "pending", "write_seconds", "blocked_seconds"}
+        """
+        return {
+            "num_ops": self.__numOps,
+            "num_errors": self.__numErrors,
+            "pending": self.__queue.qsize(),
+            "write_seconds": round(self.__writeSeconds, 4),
+            "blocked_seconds": round(self.__blockedSeconds, 4),
+        }
+
+    def __run(self):
+        while True:
+            item = self.__queue.get()
+            try:
+                if item is None:
+                    return
+                func, args, kwargs = item
+                startTime = time.time()
+                try:
+                    func(*args, **kwargs)
+                except Exception as e:
+                    self.__numErrors += 1
+                    logger.exception("Background write failing with %s", str(e))
+                self.__numOps += 1
+                self.__writeSeconds += time.time() - startTime
+            finally:
+                self.__queue.task_done()
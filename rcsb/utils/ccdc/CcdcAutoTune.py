@@ -0,0 +1,274 @@
+##
+# File:    CcdcAutoTune.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Calibration of the number of processes and the chunk size of a multiprocess search.
+
+A short calibration runs samples of the input (spread across the input) at increasing numbers of processes (1, 2, 4, ... up to the number of CPUs).  At each level the
+throughput (queries per second), the per-query latency, the per-chunk startup overhead, the peak
+resident memory of a worker and the fraction of CPU time in I/O wait are measured.  Escalation
+stops when the throughput gain falls below a minimum, when I/O wait shows the CSD files are
+thrashing, or when the projected memory of the next level exceeds the memory budget.  The fewest
+processes within the minimum gain of the best throughput are chosen, and the chunk size is set so
+the startup cost of a chunk is a small fraction of its time while leaving several chunks per
+process to balance the load.
+
+The sampled queries are real work: they are not searched again in the rest of the run.
+
+This module does not depend on the ccdc API.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import math
+import os
+import time
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+def _getCpuTimes():
+    """Return the (iowait, total) CPU times of the host or None where I/O wait is not reported."""
+    try:
+        if psutil is not None:
+            cT = psutil.cpu_times()
+            return (cT.iowait, sum(cT)) if hasattr(cT, "iowait") else None
+        with open("/proc/stat") as ifh:
+            fL = [float(tS) for tS in ifh.readline().split()[1:]]
+        return fL[4], sum(fL)
+    except Exception:
+        pass
+    return None
+
+
+def _getTotalMemoryMb():
+    """Return the physical memory of the host (MB) or None."""
+    try:
+        if psutil is not None:
+            return psutil.virtual_memory().total / 1048576.0
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1048576.0
+    except Exception:
+        pass
+    return None
+
+
+class CcdcAutoTune(object):
+    def __init__(
+        self,
+        trialFunc,
+        levelList=None,
+        maxProc=None,
+        queriesPerProc=2,
+        maxSampleFraction=0.2,
+        minGain=0.15,
+        maxIoWait=0.3,
+        memoryFraction=0.8,
+        overheadFraction=0.1,
+        chunksPerProc=4,
+        verbose=True,
+    ):
+        """Calibrate the number of processes and the chunk size of a multiprocess search.
+
+        The trial function runs a list of queries with a number of processes, each process taking
+        a single chunk of queriesPerProc queries, and returns a dictionary of measurements with
+        the optional keys: num_completed (queries completed), query_seconds (sum of the query times),
+        chunk_seconds (sum of the chunk times including startup), num_chunks and max_rss_mb (peak
+        resident memory of a worker).
+
+        Args:
+            trialFunc (func): trialFunc(queryList, numProc, chunkSize) -> dict of measurements
+            levelList (list, optional): numbers of processes to calibrate. Defaults to None (1, 2, 4, ... maxProc).
+            maxProc (int, optional): maximum number of processes. Defaults to None (number of CPUs).
+            queriesPerProc (int, optional): queries run by each process at a calibration level. Defaults to 2.
+            maxSampleFraction (float, optional): maximum fraction of the input used in calibration. Defaults to 0.2.
+            minGain (float, optional): minimum relative throughput gain to escalate the number of processes. Defaults to 0.15.
+            maxIoWait (float, optional): maximum fraction of CPU time in I/O wait for an acceptable level. Defaults to 0.3.
+            memoryFraction (float, optional): fraction of the physical memory available to the workers. Defaults to 0.8.
+            overheadFraction (float, optional): target fraction of the chunk time spent in startup. Defaults to 0.1.
+            chunksPerProc (int, optional): minimum number of chunks per process for load balance. Defaults to 4.
+            verbose (bool, optional): verbose logging. Defaults to True.
+        """
+        self.__trialFunc = trialFunc
+        self.__maxProc = maxProc if maxProc else os.cpu_count() or 1
+        self.__levelList = sorted(set(levelList)) if levelList else self.__getLevels(self.__maxProc)
+        self.__queriesPerProc = queriesPerProc
+        self.__maxSampleFraction = maxSampleFraction
+        self.__minGain = minGain
+        self.__maxIoWait = maxIoWait
+        self.__memoryFraction = memoryFraction
+        self.__overheadFraction = overheadFraction
+        self.__chunksPerProc = chunksPerProc
+        self.__verbose = verbose
+
+    def __getLevels(self, maxProc):
+        levelL = []
+        numProc = 1
+        while numProc < maxProc:
+            levelL.append(numProc)
+            numProc *= 2
+        return levelL + [maxProc]
+
+    def calibrate(self, dataList):
+        """Run the calibration on a sample of the input and choose the number of processes and the chunk size.
+
+        Args:
+            dataList (list): input query list
+
+        Returns:
+            (int, int, list, dict): number of processes, chunk size, input queries not run in calibration and
+                                    the calibration record {"num_proc", "chunk_size", "reason", "levels": [...], ...}
+        """
+        startTime = time.time()
+        memoryMb = _getTotalMemoryMb()
+        maxSample = int(len(dataList) * self.__maxSampleFraction)
+        needL = []
+        for numProc in self.__levelList:
+            if sum(needL) + numProc * self.__queriesPerProc > maxSample:
+                break
+            needL.append(numProc * self.__queriesPerProc)
+        tuneD = {"num_input": len(dataList), "levels": [], "total_memory_mb": round(memoryMb, 1) if memoryMb else None}
+        if not needL:
+            numProc = max(1, min(self.__maxProc, len(dataList)))
+            tuneD.update({"num_proc": numProc, "chunk_size": max(1, int(math.ceil(len(dataList) / (numProc * self.__chunksPerProc)))), "reason": "input too small to calibrate"})
+            tuneD["num_sampled"] = 0
+            logger.info("Auto tune skipped (%d queries) using %d processes chunk size %d", len(dataList), tuneD["num_proc"], tuneD["chunk_size"])
+            return tuneD["num_proc"], tuneD["chunk_size"], list(dataList), tuneD
+        #
+        # visit the input in golden ratio steps so each level samples a representative mix of queries
+        step = self.__getStep(len(dataList))
+        sampleIdxL = [(ii * step) % len(dataList) for ii in range(sum(needL))]
+        #
+        reason = "largest calibrated level"
+        procLimit = self.__maxProc
+        offset = 0
+        bestRate = 0.0
+        for numProc, numSample in zip(self.__levelList, needL):
+            if numProc > procLimit:
+                reason = "memory limit of %d processes" % procLimit
+                break
+            levelD = self.__runLevel([dataList[ii] for ii in sampleIdxL[offset : offset + numSample]], numProc)
+            offset += numSample
+            tuneD["levels"].append(levelD)
+            if memoryMb and levelD["max_rss_mb"]:
+                procLimit = min(procLimit, max(1, int(memoryMb * self.__memoryFraction / levelD["max_rss_mb"])))
+            if levelD["io_wait"] is not None and levelD["io_wait"] > self.__maxIoWait:
+                levelD["rejected"] = "io wait %.3f > %.3f" % (levelD["io_wait"], self.__maxIoWait)
+                reason = "io wait at %d processes" % numProc
+                break
+            if numProc > procLimit:
+                levelD["rejected"] = "memory %.1f MB per process" % levelD["max_rss_mb"]
+                reason = "memory limit of %d processes" % procLimit
+                break
+            if bestRate and levelD["queries_per_second"] < bestRate * (1.0 + self.__minGain):
+                reason = "throughput gain below %.2f at %d processes" % (self.__minGain, numProc)
+                break
+            bestRate = max(bestRate, levelD["queries_per_second"])
+        sampleIdxS = set(sampleIdxL[:offset])
+        remainL = [tV for ii, tV in enumerate(dataList) if ii not in sampleIdxS]
+        #
+        acceptL = [levelD for levelD in tuneD["levels"] if "rejected" not in levelD and levelD["num_completed"]]
+        if not acceptL:
+            numProc = 1
+            latency = None
+            overhead = None
+            reason = "no acceptable calibration level"
+        else:
+            bestRate = max(levelD["queries_per_second"] for levelD in acceptL)
+            chosenD = [levelD for levelD in acceptL if levelD["queries_per_second"] * (1.0 + self.__minGain) >= bestRate][0]
+            numProc = min(chosenD["num_proc"], procLimit)
+            latency = chosenD["query_latency_seconds"]
+            overhead = chosenD["chunk_overhead_seconds"]
+        numProc = max(1, min(numProc, len(remainL)))
+        chunkSize = self.__getChunkSize(len(remainL), numProc, latency, overhead)
+        tuneD.update(
+            {
+                "num_proc": numProc,
+                "chunk_size": chunkSize,
+                "reason": reason,
+                "memory_proc_limit": procLimit,
+                "num_sampled": offset,
+                "calibration_seconds": round(time.time() - startTime, 3),
+            }
+        )
+        logger.info(
+            "Auto tune chose %d processes chunk size %d (%s) from %d levels on %d sampled queries in %.2f seconds",
+            numProc,
+            chunkSize,
+            reason,
+            len(tuneD["levels"]),
+            offset,
+            tuneD["calibration_seconds"],
+        )
+        return numProc, chunkSize, remainL, tuneD
+
+    def __getStep(self, numItems):
+        """Return the step nearest the golden ratio fraction of numItems that is coprime with numItems."""
+        step = max(1, int(numItems * 0.618))
+        while math.gcd(step, numItems) != 1:
+            step += 1
+        return step
+
+    def __runLevel(self, queryList, numProc):
+        cpuStart = _getCpuTimes()
+        startTime = time.time()
+        try:
+            rD = self.__trialFunc(queryList, numProc, self.__queriesPerProc) or {}
+        except Exception as e:
+            logger.exception("Calibration at %d processes failing with %s", numProc, str(e))
+            rD = {"num_completed": 0}
+        elapsed = time.time() - startTime
+        cpuEnd = _getCpuTimes()
+        ioWait = None
+        if cpuStart and cpuEnd and cpuEnd[1] > cpuStart[1]:
+            ioWait = round((cpuEnd[0] - cpuStart[0]) / (cpuEnd[1] - cpuStart[1]), 4)
+        numCompleted = rD.get("num_completed", len(queryList))
+        querySeconds = rD.get("query_seconds")
+        latency = querySeconds / numCompleted if querySeconds is not None and numCompleted else (elapsed * numProc / numCompleted if numCompleted else None)
+        overhead = None
+        if querySeconds is not None and rD.get("chunk_seconds") is not None and rD.get("num_chunks"):
+            overhead = max(0.0, (rD["chunk_seconds"] - querySeconds) / rD["num_chunks"])
+        levelD = {
+            "num_proc": numProc,
+            "num_queries": len(queryList),
+            "num_completed": numCompleted,
+            "seconds": round(elapsed, 4),
+            "queries_per_second": round(numCompleted / elapsed, 4) if elapsed > 0 else 0.0,
+            "query_latency_seconds": round(latency, 4) if latency is not None else None,
+            "chunk_overhead_seconds": round(overhead, 4) if overhead is not None else None,
+            "max_rss_mb": round(rD["max_rss_mb"], 1) if rD.get("max_rss_mb") else None,
+            "io_wait": ioWait,
+        }
+        if self.__verbose:
+            logger.info(
+                "Calibration %d processes %d queries %.3f queries per second latency %r seconds overhead %r seconds rss %r MB io wait %r",
+                numProc,
+                numCompleted,
+                levelD["queries_per_second"],
+                levelD["query_latency_seconds"],
+                levelD["chunk_overhead_seconds"],
+                levelD["max_rss_mb"],
+                ioWait,
+            )
+        return levelD
+
+    def __getChunkSize(self, numQueries, numProc, latency, overhead):
+        """Return the smallest chunk keeping the startup overhead under the target fraction, bounded for load balance."""
+        balanceSize = max(1, int(math.ceil(numQueries / float(numProc * self.__chunksPerProc))))
+        if not latency or overhead is None:
+            return balanceSize
+        overheadSize = int(math.ceil(overhead * (1.0 - self.__overheadFraction) / (self.__overheadFraction * latency)))
+        return max(1, min(overheadSize, balanceSize))
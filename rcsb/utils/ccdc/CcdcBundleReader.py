@@ -0,0 +1,162 @@
+##
+# File:    CcdcBundleReader.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Lazy reader for multi-molecule query bundles (SDF or mol2 files holding many query molecules).
+
+Each record in a bundle is a separate query with its identifier taken from the record title
+(the first line of an SDF record or the line following @<TRIPOS>MOLECULE in mol2).  A single
+sequential scan locates the byte offset of each record, and the bundle is then divided into
+byte ranges on record boundaries.  A range is read by seeking to its start and streaming its
+records, so workers can be given byte ranges of one bundle in place of lists of query files.
+
+Records without a title (or with a placeholder title such as *****) are named
+<bundle name>_<record number>, and repeated titles are made unique with the suffix _<n>.
+
+This module does not depend on the ccdc API.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+
+class CcdcBundleReader(object):
+    """Lazy reader for multi-molecule SDF or mol2 query bundles."""
+
+    formatD = {".sdf": "sdf", ".sd": "sdf", ".mol": "sdf", ".mol2": "mol2"}
+
+    def __init__(self, bundlePath, fmt=None):
+        """Lazy reader for multi-molecule query bundles.
+
+        Args:
+            bundlePath (str): path to the SDF or mol2 bundle
+            fmt (str, optional): bundle format (sdf|mol2). Defaults to None (from the file extension).
+        """
+        self.__bundlePath = bundlePath
+        self.__fmt = fmt if fmt else self.formatD.get(os.path.splitext(bundlePath)[1].lower())
+        if self.__fmt not in ["sdf", "mol2"]:
+            raise ValueError("Unsupported bundle format %r for %s (sdf|mol2)" % (self.__fmt, bundlePath))
+        self.__bundleName = re.sub(r"[^A-Za-z0-9_.-]", "_", os.path.splitext(os.path.basename(bundlePath))[0])
+        self.__recordL = None
+
+    def getFormat(self):
+        return self.__fmt
+
+    def getPath(self):
+        return self.__bundlePath
+
+    def getRecords(self):
+        """Return the identifier and byte range of each record in the bundle (scanned once).
+
+        Returns:
+            (list): [{"query_id", "record_number", "start", "end"}, ...]
+        """
+        if self.__recordL is None:
+            self.__recordL = self.__scan()
+        return self.__recordL
+
+    def getRanges(self, recordsPerRange=10, startRecord=None, endRecord=None):
+        """Divide the bundle (or the records startRecord-endRecord, 1-based inclusive) into byte ranges on record boundaries.
+
+        Args:
+            recordsPerRange (int, optional): number of records in each range. Defaults to 10.
+            startRecord (int, optional): first record (1-based). Defaults to None (first record).
+            endRecord (int, optional): last record (1-based, inclusive). Defaults to None (last record).
+
+        Returns:
+            (list): [{"start", "end", "query_ids"}, ...]
+        """
+        recL = self.getRecords()[int(startRecord) - 1 if startRecord else 0 : int(endRecord) if endRecord else None]
+        nR = max(1, int(recordsPerRange))
+        rangeL = []
+        for ii in range(0, len(recL), nR):
+            rL = recL[ii : ii + nR]
+            rangeL.append({"start": rL[0]["start"], "end": rL[-1]["end"], "query_ids": [rD["query_id"] for rD in rL]})
+        return rangeL
+
+    def iterRecords(self, start=0, end=None, queryIdList=None):
+        """Stream the records in the byte range start-end (start on a record boundary as from getRecords() or getRanges()).
+
+        Args:
+            start (int, optional): range start offset. Defaults to 0.
+            end (int, optional): range end offset. Defaults to None (end of file).
+            queryIdList (list, optional): identifiers of the records in the range (as from getRanges()). Defaults to None (from the record titles).
+
+        Yields:
+            (tuple): (queryId, record text)
+        """
+        recordNumber = 0
+        with open(self.__bundlePath, "rb") as ifh:
+            ifh.seek(start)
+            for lineL in self.__iterRecordLines(ifh, end):
+                text = b"".join(lineL).decode("utf-8", "replace")
+                if queryIdList is not None and recordNumber < len(queryIdList):
+                    queryId = queryIdList[recordNumber]
+                else:
+                    queryId = self.__getTitle(lineL) or "%s_%06d" % (self.__bundleName, recordNumber + 1)
+                recordNumber += 1
+                yield queryId, text
+
+    def __iterRecordLines(self, ifh, end):
+        """Yield the lines of each record up to the end offset."""
+        lineL = []
+        hasMolecule = False
+        pos = ifh.tell()
+        for line in iter(ifh.readline, b""):
+            if end is not None and pos >= end:
+                break
+            pos += len(line)
+            if self.__fmt == "mol2" and line.startswith(b"@<TRIPOS>MOLECULE"):
+                if hasMolecule:
+                    yield lineL
+                    lineL = []
+                hasMolecule = True
+            lineL.append(line)
+            if self.__fmt == "sdf" and line.rstrip(b"\r\n") == b"$$$$":
+                yield lineL
+                lineL = []
+        if any(ln.strip() for ln in lineL):
+            yield lineL
+
+    def __getTitle(self, lineL):
+        if self.__fmt == "sdf":
+            title = lineL[0] if lineL else b""
+        else:
+            title = b""
+            for ii, line in enumerate(lineL[:-1]):
+                if line.startswith(b"@<TRIPOS>MOLECULE"):
+                    title = lineL[ii + 1]
+                    break
+        title = title.decode("utf-8", "replace").strip()
+        # placeholder titles (e.g. '*****') are treated as missing
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", title) if re.search(r"[A-Za-z0-9]", title) else ""
+
+    def __scan(self):
+        recL = []
+        idCountD = {}
+        with open(self.__bundlePath, "rb") as ifh:
+            start = 0
+            for lineL in self.__iterRecordLines(ifh, None):
+                end = start + sum(len(line) for line in lineL)
+                queryId = self.__getTitle(lineL) or "%s_%06d" % (self.__bundleName, len(recL) + 1)
+                idCountD[queryId] = idCountD.get(queryId, 0) + 1
+                if idCountD[queryId] > 1:
+                    logger.warning("Repeated query identifier %r in %s (record %d)", queryId, self.__bundlePath, len(recL) + 1)
+                    queryId = "%s_%d" % (queryId, idCountD[queryId])
+                recL.append({"query_id": queryId, "record_number": len(recL) + 1, "start": start, "end": end})
+                start = end
+        logger.info("Scanned %d %s records in %s", len(recL), self.__fmt, self.__bundlePath)
+        return recL
@@ -0,0 +1,206 @@
+##
+# File:    CcdcChangeManifest.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Content hash comparison for idempotent result writes and the per-run change manifest.
+
+Each output file is rendered in memory before it is written.  In idempotent write mode the SHA-256
+hash of the (uncompressed) content is compared with the hash of the existing file, and a file whose
+content is unchanged is not rewritten, so its modification time is preserved and incremental sync
+tools (rsync, object store sync) skip it.  The hash of the existing file is taken from the change
+manifest of a previous run when one is given (and the file is still present), or else computed from
+the file content read from disk.
+
+The change manifest of a run records the status (added, modified or unchanged), hash and size of every
+file written or checked in the run, and lists the stale structure and index files found in the
+result directories of the run that were not written by it (e.g. matches no longer found).  Stale
+files are reported, not removed.  The manifest of a run also serves as the hash manifest of the next
+run.  Manifests written by several processes are combined with merge().
+
+This module does not depend on the ccdc API.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+
+logger = logging.getLogger(__name__)
+
+
+class CcdcChangeManifest(object):
+    """Content hash comparison for idempotent writes and the per-run change manifest."""
+
+    # structure and index files (with any compression suffix) checked for stale files
+    outputPattern = re.compile(r"(\.mol2|\.sdf|-index\.json)(\.gz|\.zst)?$")
+
+    def __init__(self, hashManifestPath=None):
+        """Content hash comparison for idempotent writes.
+
+        Args:
+            hashManifestPath (str, optional): change manifest of a previous run supplying the hashes of existing files. Defaults to None
+                (hash existing files read from disk).
+        """
+        self.__hashD = {}
+        if hashManifestPath and os.access(hashManifestPath, os.R_OK):
+            mD = MarshalUtil().doImport(hashManifestPath, fmt="json") or {}
+            self.__hashD = {pth: fD["sha256"] for pth, fD in mD.get("files", {}).items()}
+            logger.info("Read %d file hashes from %s", len(self.__hashD), hashManifestPath)
+        self.__fileD = {}
+        self.__dirS = set()
+        self.__lock = threading.Lock()
+        self.__startTime = time.time()
+
+    @staticmethod
+    def getHash(content):
+        """Return the SHA-256 hash of the input text or bytes."""
+        return hashlib.sha256(content.encode("utf-8") if isinstance(content, str) else content).hexdigest()
+
+    def hasPath(self, filePath):
+        """Return True if the input file has been written or checked in this run."""
+        with self.__lock:
+            return filePath in self.__fileD
+
+    def check(self, filePath, content, readFunc):
+        """Record the input content for the output file and return True if the file must be written.
+
+        Args:
+            filePath (str): output file path (including any compression suffix)
+            content (str or bytes): file content (uncompressed)
+            readFunc (func): function returning the (uncompressed) content of the existing file, readFunc(filePath)
+
+        Returns:
+            (bool): True if the file is new or its content has changed
+        """
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        newHash = self.getHash(data)
+        with self.__lock:
+            runD = self.__fileD.get(filePath)
+        oldHash = None
+        if os.access(filePath, os.R_OK):
+            # a file written earlier in this run (e.g. an appended index) is compared with that content
+            oldHash = runD["sha256"] if runD else self.__hashD.get(filePath)
+            if oldHash is None:
+                try:
+                    oldHash = self.getHash(readFunc(filePath))
+                except Exception as e:
+                    logger.warning("Failing to read %r with %s", filePath, str(e))
+        status = "added" if oldHash is None else "unchanged" if oldHash == newHash else "modified"
+        # the status is relative to the previous run
+        runStatus = runD["status"] if runD and runD["status"] != "unchanged" else status
+        with self.__lock:
+            self.__fileD[filePath] = {"status": runStatus, "sha256": newHash, "size": len(data)}
+        return status != "unchanged"
+
+    def addDirectory(self, dirPath):
+        """Record a result directory whose content is determined by this run (checked for stale files)."""
+        with self.__lock:
+            self.__dirS.add(dirPath)
+
+    def getSummary(self):
+        """Return the number of files added, modified and unchanged in this run."""
+        with self.__lock:
+            statusL = [fD["status"] for fD in self.__fileD.values()]
+        return {status: statusL.count(status) for status in ["added", "modified", "unchanged"]}
+
+    def getStalePaths(self):
+        """Return the structure and index files in the directories written in this run that were not written by it."""
+        with self.__lock:
+            pathS = set(self.__fileD)
+            dirS = self.__dirS | {os.path.dirname(pth) for pth in pathS}
+        staleL = []
+        for dirPath in sorted(dirS):
+            try:
+                for fn in sorted(os.listdir(dirPath)):
+                    pth = os.path.join(dirPath, fn)
+                    if pth not in pathS and self.outputPattern.search(fn):
+                        staleL.append(pth)
+            except OSError:
+                pass
+        return staleL
+
+    def write(self, manifestPath):
+        """Write the change manifest of this run.
+
+        Returns:
+            (dict): the change manifest {"created", "elapsed_seconds", "num_added", "num_modified", "num_unchanged", "num_stale", "files", "stale"}
+        """
+        sD = self.getSummary()
+        staleL = self.getStalePaths()
+        with self.__lock:
+            fileD = dict(self.__fileD)
+        mD = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+            "elapsed_seconds": round(time.time() - self.__startTime, 4),
+            "num_added": sD["added"],
+            "num_modified": sD["modified"],
+            "num_unchanged": sD["unchanged"],
+            "num_stale": len(staleL),
+            "files": fileD,
+            "stale": staleL,
+        }
+        ok = MarshalUtil().doExport(manifestPath, mD, fmt="json", indent=3)
+        logger.info("Wrote change manifest (%r) to %s - added %d modified %d unchanged %d stale %d", ok, manifestPath, sD["added"], sD["modified"], sD["unchanged"], len(staleL))
+        return mD
+
+    @classmethod
+    def merge(cls, manifestPathList, manifestPath):
+        """Combine the change manifests written by several processes of a run.
+
+        Args:
+            manifestPathList (list): change manifest paths
+            manifestPath (str): merged change manifest path
+
+        Returns:
+            (dict): the merged change manifest
+        """
+        mU = MarshalUtil()
+        fileD = {}
+        staleS = set()
+        createdL = []
+        for pth in manifestPathList:
+            mD = mU.doImport(pth, fmt="json")
+            if not mD:
+                logger.warning("Skipping unreadable change manifest %s", pth)
+                continue
+            fileD.update(mD.get("files", {}))
+            staleS.update(mD.get("stale", []))
+            createdL.append(mD.get("created"))
+        staleL = sorted(staleS - set(fileD))
+        statusL = [fD["status"] for fD in fileD.values()]
+        mD = {
+            "created": max([created for created in createdL if created] or [time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime())]),
+            "num_manifests": len(createdL),
+            "num_added": statusL.count("added"),
+            "num_modified": statusL.count("modified"),
+            "num_unchanged": statusL.count("unchanged"),
+            "num_stale": len(staleL),
+            "files": fileD,
+            "stale": staleL,
+        }
+        ok = mU.doExport(manifestPath, mD, fmt="json", indent=3)
+        logger.info(
+            "Merged %d change manifests (%r) to %s - added %d modified %d unchanged %d stale %d",
+            len(createdL),
+            ok,
+            manifestPath,
+            mD["num_added"],
+            mD["num_modified"],
+            mD["num_unchanged"],
+            len(staleL),
+        )
+        return mD
@@ -0,0 +1,224 @@
+##
+# File:    CcdcComponentReader.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Lazy reader of chemical component definitions as in-memory query molecules.
+
+The data blocks of a chemical component dictionary file (the full components.cif or a
+per-component CIF) are read in the same way as the records of a query bundle (CcdcBundleReader):
+a single sequential scan locates the byte offset of each data block, the file is divided into
+byte ranges on block boundaries, and a range is read by seeking to its start.  Each block is
+parsed (mmcif PdbxReader) and its chem_comp_atom and chem_comp_bond categories are converted to
+an SDF (V2000) record in memory, so definitions are searched or analysed without writing query
+files.  Ideal coordinates are used, or model coordinates for a definition without ideal
+coordinates (or the reverse with coordinates="model").
+
+Definitions that cannot be converted (e.g. without atoms, or without any coordinates) are
+skipped with a warning.  openBundle() returns this reader for a CIF path and a CcdcBundleReader
+for an SDF or mol2 bundle, so a components file can be used wherever a query bundle is accepted.
+
+This module does not depend on the ccdc API.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import io
+import logging
+import os
+import re
+
+from mmcif.io.PdbxReader import PdbxReader
+
+from rcsb.utils.ccdc.CcdcBundleReader import CcdcBundleReader
+
+logger = logging.getLogger(__name__)
+
+
+def openBundle(bundlePath):
+    """Return the reader of a query bundle: chemical component definitions (CIF) or a multi-molecule SDF or mol2 file."""
+    if CcdcComponentReader.isComponentFile(bundlePath):
+        return CcdcComponentReader(bundlePath)
+    return CcdcBundleReader(bundlePath)
+
+
+class CcdcComponentReader(object):
+    """Lazy reader of chemical component definitions converted to in-memory SDF records."""
+
+    bondOrderD = {"SING": 1, "DOUB": 2, "TRIP": 3, "QUAD": 4, "AROM": 4, "DELO": 4}
+
+    def __init__(self, cifPath, coordinates="ideal"):
+        """Lazy reader of chemical component definitions.
+
+        Args:
+            cifPath (str): path to a chemical component dictionary file (one or more data blocks)
+            coordinates (str, optional): preferred coordinates (ideal|model). Defaults to "ideal".
+        """
+        if coordinates not in ["ideal", "model"]:
+            raise ValueError("Unsupported coordinates %r (ideal|model)" % coordinates)
+        self.__cifPath = cifPath
+        self.__coordinates = coordinates
+        self.__recordL = None
+
+    @staticmethod
+    def isComponentFile(filePath):
+        """Return True for a chemical component dictionary (CIF) file path."""
+        return os.path.splitext(filePath)[1].lower() == ".cif"
+
+    def getFormat(self):
+        return "sdf"
+
+    def getPath(self):
+        return self.__cifPath
+
+    def getRecords(self):
+        """Return the identifier and byte range of each data block in the file (scanned once).
+
+        Returns:
+            (list): [{"query_id", "record_number", "start", "end"}, ...]
+        """
+        if self.__recordL is None:
+            self.__recordL = self.__scan()
+        return self.__recordL
+
+    def getRanges(self, recordsPerRange=10, startRecord=None, endRecord=None):
+        """Divide the file (or the data blocks startRecord-endRecord, 1-based inclusive) into byte ranges on block boundaries.
+
+        Args:
+            recordsPerRange (int, optional): number of data blocks in each range. Defaults to 10.
+            startRecord (int, optional): first data block (1-based). Defaults to None (first block).
+            endRecord (int, optional): last data block (1-based, inclusive). Defaults to None (last block).
+
+        Returns:
+            (list): [{"start", "end", "query_ids"}, ...]
+        """
+        recL = self.getRecords()[int(startRecord) - 1 if startRecord else 0 : int(endRecord) if endRecord else None]
+        nR = max(1, int(recordsPerRange))
+        rangeL = []
+        for ii in range(0, len(recL), nR):
+            rL = recL[ii : ii + nR]
+            rangeL.append({"start": rL[0]["start"], "end": rL[-1]["end"], "query_ids": [rD["query_id"] for rD in rL]})
+        return rangeL
+
+    def iterRecords(self, start=0, end=None, queryIdList=None):
+        """Stream the definitions in the byte range start-end (start on a block boundary as from getRecords() or getRanges()) as SDF records.
+
+        Args:
+            start (int, optional): range start offset. Defaults to 0.
+            end (int, optional): range end offset. Defaults to None (end of file).
+            queryIdList (list, optional): identifiers of the data blocks in the range (as from getRanges()). Defaults to None (block names).
+
+        Yields:
+            (tuple): (queryId, SDF record text)
+        """
+        recordNumber = 0
+        with open(self.__cifPath, "rb") as ifh:
+            ifh.seek(start)
+            for lineL in self.__iterBlockLines(ifh, end):
+                if queryIdList is not None and recordNumber < len(queryIdList):
+                    queryId = queryIdList[recordNumber]
+                else:
+                    queryId = self.__getBlockName(lineL)
+                recordNumber += 1
+                try:
+                    record = self.__toSdf(queryId, b"".join(lineL).decode("utf-8", "replace"))
+                except Exception as e:
+                    logger.exception("Failing for %r in %s with %s", queryId, self.__cifPath, str(e))
+                    record = None
+                if record:
+                    yield queryId, record
+
+    def __iterBlockLines(self, ifh, end):
+        """Yield the lines of each data block up to the end offset."""
+        lineL = []
+        pos = ifh.tell()
+        for line in iter(ifh.readline, b""):
+            if end is not None and pos >= end:
+                break
+            pos += len(line)
+            if line.startswith(b"data_") and lineL:
+                yield lineL
+                lineL = []
+            if lineL or line.startswith(b"data_"):
+                lineL.append(line)
+        if lineL:
+            yield lineL
+
+    def __getBlockName(self, lineL):
+        return lineL[0].decode("utf-8", "replace").strip()[5:]
+
+    def __toSdf(self, queryId, text):
+        """Convert the chem_comp_atom and chem_comp_bond categories of a data block to an SDF (V2000) record."""
+        containerL = []
+        PdbxReader(io.StringIO(text)).read(containerL)
+        if not containerL or not containerL[0].exists("chem_comp_atom"):
+            logger.warning("Skipping %s in %s (no atoms)", queryId, self.__cifPath)
+            return None
+        container = containerL[0]
+        aObj = container.getObj("chem_comp_atom")
+        numAtoms = aObj.getRowCount()
+        xyzL = self.__getCoordinates(aObj)
+        if xyzL is None:
+            logger.warning("Skipping %s in %s (no coordinates)", queryId, self.__cifPath)
+            return None
+        bObj = container.getObj("chem_comp_bond") if container.exists("chem_comp_bond") else None
+        numBonds = bObj.getRowCount() if bObj else 0
+        if numAtoms > 999 or numBonds > 999:
+            logger.warning("Skipping %s in %s (%d atoms %d bonds exceed the SDF V2000 limits)", queryId, self.__cifPath, numAtoms, numBonds)
+            return None
+        name = container.getObj("chem_comp").getValueOrDefault("name", 0, "") if container.exists("chem_comp") else ""
+        #
+        atomIndexD = {}
+        lineL = [queryId, "  RCSB-CCD", re.sub(r"\s+", " ", name or "")[:80], "%3d%3d  0  0  0  0  0  0  0  0999 V2000" % (numAtoms, numBonds)]
+        chargeL = []
+        for ii in range(numAtoms):
+            atomIndexD[aObj.getValue("atom_id", ii)] = ii + 1
+            symbol = aObj.getValue("type_symbol", ii).capitalize()
+            lineL.append("%10.4f%10.4f%10.4f %-3s 0  0  0  0  0  0  0  0  0  0  0  0" % (xyzL[ii][0], xyzL[ii][1], xyzL[ii][2], symbol))
+            charge = aObj.getValueOrDefault("charge", ii, "0")
+            if charge not in ["0", "?", "."]:
+                chargeL.append((ii + 1, int(charge)))
+        for ii in range(numBonds):
+            bondOrder = self.bondOrderD.get(bObj.getValue("value_order", ii).upper(), 1)
+            lineL.append("%3d%3d%3d  0  0  0  0" % (atomIndexD[bObj.getValue("atom_id_1", ii)], atomIndexD[bObj.getValue("atom_id_2", ii)], bondOrder))
+        for ii in range(0, len(chargeL), 8):
+            cL = chargeL[ii : ii + 8]
+            lineL.append("M  CHG%3d" % len(cL) + "".join(" %3d %3d" % (atomIndex, charge) for atomIndex, charge in cL))
+        lineL.extend(["M  END", "$$$$"])
+        return "\n".join(lineL) + "\n"
+
+    def __getCoordinates(self, aObj):
+        """Return the preferred (or else the alternate) coordinates of all atoms or None where neither set is complete."""
+        attrD = {"ideal": ["pdbx_model_Cartn_x_ideal", "pdbx_model_Cartn_y_ideal", "pdbx_model_Cartn_z_ideal"], "model": ["model_Cartn_x", "model_Cartn_y", "model_Cartn_z"]}
+        for coordType in [self.__coordinates] + [cT for cT in ["ideal", "model"] if cT != self.__coordinates]:
+            attrL = attrD[coordType]
+            if not all(aObj.hasAttribute(attr) for attr in attrL):
+                continue
+            try:
+                return [tuple(float(aObj.getValue(attr, ii)) for attr in attrL) for ii in range(aObj.getRowCount())]
+            except ValueError:
+                # missing values (? or .) in this coordinate set
+                continue
+        return None
+
+    def __scan(self):
+        recL = []
+        pos = 0
+        with open(self.__cifPath, "rb") as ifh:
+            for line in iter(ifh.readline, b""):
+                if line.startswith(b"data_"):
+                    if recL:
+                        recL[-1]["end"] = pos
+                    recL.append({"query_id": self.__getBlockName([line]), "record_number": len(recL) + 1, "start": pos, "end": None})
+                pos += len(line)
+        if recL:
+            recL[-1]["end"] = pos
+        logger.info("Scanned %d chemical component definitions in %s", len(recL), self.__cifPath)
+        return recL
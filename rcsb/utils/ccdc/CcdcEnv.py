@@ -0,0 +1,55 @@
+##
+# File:    CcdcEnv.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Environment setup for the CCDC Python API (CSDHOME and ccdc shared library paths).
+
+The settings must be in place before the first import of the ccdc package in a process.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def setCcdcEnv(csdHome, pythonLibPath=None, pythonVersion=None):
+    """Set the environment required by the CCDC Python API in the current process.
+
+    Args:
+        csdHome (str): path to the CSD release (path to CSD_202x)
+        pythonLibPath (str, optional): path to the Python library in which the ccdc API is installed. Defaults to $PYROOT/lib.
+        pythonVersion (str, optional): Python library version. Defaults to "3.7".
+
+    Returns:
+        (bool): True for success or False otherwise
+    """
+    try:
+        pyLib = pythonLibPath if pythonLibPath else os.path.join(os.environ["PYROOT"], "lib")
+        pyVer = pythonVersion if pythonVersion else "3.7"
+        ccdcLib = "%s/python%s/site-packages/ccdc/_lib" % (pyLib, pyVer)
+        #
+        if csdHome:
+            os.environ["CSDHOME"] = csdHome
+        ldPath = os.environ.get("LD_LIBRARY_PATH")
+        os.environ["LD_LIBRARY_PATH"] = "%s:%s:%s" % (pyLib, ccdcLib, ldPath) if ldPath else "%s:%s" % (pyLib, ccdcLib)
+        os.environ["DYLD_LIBRARY_PATH"] = ccdcLib
+        os.environ["DYLD_FRAMEWORK_PATH"] = ccdcLib
+        #
+        logger.debug("Using CSDHOME %s", os.environ.get("CSDHOME"))
+        logger.debug("Using LD_LIBRARY_PATH %s", os.environ["LD_LIBRARY_PATH"])
+        logger.debug("Using DYLD_LIBRARY_PATH %s", os.environ["DYLD_LIBRARY_PATH"])
+        return True
+    except Exception as e:
+        logger.exception("Failing with %s", str(e))
+    return False
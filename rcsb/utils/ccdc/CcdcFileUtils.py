@@ -0,0 +1,151 @@
+##
+# File:    CcdcFileUtils.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#   18-Oct-2026 jdw  add idempotent writes skipping files with unchanged content (CcdcChangeManifest)
+#
+##
+"""
+Streaming writers and transparent readers for optionally compressed (gzip or zstd) search output.
+
+Output files are written through a single streaming text writer with the compression suffix
+(.gz or .zst) appended to the file name.  Readers locate a file with or without a compression
+suffix and detect the compression from the leading bytes, so downstream code can read plain and
+compressed output alike.  The zstd support requires the optional zstandard package.
+
+With a change manifest (CcdcChangeManifest) files are written only when their content has changed.
+
+This module does not depend on the ccdc API.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import contextlib
+import gzip
+import io
+import json
+import logging
+import os
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+
+class CcdcFileUtils(object):
+    """Streaming writers and transparent readers for optionally compressed output files."""
+
+    suffixD = {"gzip": ".gz", "zstd": ".zst"}
+    magicD = {"gzip": b"\x1f\x8b", "zstd": b"\x28\xb5\x2f\xfd"}
+
+    def __init__(self, compression=None, compressLevel=None, opener=None, changeManifest=None):
+        """Streaming writers and transparent readers for optionally compressed output files.
+
+        Args:
+            compression (str, optional): output compression (gzip|zstd). Defaults to None (uncompressed).
+            compressLevel (int, optional): compression level. Defaults to 6 (gzip) or 3 (zstd).
+            opener (func, optional): function opening a binary output file, opener(path, mode). Defaults to open().
+            changeManifest (obj, optional): change manifest (CcdcChangeManifest) recording each write - files whose content is
+                unchanged are not rewritten. Defaults to None (write every file).
+        """
+        if compression not in [None, "gzip", "zstd"]:
+            raise ValueError("Unsupported compression %r (gzip|zstd)" % compression)
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("Compression 'zstd' requires the zstandard package")
+        self.__compression = compression
+        self.__compressLevel = compressLevel if compressLevel is not None else (3 if compression == "zstd" else 6)
+        self.__opener = opener if opener else open
+        self.__changeManifest = changeManifest
+
+    def getCompression(self):
+        return self.__compression
+
+    def getChangeManifest(self):
+        return self.__changeManifest
+
+    def getPath(self, filePath):
+        """Return the output path for the input file path including any compression suffix."""
+        return filePath + self.suffixD[self.__compression] if self.__compression else filePath
+
+    def findPath(self, filePath):
+        """Return the path of an existing plain or compressed version of the input file path or None."""
+        for pth in [filePath, filePath + ".gz", filePath + ".zst"]:
+            if os.access(pth, os.R_OK):
+                return pth
+        return None
+
+    @contextlib.contextmanager
+    def openOutput(self, filePath):
+        """Open a streaming text writer for the input file path (the compression suffix is appended).
+
+        Example:
+            with fileU.openOutput(filePath) as ofh:
+                ofh.write(text)
+        """
+        with self.__opener(self.getPath(filePath), "wb") as rawFh:
+            if self.__compression == "gzip":
+                stream = gzip.GzipFile(filename="", mode="wb", fileobj=rawFh, compresslevel=self.__compressLevel, mtime=0)
+            elif self.__compression == "zstd":
+                stream = zstandard.ZstdCompressor(level=self.__compressLevel).stream_writer(rawFh)
+            else:
+                stream = rawFh
+            with io.TextIOWrapper(stream, encoding="utf-8", newline="") as ofh:
+                yield ofh
+
+    @contextlib.contextmanager
+    def openInput(self, filePath):
+        """Open a text reader for a plain or compressed version of the input file path.
+
+        The compression is detected from the leading bytes of the file.
+        """
+        pth = self.findPath(filePath)
+        if pth is None:
+            raise IOError("File not found %r" % filePath)
+        with open(pth, "rb") as rawFh:
+            magic = rawFh.read(4)
+            rawFh.seek(0)
+            if magic.startswith(self.magicD["gzip"]):
+                stream = gzip.GzipFile(fileobj=rawFh, mode="rb")
+            elif magic.startswith(self.magicD["zstd"]):
+                if zstandard is None:
+                    raise ValueError("Reading %r requires the zstandard package" % pth)
+                stream = zstandard.ZstdDecompressor().stream_reader(rawFh)
+            else:
+                stream = rawFh
+            with io.TextIOWrapper(stream, encoding="utf-8", newline="") as ifh:
+                yield ifh
+
+    def writeText(self, filePath, text):
+        """Write the input text (unless unchanged with a change manifest) and return the output path (including any compression suffix)."""
+        if self.__changeManifest is not None and not self.__changeManifest.check(self.getPath(filePath), text, self.readText):
+            return self.getPath(filePath)
+        with self.openOutput(filePath) as ofh:
+            ofh.write(text)
+        return self.getPath(filePath)
+
+    def readText(self, filePath):
+        with self.openInput(filePath) as ifh:
+            return ifh.read()
+
+    def writeJson(self, filePath, obj, indent=3):
+        """Write the input object as JSON (unless unchanged with a change manifest) and return the output path (including any compression suffix)."""
+        if self.__changeManifest is not None:
+            return self.writeText(filePath, json.dumps(obj, indent=indent))
+        with self.openOutput(filePath) as ofh:
+            json.dump(obj, ofh, indent=indent)
+        return self.getPath(filePath)
+
+    def readJson(self, filePath):
+        with self.openInput(filePath) as ifh:
+            return json.load(ifh)
+
+    def exists(self, filePath):
+        return self.findPath(filePath) is not None
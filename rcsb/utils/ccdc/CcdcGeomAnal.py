@@ -5,9 +5,12 @@
 # Version: 0.001
 #
 # Updated:
+#   18-Oct-2026 jdw add opt-in per-query profiling (CcdcProfiler) storing the profiles of slow analyses in profilePath
+#   18-Oct-2026 jdw import the ccdc API and create the geometry analyser on first use
+#   18-Oct-2026 jdw add analRecord() and analBundle() for in-memory query molecules and chemical component definitions
 #
 ##
-# pylint: disable=exec-used
+# pylint: disable=exec-used,import-outside-toplevel
 """
 Utilities for chemical component geometrical analyis using the local CCDC Python API
 """
@@ -16,23 +19,47 @@ __author__ = "John Westbrook"
 __email__ = "john.westbrook@rcsb.org"
 __license__ = "Apache 2.0"
 
+import contextlib
 import logging
+import os
 import sys
+import time
 
-from ccdc.io import EntryReader
-from ccdc import conformer
+from rcsb.utils.ccdc.CcdcComponentReader import CcdcComponentReader, openBundle
+from rcsb.utils.ccdc.CcdcProfiler import CcdcProfiler
 
 logger = logging.getLogger(__name__)
 
 
 class CcdcGeomAnal(object):
-    def __init__(self, verbose=True, log=sys.stderr):
+    def __init__(self, verbose=True, log=sys.stderr, profilePath=None, profileThreshold=None):
+        """Geometrical analysis against the local CCDC.
+
+        Args:
+            verbose (bool, optional): verbose logging. Defaults to True.
+            log (file, optional): log file handle. Defaults to sys.stderr.
+            profilePath (str, optional): directory storing query profiles and timings (CcdcProfiler). Defaults to None.
+            profileThreshold (float, optional): profile each analysis (cProfile) and store the profile of analyses taking at
+                least this time (seconds) in profilePath. Defaults to None (no profiling).
+        """
         self.__lfh = log
         self.__verbose = verbose
-        self.__engine = conformer.GeometryAnalyser()
+        self.__engine = None
+        self.__profilePath = profilePath
+        self.__profiler = CcdcProfiler(thresholdSeconds=profileThreshold, verbose=verbose) if profilePath and profileThreshold is not None else None
+
+    def __getEngine(self):
+        """Return the geometry analyser (the ccdc API is imported on first use)."""
+        if self.__engine is None:
+            from ccdc import conformer
+
+            startTime = time.time()
+            self.__engine = conformer.GeometryAnalyser()
+            logger.info("Created the geometry analyser in %.3f seconds", time.time() - startTime)
+        return self.__engine
 
     def settings(self):
-        return self.__engine.settings.summary()
+        return self.__getEngine().settings.summary()
 
     def featureSettings(self, featureType, **kw):
         """
@@ -82,7 +109,7 @@ class CcdcGeomAnal(object):
             if k in fNames:
                 cm = "e.settings.%s.%s=%s" % (featureType, k, str(kw[k]))
                 logger.info("Settings command: %s", cm)
-                self.__doExec(self.__engine, cm)
+                self.__doExec(self.__getEngine(), cm)
 
         return True
 
@@ -103,48 +130,104 @@ class CcdcGeomAnal(object):
             if k in fNames:
                 cm = "e.settings.%s=%s" % (k, str(kw[k]))
                 logger.info("Settings command: %s", cm)
-                self.__doExec(self.__engine, cm)
+                self.__doExec(self.__getEngine(), cm)
             if k in sNames:
                 cm = "e.settings.%s='%s'" % (k, str(kw[k]))
                 logger.info("Settings command: %s", cm)
-                self.__doExec(self.__engine, cm)
+                self.__doExec(self.__getEngine(), cm)
         return True
 
     def anal(self, queryTargetPath, normalizeFlag=False):
-        """Perform geometrical analysis against the CCDC data source-"""
-        retD = {}
-        targetStructures = EntryReader(queryTargetPath)
-
-        for e in targetStructures:
-            mol = e.molecule
-            if normalizeFlag:
-                mol.assign_bond_types(which="unknown")
-                mol.standardise_aromatic_bonds()
-                mol.standardise_delocalised_bonds()
-            #
-            logger.info("begin analysis - for %s", queryTargetPath)
-            gam = self.__engine.analyse_molecule(mol)
-            bondOutliers = len([b for b in gam.analysed_bonds if b.unusual and b.enough_hits])
-            angleOutliers = len([a for a in gam.analysed_angles if a.unusual and a.enough_hits])
-            torsionOutliers = len([t for t in gam.analysed_torsions if t.unusual and t.enough_hits])
-            ringOutliers = len([r for r in gam.analysed_rings if r.unusual and r.enough_hits])
-
-            bL = self.__getBondAnalysis(gam)
-            aL = self.__getAngleAnalysis(gam)
-            tL = self.__getTorsionAnalysis(gam)
-            rL = self.__getRingAnalysis(gam)
-            retD = {
-                "bond_outliers": bondOutliers,
-                "angle_outliers": angleOutliers,
-                "torsion_outliers": torsionOutliers,
-                "ring_outliers": ringOutliers,
-                "bond_list": bL,
-                "angle_list": aL,
-                "torsion_list": tL,
-                "ring_list": rL,
-            }
+        """Perform geometrical analysis against the CCDC data source (a chemical component definition (CIF) is converted in memory)-"""
+        from ccdc.io import EntryReader
+        from ccdc.molecule import Molecule
+
+        queryTargetId = os.path.splitext(os.path.basename(queryTargetPath))[0]
+        if CcdcComponentReader.isComponentFile(queryTargetPath):
+            molL = [Molecule.from_string(record, format="sdf") for _, record in CcdcComponentReader(queryTargetPath).iterRecords()]
+        else:
+            molL = [e.molecule for e in EntryReader(queryTargetPath)]
+        return self.__analMolecules(queryTargetId, molL, normalizeFlag)
+
+    def analRecord(self, queryTargetId, record, fmt="sdf", normalizeFlag=False):
+        """Perform geometrical analysis of a query molecule held in memory.
+
+        Args:
+            queryTargetId (str): query identifier
+            record (str): query molecule record (sdf or mol2 text)
+            fmt (str, optional): record format (sdf|mol2). Defaults to "sdf".
+            normalizeFlag (bool, optional): do standard perceptions on the query molecule. Defaults to False.
+
+        Returns:
+            (dict): analysis results as from anal()
+        """
+        from ccdc.molecule import Molecule
+
+        return self.__analMolecules(queryTargetId, [Molecule.from_string(record, format=fmt)], normalizeFlag)
+
+    def analBundle(self, bundlePath, start=0, end=None, queryIdList=None, normalizeFlag=False):
+        """Perform geometrical analysis of each query in a multi-molecule SDF or mol2 bundle or chemical component dictionary (CIF) file.
+
+        Args:
+            bundlePath (str): path to the SDF or mol2 bundle or chemical component dictionary (CIF) file
+            start (int, optional): byte range start offset. Defaults to 0.
+            end (int, optional): byte range end offset. Defaults to None (end of file).
+            queryIdList (list, optional): query identifiers for the records in the range (as from getRanges()). Defaults to None (record titles).
+            normalizeFlag (bool, optional): do standard perceptions on the query molecules. Defaults to False.
+
+        Returns:
+            (dict): analysis results for each query identifier {queryTargetId: analysis results, ...} (None for a failing query)
+        """
+        bR = openBundle(bundlePath)
+        rD = {}
+        for queryTargetId, record in bR.iterRecords(start=start, end=end, queryIdList=queryIdList):
+            try:
+                rD[queryTargetId] = self.analRecord(queryTargetId, record, fmt=bR.getFormat(), normalizeFlag=normalizeFlag)
+            except Exception as e:
+                logger.exception("Failing for %r in %s with %s", queryTargetId, bundlePath, str(e))
+                rD[queryTargetId] = None
+        return rD
+
+    def __analMolecules(self, queryTargetId, molL, normalizeFlag):
+        engine = self.__getEngine()
+        with self.__profileQuery(queryTargetId) as infoD:
+            retD = {}
+            for mol in molL:
+                if normalizeFlag:
+                    mol.assign_bond_types(which="unknown")
+                    mol.standardise_aromatic_bonds()
+                    mol.standardise_delocalised_bonds()
+                #
+                logger.info("begin analysis - for %s", queryTargetId)
+                gam = engine.analyse_molecule(mol)
+                bondOutliers = len([b for b in gam.analysed_bonds if b.unusual and b.enough_hits])
+                angleOutliers = len([a for a in gam.analysed_angles if a.unusual and a.enough_hits])
+                torsionOutliers = len([t for t in gam.analysed_torsions if t.unusual and t.enough_hits])
+                ringOutliers = len([r for r in gam.analysed_rings if r.unusual and r.enough_hits])
+
+                bL = self.__getBondAnalysis(gam)
+                aL = self.__getAngleAnalysis(gam)
+                tL = self.__getTorsionAnalysis(gam)
+                rL = self.__getRingAnalysis(gam)
+                retD = {
+                    "bond_outliers": bondOutliers,
+                    "angle_outliers": angleOutliers,
+                    "torsion_outliers": torsionOutliers,
+                    "ring_outliers": ringOutliers,
+                    "bond_list": bL,
+                    "angle_list": aL,
+                    "torsion_list": tL,
+                    "ring_list": rL,
+                }
+                infoD.update({"num_atoms": len(mol.atoms), "num_outliers": bondOutliers + angleOutliers + torsionOutliers + ringOutliers})
         return retD
 
+    def __profileQuery(self, queryTargetId):
+        """Return the profiling context for an analysis (CcdcProfiler) or a null context when profiling is off."""
+        if self.__profiler is None:
+            return contextlib.nullcontext({})
+        return self.__profiler.profile(queryTargetId, self.__profilePath, queryDir=False)
+
     def __extractAnalFeatures(self, feature):
         rD = {
             "atom_labels": feature.atom_labels,
@@ -0,0 +1,104 @@
+##
+# File:    CcdcHitRecord.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Compact immutable search hit record serialized in bulk to the match index format.
+
+Each record is a tuple with a fixed field layout (no per instance dictionary).  A record is
+built once for each search hit, and the record for each match component is derived from it
+with replace(), in place of copying a mutable CcdcMatchIndexInst dictionary for each component.
+Fields left unset are omitted from the serialized match index records, so the output matches
+the records produced by CcdcMatchIndexInst (e.g. similarity_score only for similarity matches).
+
+This module does not depend on the ccdc API.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import collections
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Unset(object):
+    """Marker for record fields omitted from the serialized match index record."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "UNSET"
+
+    def __reduce__(self):
+        return "UNSET"
+
+
+UNSET = _Unset()
+
+# Match index attribute names in the order written by CcdcMatchIndexInst
+_FIELD_NAMES = (
+    "csd_version",
+    "csd_directory",
+    "target_id",
+    "target_path",
+    "target_cc_path",
+    "identifier",
+    "match_type",
+    "r_factor",
+    "chemical_name",
+    "temperature",
+    "radiation_source",
+    "has_disorder",
+    "has_3d_coordinates",
+    "is_organic",
+    "has_metals",
+    "doi",
+    "similarity_score",
+    "match_atoms",
+    "match_number",
+    "mol2_file_path",
+    "mol_file_path",
+    "component_hash",
+    "component_index",
+    "match_atom_indices",
+)
+
+
+class CcdcHitRecord(collections.namedtuple("CcdcHitRecordBase", _FIELD_NAMES, defaults=(UNSET,) * len(_FIELD_NAMES))):
+    """Compact immutable search hit record (match index attribute names as fields)."""
+
+    __slots__ = ()
+
+    def replace(self, **kwargs):
+        """Return a copy of the record with the input fields replaced."""
+        return self._replace(**kwargs)
+
+    def get(self):
+        """Return the record as a match index dictionary (as from CcdcMatchIndexInst.get())."""
+        return {ky: val for ky, val in zip(self._fields, self) if val is not UNSET}
+
+    @staticmethod
+    def toRows(recordList):
+        """Return the match index dictionaries for the input records.
+
+        Args:
+            recordList (list): CcdcHitRecord records
+
+        Returns:
+            (list): match index records [{attribute: value, ...}, ...]
+        """
+        fieldL = _FIELD_NAMES
+        return [{ky: val for ky, val in zip(fieldL, rec) if val is not UNSET} for rec in recordList]
+
+    @classmethod
+    def fromRow(cls, row):
+        """Return a record for the input match index dictionary (attributes outside the record layout are ignored)."""
+        return cls(**{ky: val for ky, val in row.items() if ky in cls._fields})
@@ -0,0 +1,221 @@
+##
+# File:    CcdcHitTable.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#   18-Oct-2026 jdw accept the output writer (CcdcFileUtils) in writeIndices()
+#   18-Oct-2026 jdw read and write match indices in the result layout of the result path (CcdcResultLayout)
+#   18-Oct-2026 jdw accept prebuilt columns in the constructor for filtered tables
+#
+##
+"""
+Columnar table of stored search hits with vectorized quality filters.
+
+Hits from a search run with permissive settings (CcdcSearch(permissiveSearch=True)) carry the
+entry quality details (R-factor, temperature, radiation source, disorder, 3D coordinates, organic
+and metal flags).  This table loads the hit rows from the per-query match indices into numpy
+columns, applies any stricter set of quality filters with vectorized operations, and writes
+the selected hits as per-query match indices - without searching the CSD again.
+
+This module does not depend on the ccdc API.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import json
+import logging
+import os
+import re
+
+import numpy as np
+
+from rcsb.utils.ccdc.CcdcFileUtils import CcdcFileUtils
+from rcsb.utils.ccdc.CcdcResultLayout import CcdcResultLayout
+from rcsb.utils.io.IndexUtils import CcdcMatchIndex
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+
+logger = logging.getLogger(__name__)
+
+
+class CcdcHitTable(object):
+    """Columnar table of stored search hits with vectorized quality filters."""
+
+    floatColumnL = ["r_factor", "similarity", "temperature_k"]
+    flagColumnL = ["has_disorder", "has_3d_coordinates", "is_organic", "has_metals"]
+    stringColumnL = ["target_id", "identifier", "match_type", "radiation_source"]
+
+    def __init__(self, rowList=None, verbose=True, columnD=None):
+        """Columnar table of stored search hits.
+
+        Args:
+            rowList (list, optional): match index rows. Defaults to None.
+            verbose (bool, optional): verbose logging. Defaults to True.
+            columnD (dict, optional): numpy columns for the rows (as from getColumn()). Defaults to None (built from the rows).
+        """
+        self.__verbose = verbose
+        self.__rowL = list(rowList) if rowList else []
+        self.__colD = columnD if columnD is not None else self.__buildColumns(self.__rowL)
+
+    def __len__(self):
+        return len(self.__rowL)
+
+    def getRows(self):
+        return self.__rowL
+
+    def getColumn(self, name):
+        """Return the numpy column for the input attribute name."""
+        return self.__colD[name]
+
+    @classmethod
+    def fromIndexFiles(cls, resultPath, verbose=True):
+        """Load the hit rows from the (plain or compressed) match indices stored in <resultPath>/<queryId>/<queryId>-index.json
+        (or listed in the result manifest of a hashed result layout)."""
+        fileU = CcdcFileUtils()
+        rowL = []
+        pathL = CcdcResultLayout.getIndexPaths(resultPath)
+        for indexPath in pathL:
+            rowL.extend(fileU.readJson(indexPath) or [])
+        logger.info("Loaded %d hits from %d match indices in %s", len(rowL), len(pathL), resultPath)
+        return cls(rowL, verbose=verbose)
+
+    def save(self, filePath):
+        """Store the table as a numpy archive (columns and the hit rows serialized as JSON)."""
+        arrD = {ky: self.__colD[ky] for ky in self.floatColumnL + self.flagColumnL}
+        arrD.update({ky: self.__colD[ky].astype(str) for ky in self.stringColumnL})
+        arrD["row_json"] = np.array([json.dumps(row) for row in self.__rowL], dtype=str)
+        dirPath = os.path.dirname(filePath)
+        if dirPath and not os.path.exists(dirPath):
+            os.makedirs(dirPath)
+        with open(filePath, "wb") as ofh:
+            np.savez_compressed(ofh, **arrD)
+        return True
+
+    @classmethod
+    def load(cls, filePath, verbose=True):
+        with np.load(filePath, allow_pickle=False) as npz:
+            rowL = [json.loads(rowS) for rowS in npz["row_json"]]
+        return cls(rowL, verbose=verbose)
+
+    def getMask(
+        self,
+        maxRFactor=None,
+        minTemperature=None,
+        maxTemperature=None,
+        radiationSources=None,
+        noDisorder=False,
+        has3dCoordinates=False,
+        organicOnly=False,
+        noMetals=False,
+        minSimilarity=None,
+    ):
+        """Return a boolean mask selecting the hits passing the input quality filters.
+
+        Hits lacking a value tested by a numeric filter (e.g. no R-factor) fail that filter.
+
+        Args:
+            maxRFactor (float, optional): maximum R-factor (percent). Defaults to None.
+            minTemperature (float, optional): minimum experiment temperature (K). Defaults to None.
+            maxTemperature (float, optional): maximum experiment temperature (K). Defaults to None.
+            radiationSources (list, optional): accepted radiation sources (e.g. ["X-ray"]). Defaults to None.
+            noDisorder (bool, optional): exclude disordered structures. Defaults to False.
+            has3dCoordinates (bool, optional): require 3D coordinates. Defaults to False.
+            organicOnly (bool, optional): require organic structures. Defaults to False.
+            noMetals (bool, optional): exclude structures containing metals. Defaults to False.
+            minSimilarity (float, optional): minimum similarity score (similarity matches). Defaults to None.
+
+        Returns:
+            (numpy.ndarray): boolean mask
+        """
+        cD = self.__colD
+        mask = np.ones(len(self.__rowL), dtype=bool)
+        with np.errstate(invalid="ignore"):
+            if maxRFactor is not None:
+                mask &= cD["r_factor"] <= maxRFactor
+            if minTemperature is not None:
+                mask &= cD["temperature_k"] >= minTemperature
+            if maxTemperature is not None:
+                mask &= cD["temperature_k"] <= maxTemperature
+            if minSimilarity is not None:
+                mask &= cD["similarity"] >= minSimilarity
+        if radiationSources:
+            mask &= np.isin(cD["radiation_source"], list(radiationSources))
+        if noDisorder:
+            mask &= ~cD["has_disorder"]
+        if has3dCoordinates:
+            mask &= cD["has_3d_coordinates"]
+        if organicOnly:
+            mask &= cD["is_organic"]
+        if noMetals:
+            mask &= ~cD["has_metals"]
+        return mask
+
+    def filter(self, **kwargs):
+        """Return a new table holding the hits passing the input quality filters (see getMask())."""
+        mask = self.getMask(**kwargs)
+        rowL = [self.__rowL[ii] for ii in np.flatnonzero(mask)]
+        return CcdcHitTable(rowL, verbose=self.__verbose, columnD={ky: col[mask] for ky, col in self.__colD.items()})
+
+    def writeIndices(self, resultPath, compression=None, fileUtils=None, layout=None):
+        """Write the hits as per-query match indices <queryId>-index.json in the query result directories of the layout.
+
+        Args:
+            resultPath (str): output path for the match indices
+            compression (str, optional): compress the match indices (gzip|zstd). Defaults to None.
+            fileUtils (obj, optional): writer for the match indices (CcdcFileUtils) in place of compression, e.g. with a change manifest. Defaults to None.
+            layout (obj, optional): result directory layout (CcdcResultLayout). Defaults to None (flat).
+
+        Returns:
+            (dict): number of hits written for each query identifier
+        """
+        groupD = {}
+        for row in self.__rowL:
+            groupD.setdefault(row["target_id"], []).append(row)
+        mU = MarshalUtil()
+        fileU = fileUtils if fileUtils else CcdcFileUtils(compression=compression)
+        layout = layout if layout else CcdcResultLayout()
+        for queryTargetId, rowL in groupD.items():
+            dirPath = layout.getQueryPath(resultPath, queryTargetId)
+            mU.mkdir(dirPath)
+            fp = os.path.join(dirPath, queryTargetId + "-index.json")
+            if fileU.getCompression() or fileU.getChangeManifest() is not None:
+                fileU.writeJson(fp, rowL)
+            else:
+                cmI = CcdcMatchIndex(indexFilePath=fp, verbose=self.__verbose)
+                cmI.clear()
+                cmI.load(rowL)
+                cmI.writeIndex()
+            layout.register(resultPath, queryTargetId)
+        logger.info("Wrote %d hits for %d queries to %s", len(self.__rowL), len(groupD), resultPath)
+        return {queryTargetId: len(rowL) for queryTargetId, rowL in groupD.items()}
+
+    def __buildColumns(self, rowL):
+        colD = {}
+        colD["r_factor"] = np.array([self.__toFloat(row.get("r_factor")) for row in rowL], dtype=np.float64)
+        colD["similarity"] = np.array([self.__toFloat(row.get("similarity_score", row.get("similarity"))) for row in rowL], dtype=np.float64)
+        colD["temperature_k"] = np.array([self.__toKelvin(row.get("temperature")) for row in rowL], dtype=np.float64)
+        colD["has_disorder"] = np.array([row.get("has_disorder") in ["Y", True] for row in rowL], dtype=bool)
+        for ky in ["has_3d_coordinates", "is_organic", "has_metals"]:
+            colD[ky] = np.array([bool(row.get(ky)) for row in rowL], dtype=bool)
+        for ky in self.stringColumnL:
+            colD[ky] = np.array([row.get(ky) or "" for row in rowL], dtype=object)
+        return colD
+
+    def __toFloat(self, val):
+        try:
+            return float(val)
+        except (TypeError, ValueError):
+            return np.nan
+
+    def __toKelvin(self, val):
+        """Return the temperature in Kelvin from a numeric value or a CSD temperature description (e.g. 'at 150 K')."""
+        if isinstance(val, (int, float)):
+            return float(val)
+        mt = re.search(r"(-?\d+(?:\.\d+)?)\s*(K|deg\.?\s*C|°C)?", val) if val else None
+        if not mt:
+            return np.nan
+        tV = float(mt.group(1))
+        return tV + 273.15 if mt.group(2) and mt.group(2) != "K" else tV
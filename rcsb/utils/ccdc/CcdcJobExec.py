@@ -0,0 +1,60 @@
+##
+# File: CcdcJobExec.py
+# Date: 18-Oct-2026  jdw
+#
+#  Execution wrapper  --  run the search and analysis tasks of a job specification on a shared worker pool
+#
+#  Updates:
+#
+##
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+from rcsb.utils.ccdc.CcdcJobRunner import CcdcJobRunner
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spec_path", required=True, help="Job specification (JSON) path")
+    parser.add_argument("--num_proc", default=None, type=int, help="Number of worker processes (default: num_proc of the job specification)")
+    parser.add_argument("--csdhome", default=None, help="Path to the CSD release (path to CSD_202x)")
+    parser.add_argument("--python_root_path", default=None, help="Path to the Python installation hosting the ccdc API (default: $PYROOT)")
+    parser.add_argument("--python_version", default=None, help="Python library version (default: 3.7)")
+    parser.add_argument("--start_method", default="spawn", help="Multiprocessing start method (spawn|forkserver)")
+    parser.add_argument("--dry_run", default=False, action="store_true", help="Validate the job specification and print the planned work")
+    args = parser.parse_args()
+    #
+    try:
+        jR = CcdcJobRunner(
+            specPath=args.spec_path,
+            csdHome=args.csdhome,
+            pythonRootPath=args.python_root_path if args.python_root_path else os.environ.get("PYROOT"),
+            pythonVersion=args.python_version,
+            startMethod=args.start_method,
+        )
+        if args.dry_run:
+            print(json.dumps(jR.getPlan(), indent=3))
+            return
+        summaryD = jR.run(numProc=args.num_proc)
+        if not summaryD:
+            sys.exit(1)
+        if summaryD["num_failed"]:
+            sys.exit(2)
+    except Exception as e:
+        logger.exception("Failing with %s", str(e))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+##
+# File:    CcdcJobRunner.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#   18-Oct-2026 jdw  add the result_layout search option with the result manifest of each search task written at the end of the job
+#
+##
+"""
+Mixed search and analysis workloads described by a single job specification and run on one pool
+of warm ccdc worker processes.
+
+A job specification (JSON) names the query molecules, the SMARTS patterns and the tasks run on them:
+
+    {
+        "result_path": "./results",
+        "queries": {"mol_list_path": "./queries.list", "paths": ["./ATP.mol2"], "bundle_path": "./components.cif",
+                    "start_record": 1, "end_record": 1000},
+        "smarts": [{"id": "P1", "smarts": "c1ccccc1C(=O)O"}],
+        "tasks": [{"type": "similarity", "max_hits": 50},
+                  {"type": "substructure", "name": "substructure-organic", "suppress_metals": true},
+                  {"type": "geometry"},
+                  {"type": "smarts", "max_hits": 50}],
+        "search_options": {"similarity_threshold": 0.95, "r_value_max_percent": 10.0, "compression": "gzip"},
+        "num_proc": 4,
+        "max_units_per_worker": null,
+        "max_worker_rss_mb": null
+    }
+
+Queries are query files (mol2, SDF or chemical component CIF, one molecule per file) from a list file
+or the paths list, or the records of a multi-molecule bundle or components file (records
+start_record-end_record).  Task types are similarity, substructure and geometry (run on each query
+molecule) and smarts (run on each SMARTS pattern).  Each task writes to <result_path>/<name> (the
+name defaults to the task type).  Relative paths are taken relative to the specification file.
+
+The work is divided into units: a query molecule with all its molecule tasks (the molecule is read
+once and searched and analysed in the same worker) or a SMARTS pattern with the smarts tasks.  SMARTS
+units are interleaved with the molecule units, and units are dispatched one at a time to a pool of
+worker processes (CcdcWorkerPool), each initializing the ccdc API, the searcher and the geometry
+analyser once, so every worker stays busy until the work is done.  A summary of each task and query
+is written to <result_path>/job-summary.json.  With the search option "result_layout": "hashed" the
+query results of each search task are stored under hashed prefix directories (CcdcResultLayout) and
+the result manifest of each search task is written at the end of the job.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+# pylint: disable=global-statement,import-outside-toplevel
+
+import logging
+import os
+import time
+
+from rcsb.utils.ccdc.CcdcComponentReader import openBundle
+from rcsb.utils.ccdc.CcdcEnv import setCcdcEnv
+from rcsb.utils.ccdc.CcdcResultLayout import CcdcResultLayout
+from rcsb.utils.ccdc.CcdcWorkerPool import CcdcWorkerPool
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+
+logger = logging.getLogger(__name__)
+
+# Per-process worker state (set by the pool initializer in each worker)
+_JOB_STATE = {}
+
+
+def _initJobWorker(optionsD):
+    """Worker initializer - set the CCDC environment and create the searcher and geometry analyser once per worker."""
+    global _JOB_STATE
+    if optionsD.get("csdHome"):
+        setCcdcEnv(optionsD["csdHome"], pythonLibPath=optionsD.get("pythonLibPath"), pythonVersion=optionsD.get("pythonVersion"))
+    from rcsb.utils.ccdc.CcdcGeomAnal import CcdcGeomAnal
+    from rcsb.utils.ccdc.CcdcSearch import CcdcSearch
+
+    specD = optionsD["specD"]
+    sD = specD["search_options"]
+    taskTypeS = {taskD["type"] for taskD in specD["tasks"]}
+    ccdcS = None
+    if taskTypeS & {"similarity", "substructure", "smarts"}:
+        ccdcS = CcdcSearch(
+            verbose=optionsD.get("verbose", True),
+            similarityThreshold=sD.get("similarity_threshold", 0.95),
+            rValueMaxPercent=sD.get("r_value_max_percent", 10.0),
+            tieredSearch=sD.get("tiered_search", False),
+            compression=sD.get("compression"),
+            dedupComponents=sD.get("dedup_components"),
+            lazyComponents=sD.get("lazy_components", False),
+            metadataTablePath=sD.get("metadata_table_path"),
+            permissiveSearch=sD.get("permissive_search", False),
+            asyncWrite=sD.get("async_write", False),
+            resultLayout=sD.get("result_layout", "flat"),
+        )
+    cga = CcdcGeomAnal(verbose=optionsD.get("verbose", True)) if "geometry" in taskTypeS else None
+    _JOB_STATE = {"ccdcSearch": ccdcS, "geomAnal": cga, "specD": specD}
+    logger.info("Job worker %d initialized with CSDHOME %r", os.getpid(), os.environ.get("CSDHOME"))
+
+
+def _exitJobWorker():
+    """Worker exit function - complete pending output and flush buffered results."""
+    if _JOB_STATE.get("ccdcSearch") is not None:
+        _JOB_STATE["ccdcSearch"].close()
+
+
+def _runJobUnit(unitD):
+    """Run the tasks of a work unit (a query molecule or a SMARTS pattern) in a worker process.
+
+    Returns:
+        (list): [{"query_id", "task", "num_hits", "num_outliers", "seconds", "error"}, ...] one row for each task
+    """
+    specD = _JOB_STATE["specD"]
+    resultPath = specD["result_path"]
+    queryId = unitD["query_id"]
+    taskL = [taskD for taskD in specD["tasks"] if (taskD["type"] == "smarts") == (unitD["kind"] == "smarts")]
+    if os.access(os.path.join(resultPath, "STOP"), os.F_OK):
+        return [_getTaskRow(queryId, taskD, error="stopped") for taskD in taskL]
+    if unitD["kind"] == "smarts":
+        return [_runTask(queryId, taskD, None, None, smarts=unitD["smarts"]) for taskD in taskL]
+    #
+    # the query molecule is read once for all of its tasks
+    startTime = time.time()
+    try:
+        bR = openBundle(unitD["path"])
+        _, record = next(bR.iterRecords(start=unitD["start"], end=unitD["end"], queryIdList=[queryId]), (queryId, None))
+    except Exception as e:
+        logger.exception("Failing reading %r from %s with %s", queryId, unitD["path"], str(e))
+        bR, record = None, None
+    readSeconds = time.time() - startTime
+    if record is None:
+        return [_getTaskRow(queryId, taskD, error="no query molecule in %s" % unitD["path"]) for taskD in taskL]
+    rowL = [_runTask(queryId, taskD, record, bR.getFormat(), queryPath=unitD["path"]) for taskD in taskL]
+    for rowD in rowL:
+        rowD["read_seconds"] = round(readSeconds, 4)
+    return rowL
+
+
+def _getTaskRow(queryId, taskD, numHits=None, numOutliers=None, seconds=0.0, error=None):
+    return {"query_id": queryId, "task": taskD["name"], "num_hits": numHits, "num_outliers": numOutliers, "seconds": round(seconds, 4), "error": error}
+
+
+def _runTask(queryId, taskD, record, fmt, queryPath=None, smarts=None):
+    taskPath = os.path.join(_JOB_STATE["specD"]["result_path"], taskD["name"])
+    startTime = time.time()
+    try:
+        if taskD["type"] == "smarts":
+            numHits = _JOB_STATE["ccdcSearch"].searchSmarts(queryId, smarts, taskPath, maxHits=taskD["max_hits"], suppressMetals=taskD["suppress_metals"])
+            return _getTaskRow(queryId, taskD, numHits=numHits, seconds=time.time() - startTime)
+        if taskD["type"] == "geometry":
+            rD = _JOB_STATE["geomAnal"].analRecord(queryId, record, fmt=fmt, normalizeFlag=taskD["normalize"])
+            MarshalUtil().doExport(os.path.join(taskPath, queryId + "-geometry.json"), rD, fmt="json", indent=3)
+            numOutliers = sum(rD.get(ky, 0) for ky in ["bond_outliers", "angle_outliers", "torsion_outliers", "ring_outliers"])
+            return _getTaskRow(queryId, taskD, numOutliers=numOutliers, seconds=time.time() - startTime)
+        numHits = _JOB_STATE["ccdcSearch"].searchRecord(
+            queryId,
+            record,
+            taskPath,
+            fmt=fmt,
+            queryTargetPath=queryPath,
+            normalizeFlag=taskD["normalize"],
+            maxHits=taskD["max_hits"],
+            searchType=taskD["type"],
+            suppressMetals=taskD["suppress_metals"],
+        )
+        return _getTaskRow(queryId, taskD, numHits=numHits, seconds=time.time() - startTime)
+    except Exception as e:
+        logger.exception("Task %s failing for %r with %s", taskD["name"], queryId, str(e))
+        return _getTaskRow(queryId, taskD, seconds=time.time() - startTime, error=str(e))
+
+
+class CcdcJobRunner(object):
+    """Run the search and analysis tasks of a job specification on a shared pool of warm ccdc workers."""
+
+    taskTypeList = ["similarity", "substructure", "geometry", "smarts"]
+
+    def __init__(self, specPath=None, specD=None, csdHome=None, pythonRootPath=None, pythonVersion=None, startMethod="spawn", verbose=True):
+        """Run the tasks of a job specification.
+
+        Args:
+            specPath (str, optional): job specification (JSON) path. Defaults to None.
+            specD (dict, optional): job specification (in place of specPath, relative paths taken from the current directory). Defaults to None.
+            csdHome (str, optional): path to the CSD release (path to CSD_202x). Defaults to the current environment.
+            pythonRootPath (str, optional): path to the Python installation hosting the ccdc API. Defaults to None.
+            pythonVersion (str, optional): Python library version. Defaults to "3.7".
+            startMethod (str, optional): multiprocessing start method (spawn|forkserver). Defaults to "spawn".
+            verbose (bool, optional): verbose logging. Defaults to True.
+        """
+        if specD is None:
+            specD = MarshalUtil().doImport(specPath, fmt="json")
+            if not specD:
+                raise ValueError("Missing or unreadable job specification %r" % specPath)
+        self.__specPath = specPath
+        self.__specD = self.__validate(specD, os.path.dirname(os.path.abspath(specPath)) if specPath else os.getcwd())
+        self.__csdHome = csdHome
+        self.__pythonLibPath = os.path.join(pythonRootPath, "lib") if pythonRootPath else None
+        self.__pythonVersion = pythonVersion
+        if startMethod not in ["spawn", "forkserver"]:
+            raise ValueError("Unsupported start method %r (spawn|forkserver)" % startMethod)
+        self.__startMethod = startMethod
+        self.__verbose = verbose
+        self.__unitL = None
+
+    def getSpec(self):
+        """Return the validated job specification (with defaults and absolute paths)."""
+        return self.__specD
+
+    def getUnits(self):
+        """Return the work units of the job (query molecules with SMARTS patterns interleaved).
+
+        Returns:
+            (list): [{"kind": "molecule", "query_id", "path", "start", "end"} | {"kind": "smarts", "query_id", "smarts"}, ...]
+        """
+        if self.__unitL is None:
+            self.__unitL = self.__getUnits()
+        return self.__unitL
+
+    def getPlan(self):
+        """Return a summary of the planned work (number of query molecules, SMARTS patterns, units and tasks)."""
+        unitL = self.getUnits()
+        numMolecules = len([unitD for unitD in unitL if unitD["kind"] == "molecule"])
+        return {
+            "result_path": self.__specD["result_path"],
+            "num_molecules": numMolecules,
+            "num_smarts": len(unitL) - numMolecules,
+            "num_units": len(unitL),
+            "tasks": [taskD["name"] for taskD in self.__specD["tasks"]],
+            "num_proc": self.__specD["num_proc"],
+        }
+
+    def run(self, numProc=None, summaryPath=None):
+        """Run the job on a pool of worker processes.
+
+        Args:
+            numProc (int, optional): number of worker processes. Defaults to None (num_proc of the specification).
+            summaryPath (str, optional): job summary path. Defaults to <result_path>/job-summary.json.
+
+        Returns:
+            (dict): job summary {"num_units", "num_failed", "elapsed_seconds", "tasks": {name: {...}}, "workers", "queries"}
+        """
+        specD = self.__specD
+        unitL = self.getUnits()
+        numProc = numProc if numProc else specD["num_proc"]
+        summaryPath = summaryPath if summaryPath else os.path.join(specD["result_path"], "job-summary.json")
+        logger.info("Starting job %s with %d units tasks %r on %d workers", self.__specPath, len(unitL), [taskD["name"] for taskD in specD["tasks"]], numProc)
+        startTime = time.time()
+        rowL = []
+        summaryD = {}
+        try:
+            MarshalUtil().mkdir(specD["result_path"])
+            if self.__csdHome:
+                # spawned workers inherit the parent environment
+                setCcdcEnv(self.__csdHome, pythonLibPath=self.__pythonLibPath, pythonVersion=self.__pythonVersion)
+            optionsD = {"specD": specD, "csdHome": self.__csdHome, "pythonLibPath": self.__pythonLibPath, "pythonVersion": self.__pythonVersion, "verbose": self.__verbose}
+            wp = CcdcWorkerPool(
+                _runJobUnit,
+                initFunc=_initJobWorker,
+                initArgs=(optionsD,),
+                numProc=numProc,
+                startMethod=self.__startMethod,
+                maxTasksPerWorker=specD["max_units_per_worker"],
+                maxRssMb=specD["max_worker_rss_mb"],
+                exitFunc=_exitJobWorker,
+            )
+            for taskIndex, result, errMsg, infoD in wp.run(unitL, chunkSize=1):
+                unitD = unitL[taskIndex]
+                if not result:
+                    result = [_getTaskRow(unitD["query_id"], taskD, error=errMsg) for taskD in specD["tasks"] if (taskD["type"] == "smarts") == (unitD["kind"] == "smarts")]
+                for rowD in result:
+                    rowD["worker_pid"] = infoD["pid"]
+                    rowL.append(rowD)
+                logger.debug("(%d/%d) %s completed (%.2f seconds)", len(rowL), len(unitL), unitD["query_id"], infoD["seconds"])
+            #
+            taskSummaryD = {}
+            for taskD in specD["tasks"]:
+                tL = [rowD for rowD in rowL if rowD["task"] == taskD["name"]]
+                taskSummaryD[taskD["name"]] = {
+                    "type": taskD["type"],
+                    "num_queries": len(tL),
+                    "num_matched": len([rowD for rowD in tL if rowD["num_hits"] or rowD["num_outliers"]]),
+                    "num_failed": len([rowD for rowD in tL if rowD["error"]]),
+                    "seconds": round(sum(rowD["seconds"] for rowD in tL), 4),
+                }
+            summaryD = self.getPlan()
+            summaryD.update(
+                {
+                    "spec_path": self.__specPath,
+                    "num_proc": numProc,
+                    "num_failed": len([rowD for rowD in rowL if rowD["error"]]),
+                    "elapsed_seconds": round(time.time() - startTime, 4),
+                    "tasks": taskSummaryD,
+                    "workers": wp.getWorkerStatistics(),
+                    "queries": rowL,
+                }
+            )
+            ok = MarshalUtil().doExport(summaryPath, summaryD, fmt="json", indent=3)
+            logger.info("Wrote job summary (%r) to %s", ok, summaryPath)
+            if specD["search_options"].get("result_layout", "flat") == "hashed":
+                for taskD in specD["tasks"]:
+                    taskPath = os.path.join(specD["result_path"], taskD["name"])
+                    if taskD["type"] != "geometry" and os.path.isdir(taskPath):
+                        CcdcResultLayout.writeManifest(taskPath)
+            for name, tD in taskSummaryD.items():
+                logger.info("Task %-24s queries %d matched %d failed %d (%.2f seconds)", name, tD["num_queries"], tD["num_matched"], tD["num_failed"], tD["seconds"])
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        logger.info("Job ended with %d task results (%.2f seconds)", len(rowL), time.time() - startTime)
+        return summaryD
+
+    def __validate(self, specD, baseDir):
+        """Return the job specification with defaults and absolute paths (raises ValueError for an invalid specification)."""
+
+        def absPath(pth):
+            return os.path.abspath(os.path.join(baseDir, os.path.expanduser(pth))) if pth else pth
+
+        if not specD.get("result_path"):
+            raise ValueError("Job specification requires result_path")
+        if not specD.get("tasks"):
+            raise ValueError("Job specification requires one or more tasks")
+        qD = dict(specD.get("queries") or {})
+        for ky in ["mol_list_path", "bundle_path"]:
+            qD[ky] = absPath(qD.get(ky))
+        qD["paths"] = [absPath(pth) for pth in qD.get("paths", [])]
+        smartsL = []
+        for ii, sD in enumerate(specD.get("smarts") or [], 1):
+            if isinstance(sD, str):
+                sD = {"smarts": sD}
+            if not sD.get("smarts"):
+                raise ValueError("SMARTS pattern %d has no smarts" % ii)
+            smartsL.append({"id": str(sD.get("id") or "smarts_%04d" % ii), "smarts": sD["smarts"]})
+        taskL = []
+        for taskD in specD["tasks"]:
+            taskType = taskD.get("type")
+            if taskType not in self.taskTypeList:
+                raise ValueError("Unsupported task type %r (%s)" % (taskType, "|".join(self.taskTypeList)))
+            taskL.append(
+                {
+                    "type": taskType,
+                    "name": taskD.get("name", taskType),
+                    "max_hits": int(taskD.get("max_hits", 50)),
+                    "suppress_metals": bool(taskD.get("suppress_metals", False)),
+                    "normalize": bool(taskD.get("normalize", taskType != "geometry")),
+                }
+            )
+        nameL = [taskD["name"] for taskD in taskL]
+        if len(set(nameL)) != len(nameL):
+            raise ValueError("Task names must be unique %r" % nameL)
+        hasMolTask = any(taskD["type"] != "smarts" for taskD in taskL)
+        if hasMolTask and not (qD["mol_list_path"] or qD["paths"] or qD["bundle_path"]):
+            raise ValueError("Molecule tasks require queries (mol_list_path, paths or bundle_path)")
+        if any(taskD["type"] == "smarts" for taskD in taskL) and not smartsL:
+            raise ValueError("smarts tasks require SMARTS patterns (smarts)")
+        searchOptionsD = dict(specD.get("search_options") or {})
+        searchOptionsD["metadata_table_path"] = absPath(searchOptionsD.get("metadata_table_path"))
+        CcdcResultLayout(searchOptionsD.get("result_layout", "flat"))
+        return {
+            "result_path": absPath(specD["result_path"]),
+            "queries": qD,
+            "smarts": smartsL,
+            "tasks": taskL,
+            "search_options": searchOptionsD,
+            "num_proc": int(specD.get("num_proc", 4)),
+            "max_units_per_worker": specD.get("max_units_per_worker"),
+            "max_worker_rss_mb": specD.get("max_worker_rss_mb"),
+        }
+
+    def __getUnits(self):
+        specD = self.__specD
+        qD = specD["queries"]
+        hasMolTask = any(taskD["type"] != "smarts" for taskD in specD["tasks"])
+        hasSmartsTask = any(taskD["type"] == "smarts" for taskD in specD["tasks"])
+        molL = []
+        if hasMolTask:
+            pathL = list(qD["paths"])
+            if qD["mol_list_path"]:
+                pathL.extend(MarshalUtil().doImport(qD["mol_list_path"], fmt="list"))
+            if qD["mol_list_path"] or qD["paths"]:
+                pathL = pathL[int(qD["start_record"]) - 1 if qD.get("start_record") else 0 : int(qD["end_record"]) if qD.get("end_record") else None]
+            for pth in pathL:
+                molL.append({"kind": "molecule", "query_id": os.path.splitext(os.path.basename(pth))[0], "path": pth, "start": 0, "end": None})
+            if qD["bundle_path"]:
+                for rangeD in openBundle(qD["bundle_path"]).getRanges(recordsPerRange=1, startRecord=qD.get("start_record"), endRecord=qD.get("end_record")):
+                    molL.append({"kind": "molecule", "query_id": rangeD["query_ids"][0], "path": qD["bundle_path"], "start": rangeD["start"], "end": rangeD["end"]})
+        queryIdL = [unitD["query_id"] for unitD in molL]
+        if len(set(queryIdL)) != len(queryIdL):
+            logger.warning(
+                "Duplicate query identifiers (results of later queries replace earlier ones) %r", sorted({queryId for queryId in queryIdL if queryIdL.count(queryId) > 1})
+            )
+        smartsL = [{"kind": "smarts", "query_id": sD["id"], "smarts": sD["smarts"]} for sD in specD["smarts"]] if hasSmartsTask else []
+        #
+        # spread the SMARTS units evenly among the molecule units
+        keyL = [((ii + 0.5) / len(molL), 0, unitD) for ii, unitD in enumerate(molL)] + [((ii + 0.5) / len(smartsL), 1, unitD) for ii, unitD in enumerate(smartsL)]
+        unitL = [unitD for _, _, unitD in sorted(keyL, key=lambda t: (t[0], t[1]))]
+        logger.info("Planned %d units (%d molecules, %d SMARTS patterns)", len(unitL), len(molL), len(smartsL))
+        return unitL
@@ -0,0 +1,228 @@
+##
+# File:    CcdcMetadataTable.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Persistent memory-mapped table of CSD entry metadata used to annotate search hits.
+
+The table is exported once for each CSD release (csd_version()) and holds the R-factor, chemical
+name, temperature, radiation source and publication DOI for each entry, indexed by refcode.  The
+file is opened read-only with mmap, so worker processes on a host share the same pages through
+the operating system page cache, and each lookup is an open addressing hash probe without
+touching the ccdc entry objects.
+
+File layout (little endian):
+
+    header   magic "CCDCMETA", format version, number of slots, number of records, csd version
+    slots    fixed size records (crc32 of the refcode, refcode and string field references, R-factor)
+    heap     utf-8 strings referenced by (offset, length), repeated values are stored once
+
+Building the table from the CSD requires the ccdc API, reading the table does not.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import math
+import mmap
+import os
+import struct
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+
+class CcdcMetadataTable(object):
+    """Persistent memory-mapped table of CSD entry metadata indexed by refcode."""
+
+    magic = b"CCDCMETA"
+    formatVersion = 1
+    # magic, format version, number of slots, number of records, csd version
+    headerStruct = struct.Struct("<8sIII32s")
+    # crc32, refcode (offset, length), r_factor, chemical_name/temperature/radiation_source/doi (offset, length)
+    slotStruct = struct.Struct("<IIIfIIIIIIII")
+    stringFieldL = ["chemical_name", "temperature", "radiation_source", "doi"]
+    noneLength = 0xFFFFFFFF
+
+    def __init__(self, tablePath):
+        """Persistent memory-mapped table of CSD entry metadata.
+
+        Args:
+            tablePath (str): path to the metadata table file
+        """
+        self.__tablePath = tablePath
+        self.__fh = None
+        self.__mm = None
+        self.__numSlots = 0
+        self.__numRecords = 0
+        self.__csdVersion = None
+        self.__heapOffset = 0
+
+    @staticmethod
+    def getTablePath(dirPath, csdVersion):
+        """Return the table path for the input CSD release in the input directory."""
+        return os.path.join(dirPath, "csd-entry-metadata-%s.tbl" % csdVersion)
+
+    def build(self, entryIterable, csdVersion):
+        """Build the table from the input entry metadata.
+
+        Args:
+            entryIterable (iterable): dictionaries {"identifier", "r_factor", "chemical_name", "temperature", "radiation_source", "doi"}
+            csdVersion (str): CSD release version
+
+        Returns:
+            (int): number of records stored
+        """
+        startTime = time.time()
+        recL = []
+        heap = bytearray()
+        heapD = {}
+
+        def putString(val):
+            if val is None:
+                return 0, self.noneLength
+            bV = str(val).encode("utf-8")
+            if bV not in heapD:
+                heapD[bV] = len(heap)
+                heap.extend(bV)
+            return heapD[bV], len(bV)
+
+        for rD in entryIterable:
+            refcode = rD["identifier"]
+            rFactor = rD.get("r_factor")
+            fieldL = [putString(refcode), (float(rFactor) if rFactor is not None else float("nan"),)]
+            fieldL.extend([putString(rD.get(ky)) for ky in self.stringFieldL])
+            recL.append((zlib.crc32(refcode.encode("utf-8")) & 0xFFFFFFFF, fieldL))
+        #
+        # Load factor below 0.5 keeps probe sequences short
+        numSlots = max(8, 2 * len(recL) + 1)
+        slotL = [None] * numSlots
+        for hashVal, fieldL in recL:
+            jj = hashVal % numSlots
+            while slotL[jj] is not None:
+                jj = (jj + 1) % numSlots
+            slotL[jj] = (hashVal, fieldL)
+        #
+        emptySlot = self.slotStruct.pack(0, 0, 0, float("nan"), *([0] * 8))
+        tmpPath = self.__tablePath + ".tmp-%d" % os.getpid()
+        dirPath = os.path.dirname(self.__tablePath)
+        if dirPath and not os.path.exists(dirPath):
+            os.makedirs(dirPath)
+        with open(tmpPath, "wb") as ofh:
+            ofh.write(self.headerStruct.pack(self.magic, self.formatVersion, numSlots, len(recL), str(csdVersion).encode("utf-8")[:32]))
+            for slot in slotL:
+                if slot is None:
+                    ofh.write(emptySlot)
+                    continue
+                hashVal, fieldL = slot
+                (refOff, refLen), (rFactor,) = fieldL[0], fieldL[1]
+                strL = [vv for off, ln in fieldL[2:] for vv in (off, ln)]
+                ofh.write(self.slotStruct.pack(hashVal, refOff, refLen, rFactor, *strL))
+            ofh.write(heap)
+        # replace any existing table atomically (readers keep their current mapping)
+        os.replace(tmpPath, self.__tablePath)
+        logger.info("Built metadata table %s with %d records (%d bytes) in %.2f seconds", self.__tablePath, len(recL), os.path.getsize(self.__tablePath), time.time() - startTime)
+        return len(recL)
+
+    def buildFromCsd(self, database="CSD"):
+        """Build the table from the entries of the input CSD database (requires the ccdc API).
+
+        Returns:
+            (int): number of records stored
+        """
+        from ccdc.io import EntryReader, csd_version  # pylint: disable=import-outside-toplevel
+
+        def entryGen():
+            for entry in EntryReader(database):
+                try:
+                    yield self.getEntryMetadata(entry)
+                except Exception as e:
+                    logger.debug("Skipping entry %r with %s", entry.identifier, str(e))
+
+        return self.build(entryGen(), csd_version())
+
+    @staticmethod
+    def getEntryMetadata(entry):
+        """Return the table fields for the input CSD entry (ccdc.entry.Entry)."""
+        cit = entry.publication
+        return {
+            "identifier": entry.identifier,
+            "r_factor": entry.r_factor,
+            "chemical_name": entry.chemical_name,
+            "temperature": entry.temperature,
+            "radiation_source": entry.radiation_source,
+            "doi": cit.doi if cit else None,
+        }
+
+    def open(self):
+        """Map the table file (read-only).
+
+        Returns:
+            (bool): True for success or False otherwise
+        """
+        try:
+            if self.__mm is not None:
+                return True
+            self.__fh = open(self.__tablePath, "rb")
+            self.__mm = mmap.mmap(self.__fh.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, fmtVersion, self.__numSlots, self.__numRecords, csdVersion = self.headerStruct.unpack_from(self.__mm, 0)
+            if magic != self.magic or fmtVersion != self.formatVersion:
+                raise ValueError("Unsupported metadata table format %r %r" % (magic, fmtVersion))
+            self.__csdVersion = csdVersion.rstrip(b"\x00").decode("utf-8")
+            self.__heapOffset = self.headerStruct.size + self.__numSlots * self.slotStruct.size
+            return True
+        except Exception as e:
+            logger.error("Failing to open metadata table %s with %s", self.__tablePath, str(e))
+            self.close()
+        return False
+
+    def close(self):
+        if self.__mm is not None:
+            self.__mm.close()
+            self.__mm = None
+        if self.__fh is not None:
+            self.__fh.close()
+            self.__fh = None
+
+    def getCsdVersion(self):
+        return self.__csdVersion
+
+    def getRecordCount(self):
+        return self.__numRecords
+
+    def get(self, identifier):
+        """Return the metadata for the input CSD refcode.
+
+        Returns:
+            (dict): {"r_factor", "chemical_name", "temperature", "radiation_source", "doi"} or None if not found
+        """
+        if self.__mm is None and not self.open():
+            return None
+        bId = identifier.encode("utf-8")
+        hashVal = zlib.crc32(bId) & 0xFFFFFFFF
+        jj = hashVal % self.__numSlots
+        for _ in range(self.__numSlots):
+            slotL = self.slotStruct.unpack_from(self.__mm, self.headerStruct.size + jj * self.slotStruct.size)
+            if slotL[2] == 0:
+                return None
+            if slotL[0] == hashVal and self.__getString(slotL[1], slotL[2]) == identifier:
+                rD = {"r_factor": None if math.isnan(slotL[3]) else round(slotL[3], 4)}
+                for ii, ky in enumerate(self.stringFieldL):
+                    rD[ky] = self.__getString(slotL[4 + 2 * ii], slotL[5 + 2 * ii])
+                return rD
+            jj = (jj + 1) % self.__numSlots
+        return None
+
+    def __getString(self, offset, length):
+        if length == self.noneLength:
+            return None
+        start = self.__heapOffset + offset
+        return self.__mm[start : start + length].decode("utf-8")
@@ -0,0 +1,214 @@
+##
+# File:    CcdcProfiler.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#   18-Oct-2026 jdw accept the query result directory as queryDir (hashed result layout)
+#   18-Oct-2026 jdw skip incomplete summary lines in getReport()
+#
+##
+"""
+Opt-in per-query profiler with a run-level report of the slowest queries.
+
+Each query is run under cProfile.  The elapsed time, size and hit count of every query are
+appended to a JSON-lines summary file in the result directory (query-profiles-<host>-<pid>.jsonl,
+one file per process so concurrent workers do not share a file).  The profile of a query taking
+longer than the threshold is stored next to its results (<queryId>-profile.pstats, readable with
+pstats or snakeviz) and its summary record also holds the functions with the largest own time and
+the dominant call stack (the chain of calls holding the largest share of the elapsed time).
+
+getReport() and writeReport() collect the summary files written by all processes of a run and
+report the top-N slowest queries.
+
+This module does not depend on the ccdc API.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import cProfile
+import contextlib
+import glob
+import json
+import logging
+import os
+import pstats
+import socket
+import time
+
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+
+logger = logging.getLogger(__name__)
+
+
+def _getFuncLabel(func):
+    fileName, lineNumber, funcName = func
+    if fileName == "~":
+        return funcName
+    return "%s:%d(%s)" % (os.path.basename(fileName), lineNumber, funcName)
+
+
+class CcdcProfiler(object):
+    """Opt-in per-query profiler storing the profiles of queries exceeding a latency threshold."""
+
+    summaryPrefix = "query-profiles-"
+
+    def __init__(self, thresholdSeconds=10.0, numFunctions=10, maxStackDepth=25, verbose=True):
+        """Opt-in per-query profiler.
+
+        Args:
+            thresholdSeconds (float, optional): store the profile of queries taking at least this time (seconds). Defaults to 10.0.
+            numFunctions (int, optional): number of functions with the largest own time recorded for a slow query. Defaults to 10.
+            maxStackDepth (int, optional): maximum depth of the recorded dominant call stack. Defaults to 25.
+            verbose (bool, optional): verbose logging. Defaults to True.
+        """
+        self.__thresholdSeconds = float(thresholdSeconds)
+        self.__numFunctions = numFunctions
+        self.__maxStackDepth = maxStackDepth
+        self.__verbose = verbose
+        self.__active = False
+        self.__summaryFileName = "%s%s-%d.jsonl" % (self.summaryPrefix, socket.gethostname().split(".")[0], os.getpid())
+
+    @contextlib.contextmanager
+    def profile(self, queryTargetId, resultPath, queryDir=True):
+        """Profile the enclosed query and record its timing in the summary file in resultPath.
+
+        The context value is a dictionary in which the caller may record details of the query
+        (e.g. search_type, num_atoms, num_hits) stored with the timing.  Nested queries are
+        timed with the enclosing query.
+
+        Args:
+            queryTargetId (str): query identifier
+            resultPath (str): output path to results (holding the summary file)
+            queryDir (bool or str, optional): store the profile in <resultPath>/<queryId>/, in this query result directory (str)
+                or in resultPath (False). Defaults to True.
+
+        Yields:
+            (dict): query details recorded with the timing
+        """
+        infoD = {}
+        if self.__active:
+            yield infoD
+            return
+        self.__active = True
+        pr = cProfile.Profile()
+        startTime = time.time()
+        pr.enable()
+        try:
+            yield infoD
+        finally:
+            pr.disable()
+            self.__active = False
+            try:
+                self.__record(pr, queryTargetId, resultPath, queryDir, time.time() - startTime, infoD)
+            except Exception as e:
+                logger.exception("Failing for %r with %s", queryTargetId, str(e))
+
+    def __record(self, pr, queryTargetId, resultPath, queryDir, elapsed, infoD):
+        rD = {"target_id": queryTargetId, "seconds": round(elapsed, 4)}
+        rD.update(infoD)
+        rD.update({"host": socket.gethostname(), "pid": os.getpid(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime())})
+        if elapsed >= self.__thresholdSeconds:
+            if isinstance(queryDir, str):
+                dirPath = queryDir
+            else:
+                dirPath = os.path.join(resultPath, queryTargetId) if queryDir else resultPath
+            profilePath = os.path.join(dirPath, queryTargetId + "-profile.pstats")
+            MarshalUtil().mkdir(dirPath)
+            pr.dump_stats(profilePath)
+            statD = pstats.Stats(pr).stats
+            rD["profile_path"] = profilePath
+            rD["top_functions"] = self.__getTopFunctions(statD)
+            rD["dominant_stack"] = self.__getDominantStack(statD, elapsed)
+            if self.__verbose:
+                logger.info("Query %s took %.3f seconds (threshold %.3f) profile %s", queryTargetId, elapsed, self.__thresholdSeconds, profilePath)
+        MarshalUtil().mkdir(resultPath)
+        with open(os.path.join(resultPath, self.__summaryFileName), "a") as ofh:
+            ofh.write(json.dumps(rD) + "\n")
+
+    def __getTopFunctions(self, statD):
+        """Return the functions with the largest own time."""
+        rL = []
+        for func, (_, nc, tt, ct, _) in sorted(statD.items(), key=lambda t: t[1][2], reverse=True)[: self.__numFunctions]:
+            rL.append({"function": _getFuncLabel(func), "num_calls": nc, "own_seconds": round(tt, 4), "cumulative_seconds": round(ct, 4)})
+        return rL
+
+    def __getDominantStack(self, statD, elapsed):
+        """Return the chain of calls from the costliest top-level call following the costliest callee at each level."""
+        calleeD = {}
+        rootL = []
+        for func, (_, _, _, ct, callerD) in statD.items():
+            if not callerD:
+                rootL.append((ct, func))
+            for caller, cT in callerD.items():
+                calleeD.setdefault(caller, []).append((cT[3], func))
+        if not rootL:
+            return []
+        ct, func = max(rootL)
+        rL = []
+        visitedS = set()
+        while func not in visitedS and len(rL) < self.__maxStackDepth:
+            visitedS.add(func)
+            rL.append({"function": _getFuncLabel(func), "cumulative_seconds": round(ct, 4), "fraction": round(ct / elapsed, 3) if elapsed else None})
+            if not calleeD.get(func):
+                break
+            ct, func = max(calleeD[func])
+            # stop where no single callee holds a significant share of the query time
+            if ct < 0.05 * elapsed:
+                break
+        return rL
+
+    @classmethod
+    def getReport(cls, resultPath, topN=20):
+        """Collect the query summary files written in resultPath (or its subdirectories) and report the slowest queries.
+
+        Args:
+            resultPath (str): output path to results
+            topN (int, optional): number of slowest queries reported. Defaults to 20.
+
+        Returns:
+            (dict): {"num_queries", "num_profiled", "total_seconds", "slowest": [query summary record, ...]}
+        """
+        recL = []
+        pattern = cls.summaryPrefix + "*.jsonl"
+        for fp in sorted(glob.glob(os.path.join(resultPath, pattern)) + glob.glob(os.path.join(resultPath, "*", pattern))):
+            with open(fp, "r") as ifh:
+                for line in ifh:
+                    try:
+                        recL.append(json.loads(line))
+                    except ValueError:
+                        # a blank line or an incomplete line from a process still writing its summary
+                        continue
+        recL.sort(key=lambda rD: rD["seconds"], reverse=True)
+        return {
+            "num_queries": len(recL),
+            "num_profiled": len([rD for rD in recL if "profile_path" in rD]),
+            "total_seconds": round(sum(rD["seconds"] for rD in recL), 4),
+            "slowest": recL[:topN],
+        }
+
+    @classmethod
+    def writeReport(cls, resultPath, reportPath=None, topN=20):
+        """Write the report of the slowest queries of a run (JSON) and log a summary.
+
+        Args:
+            resultPath (str): output path to results
+            reportPath (str, optional): report path. Defaults to <resultPath>/query-profile-report.json.
+            topN (int, optional): number of slowest queries reported. Defaults to 20.
+
+        Returns:
+            (dict): report as from getReport()
+        """
+        reportD = cls.getReport(resultPath, topN=topN)
+        reportPath = reportPath if reportPath else os.path.join(resultPath, "query-profile-report.json")
+        ok = MarshalUtil().doExport(reportPath, reportD, fmt="json", indent=3)
+        logger.info(
+            "Wrote profile report (%r) to %s (%d queries, %d profiled, %.2f seconds)", ok, reportPath, reportD["num_queries"], reportD["num_profiled"], reportD["total_seconds"]
+        )
+        for ii, rD in enumerate(reportD["slowest"], 1):
+            stackL = rD.get("dominant_stack")
+            logger.info("(%d) %s %.3f seconds hits %r %s", ii, rD["target_id"], rD["seconds"], rD.get("num_hits"), stackL[-1]["function"] if stackL else "")
+        return reportD
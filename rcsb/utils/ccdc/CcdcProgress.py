@@ -0,0 +1,261 @@
+##
+# File:    CcdcProgress.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Live progress and throughput aggregation for multiprocess searches.
+
+Search workers (e.g. the ccdc_search_cli subprocesses of CcdcSearchExecMp) publish a small JSON
+event as each query completes (CcdcProgressPublisher) to a local UDP channel.  The parent process
+runs a monitor (CcdcProgressMonitor) receiving the events in a background thread and periodically
+writing a status JSON file with the completed/total counts, the overall and recent throughput
+(queries per second), an estimated time to completion and the utilization of each worker (the
+fraction of its elapsed time spent in queries) with the time since its last event to spot stalls.
+
+Publishing is best effort: events are dropped rather than slowing or failing a search.
+
+This module does not depend on the ccdc API.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import collections
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+
+logger = logging.getLogger(__name__)
+
+
+class CcdcProgressPublisher(object):
+    """Publish query progress events to a progress monitor (CcdcProgressMonitor)."""
+
+    def __init__(self, address, worker=None):
+        """Publish query progress events.
+
+        Args:
+            address (str): monitor address (host:port as from CcdcProgressMonitor.getAddress())
+            worker (str, optional): worker name reported with each event. Defaults to None (host-pid).
+        """
+        host, port = address.rsplit(":", 1)
+        self.__address = (host, int(port))
+        self.__worker = worker if worker else "%s-%d" % (socket.gethostname().split(".")[0], os.getpid())
+        self.__sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def queryDone(self, queryTargetId, numHits, seconds, error=None):
+        """Publish the completion of a query.
+
+        Args:
+            queryTargetId (str): query identifier
+            numHits (int): number of matches
+            seconds (float): query time (seconds)
+            error (str, optional): error message for a failing query. Defaults to None.
+        """
+        self.__publish({"event": "query_done", "query_id": queryTargetId, "num_hits": numHits, "seconds": round(seconds, 4), "error": error})
+
+    def close(self):
+        self.__sock.close()
+
+    def __publish(self, eventD):
+        eventD.update({"worker": self.__worker, "pid": os.getpid(), "time": time.time()})
+        try:
+            self.__sock.sendto(json.dumps(eventD).encode("utf-8"), self.__address)
+        except Exception as e:
+            logger.debug("Dropping progress event with %s", str(e))
+
+
+class CcdcProgressMonitor(object):
+    """Aggregate query progress events from search workers into a periodically written status file."""
+
+    def __init__(self, numTotal, statusPath, interval=5.0, recentSeconds=60.0, host="127.0.0.1", verbose=True):
+        """Aggregate query progress events.
+
+        Args:
+            numTotal (int): total number of queries in the run
+            statusPath (str): status JSON file path
+            interval (float, optional): status file update interval (seconds). Defaults to 5.0.
+            recentSeconds (float, optional): window of the recent throughput (seconds). Defaults to 60.0.
+            host (str, optional): local address receiving events. Defaults to "127.0.0.1".
+            verbose (bool, optional): verbose logging. Defaults to True.
+        """
+        self.__numTotal = numTotal
+        self.__statusPath = statusPath
+        self.__interval = interval
+        self.__recentSeconds = recentSeconds
+        self.__verbose = verbose
+        self.__lock = threading.Lock()
+        self.__stopEvent = threading.Event()
+        self.__thread = None
+        self.__startTime = time.time()
+        self.__lastEventTime = None
+        self.__numCompleted = 0
+        self.__numMatched = 0
+        self.__numFailed = 0
+        self.__recentQ = collections.deque()
+        self.__workerD = {}
+        self.__sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.__sock.bind((host, 0))
+        self.__sock.settimeout(min(0.5, interval))
+
+    def getAddress(self):
+        """Return the address (host:port) to which workers publish events."""
+        host, port = self.__sock.getsockname()[:2]
+        return "%s:%d" % (host, port)
+
+    def start(self):
+        """Start receiving events and writing the status file."""
+        self.__startTime = time.time()
+        self.__thread = threading.Thread(target=self.__run, name="CcdcProgressMonitor", daemon=True)
+        self.__thread.start()
+        logger.info("Progress monitor at %s writing %s every %.1f seconds", self.getAddress(), self.__statusPath, self.__interval)
+
+    def stop(self):
+        """Receive any pending events, write the final status and stop the monitor.
+
+        Returns:
+            (dict): final status as from getStatus()
+        """
+        if self.__thread is not None:
+            self.__stopEvent.set()
+            self.__thread.join()
+            self.__thread = None
+        self.__sock.setblocking(False)
+        try:
+            while True:
+                self.__receive()
+        except (BlockingIOError, socket.timeout):
+            pass
+        self.__sock.close()
+        statusD = self.__writeStatus(state="completed")
+        logger.info(
+            "Progress completed %d/%d (matched %d failed %d) at %.3f queries per second",
+            statusD["num_completed"],
+            self.__numTotal,
+            statusD["num_matched"],
+            statusD["num_failed"],
+            statusD["queries_per_second"],
+        )
+        return statusD
+
+    def update(self, eventD):
+        """Add a progress event (as published by CcdcProgressPublisher).
+
+        Args:
+            eventD (dict): progress event
+        """
+        if eventD.get("event") != "query_done":
+            return
+        now = time.time()
+        with self.__lock:
+            self.__lastEventTime = now
+            self.__numCompleted += 1
+            if eventD.get("error"):
+                self.__numFailed += 1
+            elif eventD.get("num_hits"):
+                self.__numMatched += 1
+            self.__recentQ.append(now)
+            wD = self.__workerD.setdefault(eventD.get("worker"), {"num_completed": 0, "num_matched": 0, "busy_seconds": 0.0, "first_time": now - (eventD.get("seconds") or 0.0)})
+            wD["num_completed"] += 1
+            wD["num_matched"] += 1 if eventD.get("num_hits") and not eventD.get("error") else 0
+            wD["busy_seconds"] += eventD.get("seconds") or 0.0
+            wD["last_time"] = now
+            wD["last_query_id"] = eventD.get("query_id")
+            wD["pid"] = eventD.get("pid")
+
+    def getStatus(self):
+        """Return the current progress status.
+
+        Returns:
+            (dict): {"state", "num_total", "num_completed", "num_matched", "num_failed", "fraction_complete", "elapsed_seconds",
+                     "queries_per_second", "recent_queries_per_second", "eta_seconds", "seconds_since_last_event", "workers"}
+        """
+        now = time.time()
+        with self.__lock:
+            while self.__recentQ and self.__recentQ[0] < now - self.__recentSeconds:
+                self.__recentQ.popleft()
+            elapsed = now - self.__startTime
+            rate = self.__numCompleted / elapsed if elapsed > 0 else 0.0
+            recentRate = len(self.__recentQ) / min(self.__recentSeconds, elapsed) if elapsed > 0 else 0.0
+            etaRate = recentRate if recentRate > 0 else rate
+            numRemaining = max(0, self.__numTotal - self.__numCompleted)
+            workerD = {}
+            for worker, wD in sorted(self.__workerD.items()):
+                span = now - wD["first_time"]
+                workerD[worker] = {
+                    "num_completed": wD["num_completed"],
+                    "num_matched": wD["num_matched"],
+                    "busy_seconds": round(wD["busy_seconds"], 4),
+                    "utilization": round(min(1.0, wD["busy_seconds"] / span), 3) if span > 0 else None,
+                    "seconds_since_last_event": round(now - wD["last_time"], 3),
+                    "last_query_id": wD["last_query_id"],
+                    "pid": wD["pid"],
+                }
+            return {
+                "state": "running",
+                "update_time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)),
+                "num_total": self.__numTotal,
+                "num_completed": self.__numCompleted,
+                "num_matched": self.__numMatched,
+                "num_failed": self.__numFailed,
+                "fraction_complete": round(self.__numCompleted / self.__numTotal, 4) if self.__numTotal else None,
+                "elapsed_seconds": round(elapsed, 3),
+                "queries_per_second": round(rate, 4),
+                "recent_queries_per_second": round(recentRate, 4),
+                "eta_seconds": round(numRemaining / etaRate, 1) if etaRate > 0 else None,
+                "seconds_since_last_event": round(now - self.__lastEventTime, 3) if self.__lastEventTime else None,
+                "num_workers": len(workerD),
+                "workers": workerD,
+            }
+
+    def __receive(self):
+        data, _ = self.__sock.recvfrom(65536)
+        try:
+            self.update(json.loads(data.decode("utf-8")))
+        except ValueError as e:
+            logger.warning("Ignoring progress event with %s", str(e))
+
+    def __writeStatus(self, state="running"):
+        statusD = self.getStatus()
+        statusD["state"] = state
+        try:
+            tmpPath = self.__statusPath + ".tmp"
+            MarshalUtil().doExport(tmpPath, statusD, fmt="json", indent=3)
+            os.replace(tmpPath, self.__statusPath)
+        except Exception as e:
+            logger.exception("Failing writing %s with %s", self.__statusPath, str(e))
+        return statusD
+
+    def __run(self):
+        lastWriteTime = 0.0
+        while not self.__stopEvent.is_set():
+            try:
+                self.__receive()
+            except socket.timeout:
+                pass
+            except OSError as e:
+                logger.exception("Progress monitor failing with %s", str(e))
+                break
+            if time.time() - lastWriteTime >= self.__interval:
+                statusD = self.__writeStatus()
+                lastWriteTime = time.time()
+                if self.__verbose:
+                    logger.info(
+                        "Progress %d/%d (%.3f queries per second, eta %r seconds, %d workers)",
+                        statusD["num_completed"],
+                        self.__numTotal,
+                        statusD["recent_queries_per_second"],
+                        statusD["eta_seconds"],
+                        statusD["num_workers"],
+                    )
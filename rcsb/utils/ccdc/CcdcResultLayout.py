@@ -0,0 +1,191 @@
+##
+# File:    CcdcResultLayout.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Flat or hash-sharded directory layout of per-query search results with a top-level result manifest.
+
+In the flat layout (the default) the results of each query are stored in <resultPath>/<queryId>/.
+In the hashed layout they are stored under two levels of prefix directories taken from the SHA-1
+hash of the query identifier, <resultPath>/<h[0:2]>/<h[2:4]>/<queryId>/, so no directory holds more
+than 256 entries at the upper levels and a few queries at the lowest level even for hundreds of
+thousands of queries.  The location of a query is computed from its identifier, and the layout is
+recorded in <resultPath>/result-layout.json so that readers pick it up from the result path.
+
+The query identifiers with stored results and their locations are recorded in the result manifest
+<resultPath>/result-manifest.json, so the results of a run are listed and loaded without scanning
+directories.  Each process appends the queries it stores to its own part file
+(result-manifest-<host>-<pid>.jsonl, so concurrent writers do not share a file); writeManifest()
+combines the part files into the result manifest when the writers are done, and getManifest() reads
+the result manifest together with any part files not yet combined.
+
+This module does not depend on the ccdc API.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import time
+
+from rcsb.utils.ccdc.CcdcFileUtils import CcdcFileUtils
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+
+logger = logging.getLogger(__name__)
+
+
+class CcdcResultLayout(object):
+    """Flat or hash-sharded directory layout of per-query results with a top-level result manifest."""
+
+    layoutList = ["flat", "hashed"]
+    layoutFileName = "result-layout.json"
+    manifestFileName = "result-manifest.json"
+    partPrefix = "result-manifest-"
+
+    def __init__(self, layout="flat"):
+        """Directory layout of per-query results.
+
+        Args:
+            layout (str, optional): result directory layout (flat|hashed). Defaults to "flat".
+        """
+        if layout not in self.layoutList:
+            raise ValueError("Unsupported result layout %r (%s)" % (layout, "|".join(self.layoutList)))
+        self.__layout = layout
+        self.__partFileName = "%s%s-%d.jsonl" % (self.partPrefix, socket.gethostname().split(".")[0], os.getpid())
+        self.__registeredS = set()
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def fromResultPath(cls, resultPath):
+        """Return the layout recorded in the result path (flat when none is recorded)."""
+        layoutPath = os.path.join(resultPath, cls.layoutFileName)
+        layout = "flat"
+        if os.access(layoutPath, os.R_OK):
+            layout = (MarshalUtil().doImport(layoutPath, fmt="json") or {}).get("layout", "flat")
+        return cls(layout)
+
+    def getLayout(self):
+        return self.__layout
+
+    @staticmethod
+    def getPrefix(queryTargetId):
+        """Return the two-level hashed prefix directory of the input query identifier (e.g. 'a3/5f')."""
+        hashId = hashlib.sha1(queryTargetId.encode("utf-8")).hexdigest()
+        return os.path.join(hashId[0:2], hashId[2:4])
+
+    def getRelativePath(self, queryTargetId):
+        """Return the query result directory relative to the result path."""
+        if self.__layout == "hashed":
+            return os.path.join(self.getPrefix(queryTargetId), queryTargetId)
+        return queryTargetId
+
+    def getQueryPath(self, resultPath, queryTargetId):
+        """Return the result directory of the input query."""
+        return os.path.join(resultPath, self.getRelativePath(queryTargetId))
+
+    def getIndexPath(self, resultPath, queryTargetId):
+        """Return the match index path of the input query (without any compression suffix)."""
+        return os.path.join(self.getQueryPath(resultPath, queryTargetId), queryTargetId + "-index.json")
+
+    def register(self, resultPath, queryTargetId):
+        """Record the input query in the result manifest part file of this process (hashed layout).
+
+        The layout file is written with the first query stored in the result path.
+        """
+        if self.__layout != "hashed":
+            return False
+        with self.__lock:
+            if (resultPath, queryTargetId) in self.__registeredS:
+                return True
+            try:
+                mU = MarshalUtil()
+                layoutPath = os.path.join(resultPath, self.layoutFileName)
+                if not os.access(layoutPath, os.R_OK):
+                    mU.mkdir(resultPath)
+                    mU.doExport(layoutPath, {"layout": self.__layout, "levels": 2, "width": 2, "hash": "sha1"}, fmt="json", indent=3)
+                with open(os.path.join(resultPath, self.__partFileName), "a") as ofh:
+                    ofh.write(json.dumps({"query_id": queryTargetId, "path": self.getRelativePath(queryTargetId)}) + "\n")
+                self.__registeredS.add((resultPath, queryTargetId))
+                return True
+            except Exception as e:
+                logger.exception("Failing for %r in %s with %s", queryTargetId, resultPath, str(e))
+        return False
+
+    @classmethod
+    def getManifest(cls, resultPath):
+        """Return the query identifiers and result directories (relative to the result path) recorded in the result manifest
+        and in any part files not yet combined.
+
+        Returns:
+            (dict): {queryId: relative result directory, ...}
+        """
+        queryD = {}
+        manifestPath = os.path.join(resultPath, cls.manifestFileName)
+        if os.access(manifestPath, os.R_OK):
+            queryD.update((MarshalUtil().doImport(manifestPath, fmt="json") or {}).get("queries", {}))
+        for pth in sorted(glob.glob(os.path.join(resultPath, cls.partPrefix + "*.jsonl"))):
+            with open(pth, "r") as ifh:
+                for line in ifh:
+                    try:
+                        rD = json.loads(line)
+                        queryD[rD["query_id"]] = rD["path"]
+                    except (ValueError, KeyError):
+                        # an incomplete line from a writer that was interrupted
+                        continue
+        return queryD
+
+    @classmethod
+    def writeManifest(cls, resultPath):
+        """Combine the part files of all processes into the result manifest <resultPath>/result-manifest.json.
+
+        Call when no process is writing to the result path; the combined part files are removed.
+
+        Returns:
+            (dict): result manifest {"layout", "created", "num_queries", "queries": {queryId: relative result directory, ...}}
+        """
+        partL = sorted(glob.glob(os.path.join(resultPath, cls.partPrefix + "*.jsonl")))
+        queryD = cls.getManifest(resultPath)
+        mD = {
+            "layout": cls.fromResultPath(resultPath).getLayout(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+            "num_queries": len(queryD),
+            "queries": dict(sorted(queryD.items())),
+        }
+        ok = MarshalUtil().doExport(os.path.join(resultPath, cls.manifestFileName), mD, fmt="json", indent=3)
+        if ok:
+            for pth in partL:
+                os.remove(pth)
+        logger.info("Wrote result manifest (%r) for %d queries combining %d part files in %s", ok, len(queryD), len(partL), resultPath)
+        return mD
+
+    @classmethod
+    def getIndexPaths(cls, resultPath):
+        """Return the match index paths (without any compression suffix) of the queries stored in the result path.
+
+        Queries are listed from the result manifest in the hashed layout and from the result directories in the flat layout.
+        """
+        if cls.fromResultPath(resultPath).getLayout() == "hashed":
+            fileU = CcdcFileUtils()
+            pathL = [os.path.join(resultPath, relPath, queryTargetId + "-index.json") for queryTargetId, relPath in sorted(cls.getManifest(resultPath).items())]
+            return [pth for pth in pathL if fileU.exists(pth)]
+        pathL = []
+        pathS = set()
+        for pth in sorted(glob.glob(os.path.join(resultPath, "*", "*-index.json*"))):
+            indexPath = re.sub(r"\.(gz|zst)$", "", pth)
+            if indexPath not in pathS:
+                pathS.add(indexPath)
+                pathL.append(indexPath)
+        return pathL
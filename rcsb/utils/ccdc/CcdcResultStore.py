@@ -0,0 +1,219 @@
+##
+# File:    CcdcResultStore.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#   18-Oct-2026 jdw import the match indices of the result layout of the result path (CcdcResultLayout)
+#
+##
+"""
+Run-wide SQLite store of search matches with batched inserts from concurrent workers.
+
+Match index records (CcdcMatchIndexInst) are buffered by each writer and inserted in bulk
+transactions into a WAL-mode SQLite database, so several worker processes can write to the
+store while readers query it.  Matches are indexed by query identifier, CSD identifier, match
+type and similarity score.  Records are keyed on the query, CSD identifier, match type and match
+number, so repeated searches replace rather than duplicate their matches.
+
+This module does not depend on the ccdc API.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import json
+import logging
+import os
+import sqlite3
+import time
+
+from rcsb.utils.ccdc.CcdcFileUtils import CcdcFileUtils
+from rcsb.utils.ccdc.CcdcResultLayout import CcdcResultLayout
+
+logger = logging.getLogger(__name__)
+
+
+class CcdcResultStore(object):
+    """Run-wide SQLite store of search matches."""
+
+    columnL = [
+        "target_id",
+        "identifier",
+        "match_type",
+        "match_number",
+        "similarity",
+        "r_factor",
+        "match_atoms",
+        "chemical_name",
+        "temperature",
+        "radiation_source",
+        "has_disorder",
+        "doi",
+        "csd_version",
+        "mol2_file_path",
+        "mol_file_path",
+    ]
+    schemaL = [
+        """CREATE TABLE IF NOT EXISTS match (
+            target_id TEXT NOT NULL, identifier TEXT NOT NULL, match_type TEXT NOT NULL, match_number INTEGER NOT NULL,
+            similarity REAL, r_factor REAL, match_atoms INTEGER, chemical_name TEXT, temperature TEXT, radiation_source TEXT,
+            has_disorder TEXT, doi TEXT, csd_version TEXT, mol2_file_path TEXT, mol_file_path TEXT, row_json TEXT,
+            PRIMARY KEY (target_id, identifier, match_type, match_number))""",
+        "CREATE INDEX IF NOT EXISTS match_identifier ON match (identifier)",
+        "CREATE INDEX IF NOT EXISTS match_type_similarity ON match (match_type, similarity)",
+        """CREATE TABLE IF NOT EXISTS query (
+            target_id TEXT NOT NULL, match_type TEXT NOT NULL, num_hits INTEGER, updated REAL,
+            PRIMARY KEY (target_id, match_type))""",
+    ]
+
+    def __init__(self, dbPath, batchSize=500, timeout=120.0):
+        """Run-wide SQLite store of search matches.
+
+        Args:
+            dbPath (str): path to the SQLite database file (created if missing)
+            batchSize (int, optional): number of buffered records inserted in each transaction. Defaults to 500.
+            timeout (float, optional): seconds to wait for a write lock held by another writer. Defaults to 120.0.
+        """
+        self.__dbPath = dbPath
+        self.__batchSize = max(1, int(batchSize))
+        self.__timeout = timeout
+        self.__conn = None
+        self.__matchBufL = []
+        self.__queryBufL = []
+
+    def __connect(self):
+        if self.__conn is None:
+            dirPath = os.path.dirname(self.__dbPath)
+            if dirPath and not os.path.exists(dirPath):
+                os.makedirs(dirPath, exist_ok=True)
+            self.__conn = sqlite3.connect(self.__dbPath, timeout=self.__timeout)
+            self.__conn.execute("PRAGMA journal_mode=WAL")
+            self.__conn.execute("PRAGMA synchronous=NORMAL")
+            with self.__conn:
+                for sql in self.schemaL:
+                    self.__conn.execute(sql)
+        return self.__conn
+
+    def addMatches(self, rowList, queryTargetId=None, matchType=None):
+        """Buffer match index records (dictionaries as from CcdcMatchIndexInst.get()) for insertion.
+
+        Args:
+            rowList (list): match index records
+            queryTargetId (str, optional): record the query as searched with the number of matching entries. Defaults to None.
+            matchType (str, optional): match type recorded for the query. Defaults to None.
+        """
+        simIndex = self.columnL.index("similarity")
+        for row in rowList:
+            valL = [row.get(ky) for ky in self.columnL]
+            valL[simIndex] = row.get("similarity_score", row.get("similarity"))
+            self.__matchBufL.append(tuple(valL) + (json.dumps(row),))
+        if queryTargetId:
+            numHits = len({row.get("identifier") for row in rowList})
+            self.__queryBufL.append((queryTargetId, matchType or "", numHits, time.time()))
+        if len(self.__matchBufL) >= self.__batchSize:
+            self.flush()
+
+    def flush(self):
+        """Insert the buffered records in a single transaction.
+
+        Returns:
+            (int): number of match records inserted
+        """
+        if not self.__matchBufL and not self.__queryBufL:
+            return 0
+        numRows = len(self.__matchBufL)
+        conn = self.__connect()
+        sqlM = "INSERT OR REPLACE INTO match (%s, row_json) VALUES (%s)" % (", ".join(self.columnL), ", ".join(["?"] * (len(self.columnL) + 1)))
+        with conn:
+            conn.executemany(sqlM, self.__matchBufL)
+            conn.executemany("INSERT OR REPLACE INTO query (target_id, match_type, num_hits, updated) VALUES (?, ?, ?, ?)", self.__queryBufL)
+        self.__matchBufL = []
+        self.__queryBufL = []
+        logger.debug("Inserted %d match records in %s", numRows, self.__dbPath)
+        return numRows
+
+    def close(self):
+        """Flush any buffered records and close the connection."""
+        try:
+            self.flush()
+        finally:
+            if self.__conn is not None:
+                self.__conn.close()
+                self.__conn = None
+
+    def importIndexFiles(self, resultPath):
+        """Load the (plain or compressed) match indices stored in <resultPath>/<queryId>/<queryId>-index.json
+        (or listed in the result manifest of a hashed result layout).
+
+        Returns:
+            (int): number of match records loaded
+        """
+        fileU = CcdcFileUtils()
+        numRows = 0
+        pathL = CcdcResultLayout.getIndexPaths(resultPath)
+        for indexPath in pathL:
+            rowL = fileU.readJson(indexPath) or []
+            for matchType in sorted({row.get("match_type") for row in rowL}):
+                mRowL = [row for row in rowL if row.get("match_type") == matchType]
+                self.addMatches(mRowL, queryTargetId=mRowL[0].get("target_id"), matchType=matchType)
+            numRows += len(rowL)
+        self.flush()
+        logger.info("Loaded %d match records from %d match indices in %s", numRows, len(pathL), resultPath)
+        return numRows
+
+    def getQueryIds(self, identifier, matchType=None):
+        """Return the query identifiers matching the input CSD identifier (reverse lookup)."""
+        sql = "SELECT DISTINCT target_id FROM match WHERE identifier = ?"
+        argL = [identifier]
+        if matchType:
+            sql += " AND match_type = ?"
+            argL.append(matchType)
+        return [row[0] for row in self.__connect().execute(sql + " ORDER BY target_id", argL)]
+
+    def getIdentifiers(self, queryTargetId, matchType=None):
+        """Return the CSD identifiers matching the input query."""
+        sql = "SELECT DISTINCT identifier FROM match WHERE target_id = ?"
+        argL = [queryTargetId]
+        if matchType:
+            sql += " AND match_type = ?"
+            argL.append(matchType)
+        return [row[0] for row in self.__connect().execute(sql + " ORDER BY identifier", argL)]
+
+    def getMatches(self, queryTargetId=None, identifier=None, matchType=None, minSimilarity=None):
+        """Return the match index records selected by the input criteria.
+
+        Returns:
+            (list): match index records (dictionaries as from CcdcMatchIndexInst.get())
+        """
+        whereL, argL = self.__getWhere(queryTargetId, identifier, matchType, minSimilarity)
+        sql = "SELECT row_json FROM match%s ORDER BY target_id, match_type, identifier, match_number" % whereL
+        return [json.loads(row[0]) for row in self.__connect().execute(sql, argL)]
+
+    def count(self, queryTargetId=None, identifier=None, matchType=None, minSimilarity=None):
+        """Return the number of match records selected by the input criteria."""
+        whereL, argL = self.__getWhere(queryTargetId, identifier, matchType, minSimilarity)
+        return self.__connect().execute("SELECT COUNT(*) FROM match%s" % whereL, argL).fetchone()[0]
+
+    def getQueryCounts(self, matchType=None):
+        """Return the number of matching entries recorded for each searched query {queryTargetId: numHits, ...}."""
+        sql = "SELECT target_id, SUM(num_hits) FROM query"
+        argL = []
+        if matchType:
+            sql += " WHERE match_type = ?"
+            argL.append(matchType)
+        return {row[0]: row[1] for row in self.__connect().execute(sql + " GROUP BY target_id", argL)}
+
+    def __getWhere(self, queryTargetId, identifier, matchType, minSimilarity):
+        condL = []
+        argL = []
+        for col, val in [("target_id", queryTargetId), ("identifier", identifier), ("match_type", matchType)]:
+            if val is not None:
+                condL.append("%s = ?" % col)
+                argL.append(val)
+        if minSimilarity is not None:
+            condL.append("similarity >= ?")
+            argL.append(minSimilarity)
+        return (" WHERE " + " AND ".join(condL) if condL else ""), argL
@@ -10,6 +10,26 @@
 #   22-Jun-2016   jdw  refactor with general index class CcdcMatchIndex -
 #   28-Jul-2017   jdw  Generalize to CcdcSearch.py
 #   28-Jul-2017   jdw  remove parentId ---
+#   18-Oct-2026   jdw  convert string start/end records in getList()
+#   18-Oct-2026   jdw  add searchMulti() sharing query normalization and hit metadata across search types
+#   18-Oct-2026   jdw  add searchSmartsBatch() matching many SMARTS patterns in one database pass
+#   18-Oct-2026   jdw  add opt-in tiered similarity search using the text search on the query names
+#   18-Oct-2026   jdw  add optional gzip/zstd compressed structure and index output written through streaming writers
+#   18-Oct-2026   jdw  add optional content hash deduplication of match components within a query result
+#   18-Oct-2026   jdw  add lazy component mode recording match atom indices and materialize() to write files on demand
+#   18-Oct-2026   jdw  annotate hits from an optional memory-mapped CSD entry metadata table
+#   18-Oct-2026   jdw  add permissive search mode recording entry quality details for later filtering (CcdcHitTable)
+#   18-Oct-2026   jdw  add searchSweep() for several similarity thresholds from a single search at the lowest threshold
+#   18-Oct-2026   jdw  add optional run-wide SQLite result store (CcdcResultStore) and close()
+#   18-Oct-2026   jdw  build immutable CcdcHitRecord records in place of copying CcdcMatchIndexInst for each match component
+#   18-Oct-2026   jdw  add optional bounded background writer (CcdcAsyncWriter) for structure and index output and flush()
+#   18-Oct-2026   jdw  add searchRecord() and searchBundle() for queries in multi-molecule SDF/mol2 bundles and
+#                      count the matches of all entries of a query file in __searchMolecules()
+#   18-Oct-2026   jdw  add opt-in per-query profiling (CcdcProfiler) storing the profiles of slow queries with the results
+#   18-Oct-2026   jdw  import the ccdc API and open the metadata table on the first search (_importCcdc())
+#   18-Oct-2026   jdw  read chemical component definitions (CIF) as in-memory query molecules (CcdcComponentReader)
+#   18-Oct-2026   jdw  add idempotent write mode skipping unchanged output with a per-run change manifest (CcdcChangeManifest)
+#   18-Oct-2026   jdw  add optional hash-sharded result layout with a top-level result manifest (CcdcResultLayout)
 #
 ##
 """
@@ -21,29 +41,201 @@ __author__ = "John Westbrook"
 __email__ = "john.westbrook@rcsb.org"
 __license__ = "Apache 2.0"
 
-# pylint: disable=not-context-manager
+# pylint: disable=not-context-manager,global-statement,redefined-outer-name,import-outside-toplevel
 
-import copy
+import contextlib
+import hashlib
 import logging
+import re
 import time
 import os
 
-from ccdc.io import EntryReader, MoleculeWriter, csd_version, csd_directory
-from ccdc.search import SimilaritySearch, TextNumericSearch, MoleculeSubstructure, SubstructureSearch, SMARTSSubstructure
-
-from rcsb.utils.io.IndexUtils import CcdcMatchIndex, CcdcMatchIndexInst
+from rcsb.utils.ccdc.CcdcAsyncWriter import CcdcAsyncWriter
+from rcsb.utils.ccdc.CcdcChangeManifest import CcdcChangeManifest
+from rcsb.utils.ccdc.CcdcComponentReader import CcdcComponentReader, openBundle
+from rcsb.utils.ccdc.CcdcFileUtils import CcdcFileUtils
+from rcsb.utils.ccdc.CcdcHitRecord import CcdcHitRecord, UNSET
+from rcsb.utils.ccdc.CcdcHitTable import CcdcHitTable
+from rcsb.utils.ccdc.CcdcMetadataTable import CcdcMetadataTable
+from rcsb.utils.ccdc.CcdcProfiler import CcdcProfiler
+from rcsb.utils.ccdc.CcdcResultLayout import CcdcResultLayout
+from rcsb.utils.ccdc.CcdcResultStore import CcdcResultStore
+from rcsb.utils.io.IndexUtils import CcdcMatchIndex
 from rcsb.utils.io.MarshalUtil import MarshalUtil
 
 logger = logging.getLogger(__name__)
 
+# The ccdc API is imported on the first search (_importCcdc()), so this module and getList() may be
+# used for list handling and planning without the cost of initializing the ccdc API and the CSD.
+_CCDC_LOADED = False
+EntryReader = csd_version = csd_directory = Molecule = None
+SimilaritySearch = TextNumericSearch = MoleculeSubstructure = SubstructureSearch = SMARTSSubstructure = None
+
+
+def _importCcdc():
+    """Import the ccdc API classes used in this module (once per process)."""
+    global _CCDC_LOADED, EntryReader, csd_version, csd_directory, Molecule
+    global SimilaritySearch, TextNumericSearch, MoleculeSubstructure, SubstructureSearch, SMARTSSubstructure
+    if _CCDC_LOADED:
+        return
+    startTime = time.time()
+    from ccdc.io import EntryReader, csd_version, csd_directory
+    from ccdc.molecule import Molecule
+    from ccdc.search import SimilaritySearch, TextNumericSearch, MoleculeSubstructure, SubstructureSearch, SMARTSSubstructure
+
+    _CCDC_LOADED = True
+    logger.info("Imported the ccdc API in %.3f seconds", time.time() - startTime)
+
+
+class CcdcCandidateHit(object):
+    """Similarity hit for a candidate entry verified in the fast search tier."""
+
+    __slots__ = ("identifier", "entry", "molecule", "similarity")
+
+    def __init__(self, entry, similarity):
+        self.identifier = entry.identifier
+        self.entry = entry
+        self.molecule = entry.molecule
+        self.similarity = similarity
+
 
 class CcdcSearch(object):
-    def __init__(self, verbose=True, similarityThreshold=0.95, rValueMaxPercent=10.0):
+    def __init__(
+        self,
+        verbose=True,
+        similarityThreshold=0.95,
+        rValueMaxPercent=10.0,
+        tieredSearch=False,
+        compression=None,
+        dedupComponents=None,
+        lazyComponents=False,
+        metadataTablePath=None,
+        permissiveSearch=False,
+        resultStorePath=None,
+        asyncWrite=False,
+        writeQueueSize=64,
+        profileThreshold=None,
+        idempotentWrite=False,
+        hashManifestPath=None,
+        changeManifestPath=None,
+        resultLayout="flat",
+    ):
+        """Chemical component search against the local CCDC.
+
+        Args:
+            verbose (bool, optional): verbose logging. Defaults to True.
+            similarityThreshold (float, optional): similarity search threshold. Defaults to 0.95.
+            rValueMaxPercent (float, optional): maximum R-factor (percent) of matching structures. Defaults to 10.0.
+            tieredSearch (bool, optional): answer similarity searches from candidates of a text search on the
+                query name when possible before a full similarity search.  Identical structures are only found
+                among the text search candidates (no separate identity lookup). Defaults to False.
+            compression (str, optional): compress structure and index output files (gzip|zstd). Compressed
+                files carry a .gz or .zst suffix and may be read with CcdcFileUtils(). Defaults to None.
+            dedupComponents (str, optional): store each unique match component once within a query result and
+                reference it from the index by its content hash (component_hash). Components are compared by
+                their structure file content apart from the title ("exact") or by their canonical SMILES
+                ("chemical"). Defaults to None (write every component).
+            lazyComponents (bool, optional): record the component index and the matched atom indices of substructure
+                matches in the index in place of writing structure files. Files may be written later with
+                materialize(). Defaults to False.
+            metadataTablePath (str, optional): path to a CSD entry metadata table (CcdcMetadataTable) used to annotate
+                hits in place of reading the entry objects.  The table must match the current CSD release. Defaults to None.
+            permissiveSearch (bool, optional): search without the R-factor, disorder, 3D coordinate and metal criteria and
+                record the entry quality details (has_disorder, has_3d_coordinates, is_organic, has_metals) with each
+                hit, so that quality filters may be applied afterwards (CcdcHitTable).  All matches are stored in this
+                mode (maxHits is ignored), so that filtered results are not limited to the first matches. Defaults to False.
+            resultStorePath (str, optional): path to a run-wide SQLite result store (CcdcResultStore) receiving the match
+                records of each search in batches in addition to the match index files. Call flush() or close() to insert
+                the buffered records. Defaults to None.
+            asyncWrite (bool, optional): write structure and index files from a background thread while the next search
+                runs.  Call flush() to wait for pending output and close() when done.  Pending output is also flushed when
+                the interpreter exits. Defaults to False.
+            writeQueueSize (int, optional): maximum number of pending background write operations.  A search producing
+                output faster than it is written waits for the writer (backpressure). Defaults to 64.
+            profileThreshold (float, optional): profile each query (cProfile) and store the profile of queries taking at least
+                this time (seconds) with the query results (CcdcProfiler).  The time, size and hit count of every query
+                are recorded in <resultPath>/query-profiles-<host>-<pid>.jsonl. Defaults to None (no profiling).
+            idempotentWrite (bool, optional): write structure and index files only when their content has changed (CcdcChangeManifest),
+                preserving the modification times of unchanged files.  The match index of a query is replaced (not appended to)
+                by its first write in the run. Defaults to False.
+            hashManifestPath (str, optional): change manifest of a previous run supplying the hashes of existing files in idempotent
+                write mode. Defaults to None (hash the existing files).
+            changeManifestPath (str, optional): path of the change manifest of this run (files added, modified, unchanged and stale)
+                written by close() in idempotent write mode. Defaults to None.
+            resultLayout (str, optional): layout of the query result directories (CcdcResultLayout), <resultPath>/<queryId>/ ("flat")
+                or <resultPath>/<h[0:2]>/<h[2:4]>/<queryId>/ under hashed prefixes of the query identifier ("hashed") with the stored
+                queries recorded in the result manifest. Defaults to "flat".
+        """
         self.__verbose = verbose
         self.__similarityThreshold = similarityThreshold
         self.__rValueMaxPercent = rValueMaxPercent
+        self.__tieredSearch = tieredSearch
+        self.__tierCountD = {"identity": 0, "text": 0, "full": 0}
+        self.__changeManifest = CcdcChangeManifest(hashManifestPath=hashManifestPath) if idempotentWrite else None
+        self.__changeManifestPath = changeManifestPath
+        self.__fileU = CcdcFileUtils(compression=compression, changeManifest=self.__changeManifest)
+        self.__layout = CcdcResultLayout(resultLayout)
+        if dedupComponents not in [None, "exact", "chemical"]:
+            raise ValueError("Unsupported component deduplication mode %r (exact|chemical)" % dedupComponents)
+        self.__dedupComponents = dedupComponents
+        self.__lazyComponents = lazyComponents
+        self.__permissiveSearch = permissiveSearch
+        self.__metadataTablePath = metadataTablePath
+        self.__metaTable = None
+        self.__ccdcReady = False
+        self.__resultStore = CcdcResultStore(resultStorePath) if resultStorePath else None
+        self.__writer = CcdcAsyncWriter(maxQueueSize=writeQueueSize, verbose=verbose) if asyncWrite else None
+        self.__profiler = CcdcProfiler(thresholdSeconds=profileThreshold, verbose=verbose) if profileThreshold is not None else None
+
+    def flush(self):
+        """Wait for any pending background output and insert any buffered records into the result store."""
+        if self.__writer is not None:
+            self.__writer.flush()
+        if self.__resultStore is not None:
+            self.__resultStore.flush()
+
+    def close(self):
+        """Complete any pending background output, flush any buffered records to the result store and write the change manifest."""
+        if self.__writer is not None:
+            self.__writer.close()
+        if self.__resultStore is not None:
+            self.__resultStore.close()
+        if self.__changeManifest is not None and self.__changeManifestPath:
+            self.__changeManifest.write(self.__changeManifestPath)
+
+    def __initCcdc(self):
+        """Import the ccdc API and open the metadata table on the first search."""
+        if self.__ccdcReady:
+            return
+        _importCcdc()
+        if self.__metadataTablePath:
+            metaTable = CcdcMetadataTable(self.__metadataTablePath)
+            if metaTable.open() and metaTable.getCsdVersion() == str(csd_version()):
+                self.__metaTable = metaTable
+            else:
+                logger.warning("Ignoring metadata table %s (csd version %r current %r)", self.__metadataTablePath, metaTable.getCsdVersion(), csd_version())
+        self.__ccdcReady = True
+
+    def getTierStatistics(self):
+        """Return the number of similarity searches answered by each tier in tiered search mode.
+
+        Returns:
+            (dict): {"identity": n, "text": n, "full": n} - text search candidates including one with the
+                    canonical SMILES of the query, other similarity verified text search candidates, or full
+                    similarity search.
+        """
+        return dict(self.__tierCountD)
+
+    def getQueryResultPath(self, resultPath, queryTargetId):
+        """Return the result directory of the input query in the result layout."""
+        return self.__layout.getQueryPath(resultPath, queryTargetId)
+
+    def getChangeStatistics(self):
+        """Return the number of files added, modified and unchanged in idempotent write mode (or None)."""
+        return self.__changeManifest.getSummary() if self.__changeManifest is not None else None
 
     def getList(self, listPath, startRecord=None, endRecord=None):
+        """Return the records startRecord-endRecord (1-based inclusive) of a query path list (does not import the ccdc API)."""
         rL = []
         try:
             mU = MarshalUtil()
@@ -52,7 +244,7 @@ class CcdcSearch(object):
             logger.debug("Reading path list %r (%r)", listPath, len(pL) if pL else None)
             logger.debug("path list %r", pL)
             if startRecord and endRecord:
-                rL = pL[startRecord - 1 : endRecord]
+                rL = pL[int(startRecord) - 1 : int(endRecord)]
             else:
                 # take the full list
                 rL = pL
@@ -76,30 +268,197 @@ class CcdcSearch(object):
         Returns:
             (int): number of matches
         """
+        rD = self.searchMulti(queryTargetId, queryTargetPath, {searchType: resultPath}, normalizeFlag=normalizeFlag, maxHits=maxHits, suppressMetals=suppressMetals)
+        return rD[searchType]
 
-        mU = MarshalUtil()
-        logger.info("Start search for target %s path %s result path %s", queryTargetId, queryTargetPath, resultPath)
+    def searchMulti(self, queryTargetId, queryTargetPath, resultPathD, normalizeFlag=True, maxHits=50, suppressMetals=False):
+        """Search the CCDC database with several search types for the input query molecule.
+
+        The query is read and normalized once, and entry metadata is fetched once for hits
+        shared between the search types.
+
+        Args:
+            queryTargetId (str): query identifier
+            queryTargetPath (str): path to the query molfile (mol, sdf, mol2)
+            resultPathD (dict): output path to match results for each search type, {searchType: resultPath, ...}
+            normalizeFlag (bool, optional): do standard perceptions on matching molecules. Defaults to True.
+            maxHits (int, optional): maximum number of matches to return. Defaults to 50.
+            suppressMetals (bool, optional): filter structures containing metals. Defaults to False.
+
+        Returns:
+            (dict): number of matches for each search type, {searchType: numHits, ...}
+        """
+        self.__initCcdc()
+        logger.info("Start %r search for target %s path %s result paths %r", list(resultPathD.keys()), queryTargetId, queryTargetPath, list(resultPathD.values()))
+        with self.__profileQuery(queryTargetId, list(resultPathD.values())[0]) as infoD:
+            targetMolL = self.__readQueryMolecules(queryTargetPath, normalizeFlag)
+            metaCacheD = {}
+            rD = {}
+            for searchType, resultPath in resultPathD.items():
+                rD[searchType] = self.__searchMolecules(queryTargetId, queryTargetPath, targetMolL, resultPath, searchType, maxHits, suppressMetals, metaCacheD)
+            infoD.update({"search_type": ",".join(rD), "num_atoms": sum(len(targetMol.atoms) for targetMol in targetMolL), "num_hits": sum(rD.values())})
+        return rD
+
+    def searchSweep(self, queryTargetId, queryTargetPath, resultPath, thresholdList, normalizeFlag=True, maxHits=50, suppressMetals=False):
+        """Similarity search for several thresholds from a single search at the lowest threshold.
+
+        All hits of the search at the lowest threshold are stored with their similarity scores in
+        <resultPath>/all-scores/<queryId>/<queryId>-index.json (replacing the scores of any earlier sweep).  The match index for each threshold is
+        derived from the stored scores and written to <resultPath>/similarity-<threshold>/<queryId>/<queryId>-index.json
+        holding the maxHits most similar matches.  Any later threshold at or above the lowest threshold may be answered
+        from the stored scores, e.g. CcdcHitTable.fromIndexFiles(<resultPath>/all-scores).filter(minSimilarity=threshold).
+
+        Args:
+            queryTargetId (str): query identifier
+            queryTargetPath (str): path to the query molfile (mol, sdf, mol2)
+            resultPath (str): output path to match results
+            thresholdList (list): similarity thresholds (e.g. [0.95, 0.9, 0.85])
+            normalizeFlag (bool, optional): do standard perceptions on matching molecules. Defaults to True.
+            maxHits (int, optional): maximum number of matches to return for each threshold. Defaults to 50.
+            suppressMetals (bool, optional): filter structures containing metals. Defaults to False.
+
+        Returns:
+            (dict): number of matches for each threshold, {threshold: numHits, ...}
+        """
+        self.__initCcdc()
+        scorePath = os.path.join(resultPath, "all-scores")
+        similarityThreshold = self.__similarityThreshold
+        try:
+            self.__similarityThreshold = min(thresholdList)
+            with self.__profileQuery(queryTargetId, resultPath) as infoD:
+                targetMolL = self.__readQueryMolecules(queryTargetPath, normalizeFlag)
+                # the stored scores are replaced, so a repeated sweep derives the thresholds from this search only
+                numHits = self.__searchMolecules(queryTargetId, queryTargetPath, targetMolL, scorePath, "similarity", None, suppressMetals, {}, appendIndex=False)
+                infoD.update({"search_type": "similarity", "num_atoms": sum(len(targetMol.atoms) for targetMol in targetMolL), "num_hits": numHits})
+        finally:
+            self.__similarityThreshold = similarityThreshold
         #
+        rowL = []
+        if numHits:
+            self.flush()
+            rowL = self.__fileU.readJson(self.__layout.getIndexPath(scorePath, queryTargetId))
+            rowL = sorted(rowL, key=lambda row: row.get("similarity_score") or 0.0, reverse=True)
+        hitT = CcdcHitTable(rowL, verbose=self.__verbose)
+        rD = {}
+        for threshold in sorted(thresholdList, reverse=True):
+            selectL = [rowL[ii] for ii in hitT.getMask(minSimilarity=threshold).nonzero()[0]][:maxHits]
+            rD[threshold] = len(selectL)
+            if selectL:
+                CcdcHitTable(selectL, verbose=self.__verbose).writeIndices(os.path.join(resultPath, "similarity-%.2f" % threshold), fileUtils=self.__fileU, layout=self.__layout)
+        logger.info("Similarity sweep for %s matched %r", queryTargetId, rD)
+        return rD
+
+    def searchRecord(self, queryTargetId, record, resultPath, fmt="sdf", queryTargetPath=None, normalizeFlag=True, maxHits=50, searchType="similarity", suppressMetals=False):
+        """Search the CCDC database for similar or substructure matches for a query molecule held in memory.
+
+        Args:
+            queryTargetId (str): query identifier
+            record (str): query molecule record (sdf or mol2 text)
+            resultPath (str): output path to match results
+            fmt (str, optional): record format (sdf|mol2). Defaults to "sdf".
+            queryTargetPath (str, optional): source path of the record stored with each match (e.g. the bundle path). Defaults to None.
+            normalizeFlag (bool, optional): do standard perceptions on matching molecules. Defaults to True.
+            maxHits (int, optional): maximum number of matches to return. Defaults to 50.
+            searchType (str, optional): search mode (substructure, similarity). Defaults to "similarity".
+            suppressMetals (bool, optional): filter structures containing metals. Defaults to False.
+
+        Returns:
+            (int): number of matches
+        """
+        self.__initCcdc()
+        with self.__profileQuery(queryTargetId, resultPath) as infoD:
+            targetMol = Molecule.from_string(record, format=fmt)
+            if normalizeFlag:
+                self.__normalizeMolecule(targetMol)
+            numHits = self.__searchMolecules(queryTargetId, queryTargetPath, [targetMol], resultPath, searchType, maxHits, suppressMetals, {})
+            infoD.update({"search_type": searchType, "num_atoms": len(targetMol.atoms), "num_hits": numHits})
+        return numHits
+
+    def __profileQuery(self, queryTargetId, resultPath):
+        """Return the profiling context for a query (CcdcProfiler) or a null context when profiling is off."""
+        if self.__profiler is None:
+            return contextlib.nullcontext({})
+        return self.__profiler.profile(queryTargetId, resultPath, queryDir=self.__layout.getQueryPath(resultPath, queryTargetId))
+
+    def searchBundle(self, bundlePath, resultPath, start=0, end=None, queryIdList=None, normalizeFlag=True, maxHits=50, searchType="similarity", suppressMetals=False):
+        """Search the CCDC database for each query molecule in a multi-molecule SDF or mol2 bundle (CcdcBundleReader)
+        or each definition in a chemical component dictionary file (CcdcComponentReader).
+
+        Each record is a separate query identified by its title (or data block name), and the records are read
+        lazily from the input byte range (on record boundaries as from CcdcBundleReader.getRanges()).
+
+        Args:
+            bundlePath (str): path to the SDF or mol2 bundle or chemical component dictionary (CIF) file
+            resultPath (str): output path to match results
+            start (int, optional): byte range start offset. Defaults to 0.
+            end (int, optional): byte range end offset. Defaults to None (end of file).
+            queryIdList (list, optional): query identifiers for the records in the range (as from getRanges()). Defaults to None (record titles).
+            normalizeFlag (bool, optional): do standard perceptions on matching molecules. Defaults to True.
+            maxHits (int, optional): maximum number of matches to return for each query. Defaults to 50.
+            searchType (str, optional): search mode (substructure, similarity). Defaults to "similarity".
+            suppressMetals (bool, optional): filter structures containing metals. Defaults to False.
+
+        Returns:
+            (dict): number of matches for each query identifier {queryTargetId: numHits, ...} (None for a failing query)
+        """
+        bR = openBundle(bundlePath)
+        rD = {}
+        for queryTargetId, record in bR.iterRecords(start=start, end=end, queryIdList=queryIdList):
+            try:
+                rD[queryTargetId] = self.searchRecord(
+                    queryTargetId,
+                    record,
+                    resultPath,
+                    fmt=bR.getFormat(),
+                    queryTargetPath=bundlePath,
+                    normalizeFlag=normalizeFlag,
+                    maxHits=maxHits,
+                    searchType=searchType,
+                    suppressMetals=suppressMetals,
+                )
+            except Exception as e:
+                logger.exception("Failing for %r in %s with %s", queryTargetId, bundlePath, str(e))
+                rD[queryTargetId] = None
+        return rD
+
+    def __normalizeMolecule(self, targetMol):
+        targetMol.assign_bond_types(which="unknown")
+        targetMol.standardise_aromatic_bonds()
+        targetMol.standardise_delocalised_bonds()
+
+    def __readQueryMolecules(self, queryTargetPath, normalizeFlag):
+        targetMolL = []
+        if CcdcComponentReader.isComponentFile(queryTargetPath):
+            # chemical component definitions are converted in memory
+            targetStructures = [Molecule.from_string(record, format="sdf") for _, record in CcdcComponentReader(queryTargetPath).iterRecords()]
+        else:
+            targetStructures = [e.molecule for e in EntryReader(queryTargetPath)]
+        for targetMol in targetStructures:
+            if normalizeFlag:
+                self.__normalizeMolecule(targetMol)
+            targetMolL.append(targetMol)
+        return targetMolL
+
+    def __searchMolecules(self, queryTargetId, queryTargetPath, targetMolL, resultPath, searchType, maxHits, suppressMetals, metaCacheD, appendIndex=True):
+        mU = MarshalUtil()
         summaryList = []
         #
-        targetDirPath = os.path.dirname(queryTargetPath)
-        cifTargetPath = os.path.join(targetDirPath, queryTargetId + ".cif")
-
+        cifTargetPath = os.path.join(os.path.dirname(queryTargetPath), queryTargetId + ".cif") if queryTargetPath else None
+        targetCcPath = cifTargetPath if cifTargetPath and mU.exists(cifTargetPath) else UNSET
+        csdVersion = csd_version()
+        csdDirectory = csd_directory()
         #
-        targetStructures = EntryReader(queryTargetPath)
-        dirPath = os.path.join(resultPath, queryTargetId)
+        dirPath = self.__layout.getQueryPath(resultPath, queryTargetId)
+        componentD = {} if self.__dedupComponents else None
         numHits = 0
-        for ii, e in enumerate(targetStructures, 1):
-            numHits = 0
+        if self.__changeManifest is not None:
+            self.__changeManifest.addDirectory(dirPath)
+        for ii, targetMol in enumerate(targetMolL, 1):
             startTime = time.time()
-            targetMol = e.molecule
-            if normalizeFlag:
-                targetMol.assign_bond_types(which="unknown")
-                targetMol.standardise_aromatic_bonds()
-                targetMol.standardise_delocalised_bonds()
-            #
             logger.info("(%d) begin %s search - query id %s", ii, searchType, queryTargetId)
-            if searchType == "similarity":
+            if searchType == "similarity" and self.__tieredSearch:
+                hits = self.__tieredSimilaritySearch(targetMol, self.__getQueryNameList(queryTargetId, targetMol, cifTargetPath), suppressMetals=suppressMetals)
+            elif searchType == "similarity":
                 hits = self.__similaritySearch(targetMol, suppressMetals=suppressMetals)
             elif searchType == "substructure":
                 hits = self.__moleculeSubstructureSearch(targetMol, suppressMetals=suppressMetals)
@@ -109,91 +468,267 @@ class CcdcSearch(object):
 
             if hits:
                 numHits += len(hits)
-                logger.info("(%d) search for %s matched %d: %r", ii, queryTargetId, numHits, [targetHit.identifier for targetHit in hits])
+                logger.info("(%d) search for %s matched %d: %r", ii, queryTargetId, len(hits), [targetHit.identifier for targetHit in hits])
 
                 #
-                for targetHit in hits[:maxHits]:
+                for targetHit in self.__getStoredHits(hits, maxHits):
                     #
-                    hI = CcdcMatchIndexInst()
-                    hI.setCsdVersion(csd_version())
-                    hI.setCsdDirectory(csd_directory())
-                    hI.setTargetId(queryTargetId)
-                    hI.setTargetPath(queryTargetPath)
-                    if mU.exists(cifTargetPath):
-                        hI.setTargetCcPath(cifTargetPath)
-                    hI.setIdentifier(targetHit.identifier)
-                    hI.setMatchType(searchType)
-                    try:
-                        hI.setRFactor(targetHit.entry.r_factor)
-                        hI.setChemicalName(targetHit.entry.chemical_name)
-                        hI.setTemperature(targetHit.entry.temperature)
-                        hI.setRadiationSource(targetHit.entry.radiation_source)
-                        hI.setHasDisorder("N")
-                        cit = targetHit.entry.publication
-                        if cit.doi is not None:
-                            hI.setCitationDOI(cit.doi)
-                        if searchType == "similarity":
-                            hI.setSimilarityScore(targetHit.similarity)
-                        elif searchType == "substructure":
-                            hI.setMatchedAtomLength(len(targetHit.match_atoms()))
-                    except Exception as e:
-                        logger.exception("Failing with %s", str(e))
-                        #
+                    hR = CcdcHitRecord(
+                        csd_version=csdVersion,
+                        csd_directory=csdDirectory,
+                        target_id=queryTargetId,
+                        target_path=queryTargetPath or UNSET,
+                        target_cc_path=targetCcPath,
+                        identifier=targetHit.identifier,
+                        match_type=searchType,
+                        **self.__getHitMetadata(targetHit, searchType, metaCacheD)
+                    )
                     #
                     mU.mkdir(dirPath)
-                    mol2L = []
-                    if searchType == "substructure":
-                        for jj, mc in enumerate(targetHit.match_components(), 1):
-                            fp = os.path.join(dirPath, queryTargetId + "_" + targetHit.identifier + "_%03d" % jj + ".mol2")
-                            mol2L.append(fp)
-                            with MoleculeWriter(fp) as ofh:
-                                ofh.write(mc)
-                            # Replace the title line
-                            with open(fp) as fin:
-                                lines = fin.readlines()
-                            lines[1] = lines[1].replace("00", targetHit.identifier)
-                            #
-                            with open(fp, "w") as fout:
-                                fout.write("".join(lines))
-                            #
-                            fp = os.path.join(dirPath, queryTargetId + "_" + targetHit.identifier + "_%03d" % jj + ".sdf")
-                            with MoleculeWriter(fp) as ofh:
-                                ofh.write(mc)
-
-                            # Replace the title line
-                            with open(fp) as fin:
-                                lines = fin.readlines()
-                            lines[0] = lines[0].replace("00", targetHit.identifier)
-                            #
-                            with open(fp, "w") as fout:
-                                fout.write("".join(lines))
+                    if searchType == "substructure" and self.__lazyComponents:
+                        summaryList.extend(self.__getLazyComponentRecords(hR, targetHit.molecule, targetHit.match_atoms(indices=True)))
+                    elif searchType == "substructure":
+                        pathL = self.__writeComponents(dirPath, queryTargetId, targetHit.identifier, targetHit.match_components(), componentD)
                         #
                         #  Check for multiple generated result files -
                         #
-                        for jj, fp in enumerate(mol2L, 1):
+                        for jj, (fp, tt, componentHash) in enumerate(pathL, 1):
                             logger.debug("(%d) adding component fp %s", jj, fp)
-                            hI.setMatchNumber(jj)
-                            hI.setMol2Path(fp)
-                            tt = fp[:-4] + "sdf"
-                            hI.setMolPath(tt)
-                            summaryList.append(copy.deepcopy(hI.get()))
+                            summaryList.append(hR.replace(match_number=jj, mol2_file_path=fp, mol_file_path=tt, component_hash=componentHash or UNSET))
                             #
                     else:
-                        hI.setMatchNumber(1)
-                        summaryList.append(copy.deepcopy(hI.get()))
+                        summaryList.append(hR.replace(match_number=1))
             else:
                 logger.info("(%d) search for %s returns no matches", ii, targetMol.identifier)
                 hits = None
         #
+        rowL = CcdcHitRecord.toRows(summaryList)
         if numHits > 0:
             mU.mkdir(dirPath)
-            fp = os.path.join(dirPath, queryTargetId + "-index.json")
-            cmI = CcdcMatchIndex(indexFilePath=fp, verbose=self.__verbose)
-            cmI.load(summaryList)
-            cmI.writeIndex()
+            self.__writeIndex(os.path.join(dirPath, queryTargetId + "-index.json"), rowL, append=appendIndex)
+            self.__layout.register(resultPath, queryTargetId)
+            self.__logComponentCounts(queryTargetId, rowL, componentD)
+        if self.__resultStore is not None:
+            self.__resultStore.addMatches(rowL, queryTargetId=queryTargetId, matchType=searchType)
 
         return numHits
 
+    def __getStoredHits(self, hits, maxHits):
+        # in permissive mode all hits are stored for later filtering (CcdcHitTable)
+        return hits if self.__permissiveSearch or maxHits is None else hits[:maxHits]
+
+    def __logComponentCounts(self, queryTargetId, rowList, componentD):
+        if componentD is not None:
+            numComponents = len([row for row in rowList if "component_hash" in row])
+            logger.info("%s stored %d unique of %d match components", queryTargetId, len(componentD), numComponents)
+
+    def __getLazyComponentRecords(self, hR, molecule, atomIndexList, componentIndexList=None):
+        """Return hit records referencing each matched component by its index in the hit molecule together with
+        the matched atom indices.  By default the matched components are those containing a matched atom."""
+        if componentIndexList is None:
+            membershipL = self.getComponentMembership([self.__getAtomKey(at) for at in molecule.atoms], [[self.__getAtomKey(at) for at in mc.atoms] for mc in molecule.components])
+            componentIndexList = sorted({membershipL[ii] for ii in atomIndexList if membershipL[ii] is not None})
+        atomIndices = tuple(atomIndexList)
+        return [hR.replace(match_number=jj, component_index=componentIndex, match_atom_indices=atomIndices) for jj, componentIndex in enumerate(componentIndexList, 1)]
+
+    def __getAtomKey(self, atom):
+        # atom labels repeat across components (e.g. copies of the same ligand) - coordinates distinguish them
+        xyz = atom.coordinates
+        return (atom.label, tuple(xyz) if xyz is not None else None)
+
+    @staticmethod
+    def getComponentMembership(atomKeyList, componentKeyLists):
+        """Return the index of the component containing each atom of a molecule.
+
+        Args:
+            atomKeyList (list): identity keys (e.g. label and coordinates) of the molecule atoms in atom index order
+            componentKeyLists (list): lists of the identity keys of the atoms in each component
+
+        Returns:
+            (list): component index for each molecule atom (None for atoms in no component)
+
+        Atoms sharing a key are assigned to components in atom index order, so each atom
+        belongs to at most one component.
+        """
+        posD = {}
+        for ii, ky in enumerate(atomKeyList):
+            posD.setdefault(ky, []).append(ii)
+        membershipL = [None] * len(atomKeyList)
+        for jj, keyL in enumerate(componentKeyLists):
+            for ky in keyL:
+                if posD.get(ky):
+                    membershipL[posD[ky].pop(0)] = jj
+        return membershipL
+
+    def materialize(self, queryTargetId, resultPath, identifier=None, database="CSD"):
+        """Write the mol2 and sdf files for match components recorded by a search in lazy component mode.
+
+        The components are read from the CSD entries of the recorded matches, and the index is
+        updated with the paths to the structure files.
+
+        Args:
+            queryTargetId (str): query identifier
+            resultPath (str): path to match results
+            identifier (str, optional): CSD identifier of the match to materialize. Defaults to None (all matches).
+            database (str, optional): database holding the matching entries (CSD or path to a database file). Defaults to "CSD".
+
+        Returns:
+            (list): mol2 file paths written
+        """
+        self.__initCcdc()
+        mol2L = []
+        dirPath = self.__layout.getQueryPath(resultPath, queryTargetId)
+        indexFilePath = os.path.join(dirPath, queryTargetId + "-index.json")
+        try:
+            self.flush()
+            rowL = self.__fileU.readJson(indexFilePath)
+            rowD = {}
+            for row in rowL:
+                if "component_index" in row and not row.get("mol2_file_path") and (identifier is None or row["identifier"] == identifier):
+                    rowD.setdefault(row["identifier"], []).append(row)
+            if not rowD:
+                logger.info("No unmaterialized components for %s (%r)", queryTargetId, identifier)
+                return mol2L
+            reader = EntryReader(database)
+            for idCode, idRowL in rowD.items():
+                componentL = reader.entry(idCode).molecule.components
+                pathL = self.__writeComponents(dirPath, queryTargetId, idCode, [componentL[row["component_index"]] for row in idRowL])
+                for row, (fp, tt, _) in zip(idRowL, pathL):
+                    row["mol2_file_path"] = fp
+                    row["mol_file_path"] = tt
+                    mol2L.append(fp)
+            self.__writeIndex(indexFilePath, rowL, append=False)
+            if self.__resultStore is not None:
+                self.__resultStore.addMatches(rowL)
+            logger.info("Materialized %d components for %d matches of %s", len(mol2L), len(rowD), queryTargetId)
+        except Exception as e:
+            logger.exception("Failing for %s with %s", queryTargetId, str(e))
+        return mol2L
+
+    def __writeIndex(self, indexFilePath, rowList, append=True):
+        """Append the input rows to (or replace) the match index (compressed when output compression is set).
+        The index is written in order with any pending structure files in background write mode."""
+        if self.__writer is not None:
+            self.__writer.submit(self.__writeIndexFile, indexFilePath, rowList, append)
+            return True
+        return self.__writeIndexFile(indexFilePath, rowList, append)
+
+    def __writeIndexFile(self, indexFilePath, rowList, append):
+        if self.__changeManifest is not None:
+            # in idempotent write mode the index of a query is replaced by its first write in this run
+            append = append and self.__changeManifest.hasPath(self.__fileU.getPath(indexFilePath))
+        elif not self.__fileU.getCompression():
+            cmI = CcdcMatchIndex(indexFilePath=indexFilePath, verbose=self.__verbose)
+            if not append:
+                cmI.clear()
+            cmI.load(rowList)
+            return cmI.writeIndex()
+        try:
+            rL = self.__fileU.readJson(indexFilePath) if append and self.__fileU.exists(indexFilePath) else []
+            self.__fileU.writeJson(indexFilePath, rL + rowList)
+            return True
+        except Exception as e:
+            logger.exception("Failing for %r with %s", indexFilePath, str(e))
+        return False
+
+    def __getHitMetadata(self, targetHit, searchType, metaCacheD=None, entry=None):
+        """Return the CSD entry metadata and score details for the input hit as hit record fields.  Entry
+        metadata is shared through the optional cache dictionary for hits recurring across searches.
+        The CSD entry may be provided for hits from molecule level searches."""
+        hitD = {}
+        try:
+            identifier = entry.identifier if entry is not None else targetHit.identifier
+            metaD = None
+            if metaCacheD is not None and identifier in metaCacheD:
+                metaD = metaCacheD[identifier]
+            elif self.__metaTable is not None:
+                metaD = self.__metaTable.get(identifier)
+            if metaD is None or (self.__permissiveSearch and "has_disorder" not in metaD):
+                entry = entry if entry is not None else targetHit.entry
+                cit = entry.publication
+                metaD = {
+                    "r_factor": entry.r_factor,
+                    "chemical_name": entry.chemical_name,
+                    "temperature": entry.temperature,
+                    "radiation_source": entry.radiation_source,
+                    "doi": cit.doi if cit else None,
+                }
+                if self.__permissiveSearch:
+                    mol = entry.molecule
+                    metaD.update(
+                        {
+                            "has_disorder": entry.has_disorder,
+                            "has_3d_coordinates": entry.has_3d_structure,
+                            "is_organic": mol.is_organic,
+                            "has_metals": any(atom.is_metal for atom in mol.atoms),
+                        }
+                    )
+                if metaCacheD is not None:
+                    metaCacheD[identifier] = metaD
+            for ky in ["r_factor", "chemical_name", "temperature", "radiation_source"]:
+                hitD[ky] = metaD[ky]
+            hitD["has_disorder"] = "Y" if metaD.get("has_disorder") else "N"
+            if self.__permissiveSearch:
+                for ky in ["has_3d_coordinates", "is_organic", "has_metals"]:
+                    hitD[ky] = metaD[ky]
+            if metaD["doi"] is not None:
+                hitD["doi"] = metaD["doi"]
+            if searchType == "similarity":
+                hitD["similarity_score"] = targetHit.similarity
+            elif searchType == "substructure":
+                hitD["match_atoms"] = len(targetHit.match_atoms())
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return hitD
+
+    def __writeComponents(self, dirPath, queryTargetId, identifier, componentList, componentD=None):
+        """Write mol2 and sdf files for each component of a hit (with the accession code in the title line).
+
+        Each file is rendered in memory and written once through the (optionally compressing) streaming writer,
+        from the background writer thread in background write mode.
+        With component deduplication, the input dictionary {componentHash: (mol2Path, sdfPath), ...} holds the
+        components already stored for the query result, and only new components are written (named by their
+        content hash with the accession code of the first hit in the title line).
+
+        Returns:
+            (list): mol2 and sdf file paths and content hash (or None) for each component [(mol2Path, sdfPath, componentHash), ...]
+        """
+        pathL = []
+        for jj, mc in enumerate(componentList, 1):
+            mol2Lines = None
+            componentHash = None
+            if componentD is not None:
+                if self.__dedupComponents == "chemical" and mc.smiles:
+                    componentHash = hashlib.sha1(mc.smiles.encode("utf-8")).hexdigest()
+                else:
+                    mol2Lines = mc.to_string(format="mol2").split("\n")
+                    componentHash = hashlib.sha1("\n".join(mol2Lines[:1] + mol2Lines[2:]).encode("utf-8")).hexdigest()
+                if componentHash in componentD:
+                    pathL.append(componentD[componentHash] + (componentHash,))
+                    continue
+                fpBase = os.path.join(dirPath, queryTargetId + "_" + componentHash[:16])
+            else:
+                fpBase = os.path.join(dirPath, queryTargetId + "_" + identifier + "_%03d" % jj)
+            # Replace the title line
+            lines = mol2Lines if mol2Lines else mc.to_string(format="mol2").split("\n")
+            lines[1] = lines[1].replace("00", identifier)
+            mol2Path = self.__writeText(fpBase + ".mol2", "\n".join(lines))
+            #
+            lines = mc.to_string(format="sdf").split("\n")
+            lines[0] = lines[0].replace("00", identifier)
+            sdfPath = self.__writeText(fpBase + ".sdf", "\n".join(lines))
+            if componentD is not None:
+                componentD[componentHash] = (mol2Path, sdfPath)
+            pathL.append((mol2Path, sdfPath, componentHash))
+        return pathL
+
+    def __writeText(self, filePath, text):
+        """Write (or queue in background write mode) the input text and return the output path."""
+        if self.__writer is not None:
+            self.__writer.submit(self.__fileU.writeText, filePath, text)
+            return self.__fileU.getPath(filePath)
+        return self.__fileU.writeText(filePath, text)
+
     def searchSmarts(self, queryTargetId, smarts, resultPath, maxHits=50, suppressMetals=False):
         """Search the CCDC database for substructure matches for the input SMARTS pattern.
 
@@ -207,111 +742,212 @@ class CcdcSearch(object):
         Returns:
             (int): number of matches
         """
-
+        self.__initCcdc()
         mU = MarshalUtil()
         logger.info("Start smarts search for target %s result path %s", queryTargetId, resultPath)
-        #
-        ii = 1
-        searchType = "substructure"
-        summaryList = []
-        dirPath = os.path.join(resultPath, queryTargetId)
-        numHits = 0
-        startTime = time.time()
-        logger.info("(%d) begin %s search - query id %s", ii, searchType, queryTargetId)
+        with self.__profileQuery(queryTargetId, resultPath) as infoD:
+            #
+            ii = 1
+            searchType = "substructure"
+            summaryList = []
+            dirPath = self.__layout.getQueryPath(resultPath, queryTargetId)
+            componentD = {} if self.__dedupComponents else None
+            numHits = 0
+            startTime = time.time()
+            logger.info("(%d) begin %s search - query id %s", ii, searchType, queryTargetId)
 
-        if searchType == "substructure":
-            hits = self.__smartsSubstructureSearch(smarts, suppressMetals=suppressMetals)
-        else:
-            hits = []
-        logger.info("(%d) completed search query id %s in %.3f seconds", ii, queryTargetId, time.time() - startTime)
+            if searchType == "substructure":
+                hits = self.__smartsSubstructureSearch(smarts, suppressMetals=suppressMetals)
+            else:
+                hits = []
+            logger.info("(%d) completed search query id %s in %.3f seconds", ii, queryTargetId, time.time() - startTime)
 
-        if hits:
-            numHits += len(hits)
-            logger.info("(%d) search for %s matched %d: %r", ii, queryTargetId, numHits, [targetHit.identifier for targetHit in hits])
+            if hits:
+                numHits += len(hits)
+                logger.info("(%d) search for %s matched %d: %r", ii, queryTargetId, numHits, [targetHit.identifier for targetHit in hits])
 
-            #
-            for targetHit in hits[:maxHits]:
                 #
-                hI = CcdcMatchIndexInst()
-                hI.setTargetId(queryTargetId)
-                hI.setIdentifier(targetHit.identifier)
-                hI.setMatchType(searchType)
-                try:
-                    hI.setRFactor(targetHit.entry.r_factor)
-                    hI.setChemicalName(targetHit.entry.chemical_name)
-                    hI.setTemperature(targetHit.entry.temperature)
-                    hI.setRadiationSource(targetHit.entry.radiation_source)
-                    hI.setHasDisorder("N")
-                    cit = targetHit.entry.publication
-                    if cit.doi is not None:
-                        hI.setCitationDOI(cit.doi)
-                    if searchType == "similarity":
-                        hI.setSimilarityScore(targetHit.similarity)
-                    elif searchType == "substructure":
-                        hI.setMatchedAtomLength(len(targetHit.match_atoms()))
-                except Exception as e:
-                    logger.exception("Failing with %s", str(e))
+                for targetHit in self.__getStoredHits(hits, maxHits):
                     #
-                #
-                mU.mkdir(dirPath)
-                mol2L = []
-                for jj, mc in enumerate(targetHit.molecule.components, 1):
-                    fp = os.path.join(dirPath, queryTargetId + "_" + targetHit.identifier + "_%03d" % jj + ".mol2")
-                    mol2L.append(fp)
-                    with MoleculeWriter(fp) as ofh:
-                        ofh.write(mc)
-                    # Replace the title line
-                    with open(fp) as fin:
-                        lines = fin.readlines()
-                    lines[1] = lines[1].replace("00", targetHit.identifier)
-                    #
-                    with open(fp, "w") as fout:
-                        fout.write("".join(lines))
+                    hR = CcdcHitRecord(target_id=queryTargetId, identifier=targetHit.identifier, match_type=searchType, **self.__getHitMetadata(targetHit, searchType))
                     #
-                    fp = os.path.join(dirPath, queryTargetId + "_" + targetHit.identifier + "_%03d" % jj + ".sdf")
-                    with MoleculeWriter(fp) as ofh:
-                        ofh.write(mc)
-                    # Replace the title line
-                    with open(fp) as fin:
-                        lines = fin.readlines()
-                    lines[0] = lines[0].replace("00", targetHit.identifier)
+                    mU.mkdir(dirPath)
+                    if self.__lazyComponents:
+                        summaryList.extend(
+                            self.__getLazyComponentRecords(hR, targetHit.molecule, targetHit.match_atoms(indices=True), list(range(len(targetHit.molecule.components))))
+                        )
+                        continue
+                    pathL = self.__writeComponents(dirPath, queryTargetId, targetHit.identifier, targetHit.molecule.components, componentD)
                     #
-                    with open(fp, "w") as fout:
-                        fout.write("".join(lines))
-                #
-                #  Check for multiple generated result files -
-                #
-                for jj, fp in enumerate(mol2L, 1):
-                    logger.debug("(%d) adding component fp %s", jj, fp)
-                    hI.setMatchNumber(jj)
-                    hI.setMol2Path(fp)
-                    tt = fp[:-4] + "sdf"
-                    hI.setMolPath(tt)
-                    summaryList.append(copy.deepcopy(hI.get()))
+                    #  Check for multiple generated result files -
                     #
-        else:
-            logger.info("(%d) se sarch for %s returns no matches", ii, queryTargetId)
-            hits = None
-        #
-        if numHits > 0:
-            mU.mkdir(dirPath)
-            fp = os.path.join(dirPath, queryTargetId + "-index.json")
-            cmI = CcdcMatchIndex(indexFilePath=fp, verbose=self.__verbose)
-            cmI.load(summaryList)
-            cmI.writeIndex()
+                    for jj, (fp, tt, componentHash) in enumerate(pathL, 1):
+                        logger.debug("(%d) adding component fp %s", jj, fp)
+                        summaryList.append(hR.replace(match_number=jj, mol2_file_path=fp, mol_file_path=tt, component_hash=componentHash or UNSET))
+                        #
+            else:
+                logger.info("(%d) se sarch for %s returns no matches", ii, queryTargetId)
+                hits = None
+            #
+            rowL = CcdcHitRecord.toRows(summaryList)
+            if numHits > 0:
+                mU.mkdir(dirPath)
+                self.__writeIndex(os.path.join(dirPath, queryTargetId + "-index.json"), rowL)
+                self.__layout.register(resultPath, queryTargetId)
+                self.__logComponentCounts(queryTargetId, rowL, componentD)
+            if self.__resultStore is not None:
+                self.__resultStore.addMatches(rowL, queryTargetId=queryTargetId, matchType=searchType)
+            infoD.update({"search_type": "substructure", "smarts": smarts, "num_hits": numHits})
 
         return numHits
 
+    def searchSmartsBatch(self, smartsList, resultPath, maxHits=50, suppressMetals=False, database="CSD"):
+        """Search the CCDC database for substructure matches for a list of SMARTS patterns in a single pass.
+
+        All patterns are compiled once.  Each database entry passing the search settings is read once
+        and matched against every pattern. Patterns are screened against the element composition of
+        each entry before matching.  As in searchSmarts(), all matches are counted and per-ID index and
+        structure files are written for the first maxHits matches of each pattern.  Timings for each
+        pattern and the overall pass are logged and stored in <resultPath>/smarts-batch-timing.json.
+
+        Args:
+            smartsList (list): list of query identifier and SMARTS pattern pairs [(queryTargetId, smarts), ...]
+            resultPath (str): output path to match results
+            maxHits (int, optional): maximum number of matches to store for each pattern. Defaults to 50.
+            suppressMetals (bool, optional): filter structures containing metals. Defaults to False.
+            database (str, optional): database to search (CSD or path to a database file). Defaults to "CSD".
+
+        Returns:
+            (dict): number of matches for each query identifier {queryTargetId: numHits, ...}
+        """
+        self.__initCcdc()
+        mU = MarshalUtil()
+        searchType = "substructure"
+        startTime = time.time()
+        logger.info("Start smarts batch search for %d patterns result path %s", len(smartsList), resultPath)
+        patL = []
+        for queryTargetId, smarts in smartsList:
+            search = SubstructureSearch()
+            search.add_substructure(SMARTSSubstructure(smarts))
+            self.__applySearchSettings(search, suppressMetals)
+            patL.append(
+                {
+                    "id": queryTargetId,
+                    "smarts": smarts,
+                    "search": search,
+                    "elements": self.getSmartsElementCounts(smarts),
+                    "records": [],
+                    "seconds": 0.0,
+                    "tested": 0,
+                    "components": {} if self.__dedupComponents else None,
+                }
+            )
+        logger.info("Compiled %d patterns in %.3f seconds", len(patL), time.time() - startTime)
+        if not patL:
+            return {}
+        #
+        settings = patL[0]["search"].settings
+        numEntries = 0
+        for entry in EntryReader(database):
+            if not settings.test(entry):
+                continue
+            numEntries += 1
+            mol = entry.molecule
+            elCountD = {}
+            for atom in mol.atoms:
+                elCountD[atom.atomic_symbol] = elCountD.get(atom.atomic_symbol, 0) + 1
+            componentL = None
+            for patD in patL:
+                if any(elCountD.get(el, 0) < cnt for el, cnt in patD["elements"].items()):
+                    continue
+                tS = time.time()
+                hitL = patD["search"].search_molecule(mol)
+                patD["seconds"] += time.time() - tS
+                patD["tested"] += 1
+                if not hitL:
+                    continue
+                patD["numHits"] = patD.get("numHits", 0) + 1
+                if patD["numHits"] > maxHits and not self.__permissiveSearch:
+                    continue
+                componentL = componentL if componentL is not None else mol.components
+                dirPath = self.__layout.getQueryPath(resultPath, patD["id"])
+                mU.mkdir(dirPath)
+                hR = CcdcHitRecord(target_id=patD["id"], identifier=entry.identifier, match_type=searchType, **self.__getHitMetadata(hitL[0], searchType, entry=entry))
+                if self.__lazyComponents:
+                    patD["records"].extend(self.__getLazyComponentRecords(hR, mol, hitL[0].match_atoms(indices=True), list(range(len(componentL)))))
+                    continue
+                pathL = self.__writeComponents(dirPath, patD["id"], entry.identifier, componentL, patD["components"])
+                for jj, (fp, tt, componentHash) in enumerate(pathL, 1):
+                    patD["records"].append(hR.replace(match_number=jj, mol2_file_path=fp, mol_file_path=tt, component_hash=componentHash or UNSET))
+        #
+        hitD = {}
+        timingL = []
+        for patD in patL:
+            numHits = patD.get("numHits", 0)
+            hitD[patD["id"]] = numHits
+            rowL = CcdcHitRecord.toRows(patD["records"])
+            if numHits > 0:
+                self.__writeIndex(self.__layout.getIndexPath(resultPath, patD["id"]), rowL)
+                self.__layout.register(resultPath, patD["id"])
+                self.__logComponentCounts(patD["id"], rowL, patD["components"])
+            if self.__resultStore is not None:
+                self.__resultStore.addMatches(rowL, queryTargetId=patD["id"], matchType=searchType)
+            logger.info("Pattern %s (%s) matched %d tested %d entries in %.3f seconds", patD["id"], patD["smarts"], numHits, patD["tested"], patD["seconds"])
+            timingL.append({"target_id": patD["id"], "smarts": patD["smarts"], "num_hits": numHits, "num_tested": patD["tested"], "match_seconds": round(patD["seconds"], 4)})
+        totalSeconds = time.time() - startTime
+        mU.mkdir(resultPath)
+        mU.doExport(
+            os.path.join(resultPath, "smarts-batch-timing.json"),
+            {"num_patterns": len(patL), "num_entries": numEntries, "total_seconds": round(totalSeconds, 4), "patterns": timingL},
+            fmt="json",
+            indent=3,
+        )
+        logger.info("Completed smarts batch search for %d patterns over %d entries in %.3f seconds", len(patL), numEntries, totalSeconds)
+        return hitD
+
+    @staticmethod
+    def getSmartsElementCounts(smarts):
+        """Return the minimum element counts required by the input SMARTS pattern (used to screen entries).
+
+        Only unambiguous atoms contribute: organic subset atoms and bracket atoms without logical
+        operators or recursion.  Bracket atoms are matched by nesting depth, so the atoms of recursive
+        SMARTS ($(...)) and negated primitives impose no requirement.
+        """
+        elCountD = {}
+        ii = 0
+        while ii < len(smarts):
+            if smarts[ii] == "[":
+                # closing bracket at the same depth (recursive SMARTS hold bracket atoms)
+                depth = 0
+                jj = ii
+                while jj < len(smarts):
+                    depth += {"[": 1, "]": -1}.get(smarts[jj], 0)
+                    if depth == 0:
+                        break
+                    jj += 1
+                bracket = smarts[ii + 1 : jj]
+                ii = jj + 1
+                if any(c in bracket for c in ",;!&$*") or bracket.startswith("#"):
+                    continue
+                mt = re.match(r"(se|as|[cnosp]|[A-Z][a-z]?)", bracket)
+                if mt and mt.group(1) not in ["H", "A", "D", "R", "X"]:
+                    el = mt.group(1).capitalize()
+                    elCountD[el] = elCountD.get(el, 0) + 1
+                continue
+            mt = re.compile(r"Cl|Br|[BCNOPSFI]|[bcnops]").match(smarts, ii)
+            if mt:
+                el = mt.group(0).capitalize()
+                elCountD[el] = elCountD.get(el, 0) + 1
+                ii = mt.end()
+            else:
+                ii += 1
+        return elCountD
+
     def __moleculeSubstructureSearch(self, aMol, suppressMetals=False):
         ms = MoleculeSubstructure(aMol)
         search = SubstructureSearch()
         search.add_substructure(ms)
-        search.settings.has_3d_coordinates = True
-        search.settings.no_disorder = True
-        if suppressMetals:
-            search.settings.only_organic = True
-            search.settings.no_metals = True
-        search.settings.max_r_factor = self.__rValueMaxPercent
+        self.__applySearchSettings(search, suppressMetals)
         hits = search.search(max_hits_per_structure=1)
         return hits
 
@@ -319,30 +955,88 @@ class CcdcSearch(object):
         ss = SMARTSSubstructure(smarts)
         search = SubstructureSearch()
         search.add_substructure(ss)
-        search.settings.has_3d_coordinates = True
-        search.settings.no_disorder = True
-        if suppressMetals:
-            search.settings.no_metals = True
-            search.settings.only_organic = True
-        search.settings.max_r_factor = self.__rValueMaxPercent
+        self.__applySearchSettings(search, suppressMetals)
         hits = search.search(max_hits_per_structure=1)
         return hits
 
     def __similaritySearch(self, aMol, suppressMetals=False):
         # the similarity threshold is a score from 0 to 1 of how 'similar' the structures will be to the input molecule
         search = SimilaritySearch(aMol, threshold=self.__similarityThreshold)
+        self.__applySearchSettings(search, suppressMetals)
+        hits = search.search(max_hits_per_structure=1)
+        return hits
+
+    def __applySearchSettings(self, search, suppressMetals=False):
+        if self.__permissiveSearch:
+            # quality criteria are recorded with each hit and applied afterwards
+            return
         search.settings.has_3d_coordinates = True
         search.settings.no_disorder = True
         if suppressMetals:
             search.settings.only_organic = True
             search.settings.no_metals = True
         search.settings.max_r_factor = self.__rValueMaxPercent
-        hits = search.search(max_hits_per_structure=1)
-        return hits
 
-    def __textSearch(self, aMol):
+    def __getQueryNameList(self, queryTargetId, aMol, cifTargetPath):
+        """Return the names used for the text search tier: the query molecule title and the
+        chemical component name from a sibling definition file when present."""
+        nameL = [aMol.identifier]
+        try:
+            mU = MarshalUtil()
+            if cifTargetPath and mU.exists(cifTargetPath):
+                containerL = mU.doImport(cifTargetPath, fmt="mmcif")
+                if containerL and containerL[0].exists("chem_comp"):
+                    nameL.append(containerL[0].getObj("chem_comp").getValueOrDefault("name", 0, None))
+        except Exception as e:
+            logger.debug("Name lookup failing for %s with %s", queryTargetId, str(e))
+        return [name for name in dict.fromkeys(nameL) if name and name not in ["?", "."]]
+
+    def __tieredSimilaritySearch(self, aMol, nameList, suppressMetals=False):
+        """Similarity search answered from a text search on the query names when possible.
+
+        Candidates from the text search that pass the search settings are scored against the query
+        and accepted at or above the similarity threshold.  Accepted candidates with a canonical SMILES
+        identical to the query are counted in the identity tier.  Identity is only tested for text
+        search candidates - there is no separate structure identity lookup, so a query whose names
+        do not occur in the CSD is answered by the full similarity search.  A full similarity search
+        is performed only when no candidate is accepted.
+        """
+        search = SimilaritySearch(aMol, threshold=self.__similarityThreshold)
+        self.__applySearchSettings(search, suppressMetals)
+        querySmiles = aMol.smiles
+        hitL = []
+        numIdentical = 0
+        seenS = set()
+        for name in nameList:
+            try:
+                textHits = self.__textSearch(name)
+            except Exception as e:
+                logger.debug("Text search for %r failing with %s", name, str(e))
+                continue
+            for textHit in textHits:
+                if textHit.identifier in seenS:
+                    continue
+                seenS.add(textHit.identifier)
+                entry = textHit.entry
+                if not search.settings.test(entry):
+                    continue
+                candidateMol = entry.molecule
+                simHit = search.search_molecule(candidateMol)
+                if simHit is None or simHit.similarity < self.__similarityThreshold:
+                    continue
+                if querySmiles and candidateMol.heaviest_component.smiles == querySmiles:
+                    numIdentical += 1
+                hitL.append(CcdcCandidateHit(entry, simHit.similarity))
+        if hitL:
+            self.__tierCountD["identity" if numIdentical else "text"] += 1
+            logger.info("Fast tier matched %d (identical %d) of %d text search candidates", len(hitL), numIdentical, len(seenS))
+            return sorted(hitL, key=lambda hit: hit.similarity, reverse=True)
+        self.__tierCountD["full"] += 1
+        return self.__similaritySearch(aMol, suppressMetals=suppressMetals)
+
+    def __textSearch(self, name):
         search = TextNumericSearch()
-        search.add_compound_name(aMol.identifier, mode="anywhere", ignore_non_alpha_num=True)
+        search.add_compound_name(name, mode="anywhere", ignore_non_alpha_num=True)
         # search.add_synonym(m.identifier) - no need to add synonym separate (should automatically search both name and synonym)
         textHits = search.search(max_hits_per_structure=1)
         return textHits
@@ -6,6 +6,27 @@
 #
 #  Updates:
 #   15-Jan-2021 jdw add option to export search hit list.
+#   18-Oct-2026 jdw move ccdc environment setup to CcdcEnv.setCcdcEnv()
+#   18-Oct-2026 jdw add --shard_manifest_path and --shard_index options for array jobs
+#   18-Oct-2026 jdw allow a comma separated list of search types sharing each query read
+#   18-Oct-2026 jdw add --tiered_search option
+#   18-Oct-2026 jdw add --compression option for gzip/zstd compressed structure and index output
+#   18-Oct-2026 jdw add --dedup_components option
+#   18-Oct-2026 jdw add --lazy_components option and --materialize_query_id to write recorded components on demand
+#   18-Oct-2026 jdw add --metadata_table_dir option to annotate hits from a memory-mapped CSD entry metadata table
+#   18-Oct-2026 jdw add --permissive_search option
+#   18-Oct-2026 jdw add --similarity_thresholds option for a similarity threshold sweep
+#   18-Oct-2026 jdw add --result_store_path option for a run-wide SQLite result store
+#   18-Oct-2026 jdw add --async_write option writing search output from a background thread
+#   18-Oct-2026 jdw add --bundle_path option to search the records of a multi-molecule SDF/mol2 bundle
+#   18-Oct-2026 jdw add --stdin streaming mode reading JSON-lines requests and writing a JSON result line per query
+#   18-Oct-2026 jdw add --profile_threshold option profiling slow queries with a report of the slowest queries
+#   18-Oct-2026 jdw add --progress_address option publishing query progress events to a progress monitor
+#   18-Oct-2026 jdw import CcdcSearch at the top level (the ccdc API is imported on the first search)
+#   18-Oct-2026 jdw accept a chemical component dictionary file (CIF) as --bundle_path
+#   18-Oct-2026 jdw add --idempotent_write option skipping unchanged output with a per-run change manifest
+#   18-Oct-2026 jdw add --result_layout option storing query results under hashed prefix directories
+#   18-Oct-2026 jdw add --no_profile_report option and write the hit list before the profile report
 #
 ##
 __docformat__ = "restructuredtext en"
@@ -17,7 +38,16 @@ import argparse
 import logging
 import os
 import sys
+import time
 
+from rcsb.utils.ccdc.CcdcComponentReader import openBundle
+from rcsb.utils.ccdc.CcdcEnv import setCcdcEnv
+from rcsb.utils.ccdc.CcdcMetadataTable import CcdcMetadataTable
+from rcsb.utils.ccdc.CcdcProfiler import CcdcProfiler
+from rcsb.utils.ccdc.CcdcProgress import CcdcProgressPublisher
+from rcsb.utils.ccdc.CcdcSearch import CcdcSearch
+from rcsb.utils.ccdc.CcdcSearchStream import CcdcSearchStream
+from rcsb.utils.ccdc.CcdcShardUtils import CcdcShardUtils
 from rcsb.utils.io.MarshalUtil import MarshalUtil
 
 HERE = os.path.abspath(os.path.dirname(__file__))
@@ -31,14 +61,59 @@ def main():
     parser = argparse.ArgumentParser()
     #
     parser.add_argument("--mol_list_path", default=None, help="Molecule file list path")
+    parser.add_argument(
+        "--bundle_path",
+        default=None,
+        help="Multi-molecule SDF or mol2 query bundle (query ids from record titles) or chemical component dictionary CIF (query ids from data blocks), "
+        "start/end records select bundle records",
+    )
     parser.add_argument("--result_path", default=None, help="Molecule file list path")
-    parser.add_argument("--search_type", default=None, help="Search type (similarity|substructure)")
+    parser.add_argument("--search_type", default=None, help="Search type (similarity|substructure) or a comma separated list of search types")
     parser.add_argument("--start_record", default=None, help="Starting record")
     parser.add_argument("--end_record", default=None, help="End record")
     parser.add_argument("--csdhome", default=None, help="Path to the CSD release (path to CSD_202x)")
     parser.add_argument("--python_lib_path", default=None, help="Path to Python library")
     parser.add_argument("--python_version", default=None, help="Python library version (default: 3.7)")
     parser.add_argument("--hit_list_path", default=None, help="Path to list of molecule identifers with search results")
+    parser.add_argument("--tiered_search", default=False, action="store_true", help="Answer similarity searches from a text search on the query names when possible")
+    parser.add_argument("--compression", default=None, choices=["gzip", "zstd"], help="Compress structure and index output files (gzip|zstd)")
+    parser.add_argument("--dedup_components", default=None, choices=["exact", "chemical"], help="Store each unique match component once per query result (exact|chemical)")
+    parser.add_argument("--lazy_components", default=False, action="store_true", help="Record matched component and atom indices in place of writing structure files")
+    parser.add_argument("--materialize_query_id", default=None, help="Write structure files for components recorded in lazy mode for these query ids (comma separated)")
+    parser.add_argument("--materialize_identifier", default=None, help="Restrict materialized components to this CSD identifier")
+    parser.add_argument("--metadata_table_dir", default=None, help="Directory holding CSD entry metadata tables (the table for the current CSD release is built if missing)")
+    parser.add_argument("--permissive_search", default=False, action="store_true", help="Search without quality criteria and record entry quality details for later filtering")
+    parser.add_argument("--similarity_thresholds", default=None, help="Comma separated similarity thresholds answered from a single search at the lowest threshold")
+    parser.add_argument("--result_store_path", default=None, help="Path to a run-wide SQLite result store shared by all search processes")
+    parser.add_argument("--async_write", default=False, action="store_true", help="Write structure and index files in the background while the next search runs")
+    parser.add_argument("--write_queue_size", default=64, type=int, help="Maximum number of pending background write operations")
+    parser.add_argument("--profile_threshold", default=None, type=float, help="Profile each query and store the profiles of queries taking at least this time (seconds)")
+    parser.add_argument(
+        "--no_profile_report", default=False, action="store_true", help="Skip the report of the slowest queries (written by the parent process of a multi-process run)"
+    )
+    parser.add_argument("--progress_address", default=None, help="Publish query progress events to this progress monitor address (host:port)")
+    parser.add_argument("--progress_worker", default=None, help="Worker name reported with progress events (default: host-pid)")
+    parser.add_argument("--idempotent_write", default=False, action="store_true", help="Write structure and index files only when their content has changed")
+    parser.add_argument(
+        "--change_manifest_path",
+        default=None,
+        help="Change manifest of this run in idempotent write mode (default: <result_path>/change-manifest.json or <result_path>/shards/change-manifest-<shard_index>.json)",
+    )
+    parser.add_argument("--hash_manifest_path", default=None, help="Change manifest of a previous run supplying file hashes (default: the change manifest path)")
+    parser.add_argument(
+        "--result_layout",
+        default="flat",
+        choices=["flat", "hashed"],
+        help="Result directory layout - <result_path>/<query_id> (flat) or under two levels of hashed prefix directories (hashed)",
+    )
+    parser.add_argument(
+        "--stdin",
+        default=False,
+        action="store_true",
+        help="Read JSON-lines search requests from stdin and write a JSON result line per query to stdout (--search_type sets a single default search type)",
+    )
+    parser.add_argument("--shard_manifest_path", default=None, help="Path to a shard manifest (ccdc_shard_cli plan)")
+    parser.add_argument("--shard_index", default=os.environ.get("SLURM_ARRAY_TASK_ID"), help="Shard index (1-based) in the shard manifest (default: $SLURM_ARRAY_TASK_ID)")
     #
     args = parser.parse_args()
     #
@@ -53,41 +128,129 @@ def main():
         startRecord = args.start_record
         endRecord = args.end_record
         hitListPath = args.hit_list_path
+        if args.shard_manifest_path:
+            manifestD, shardD = CcdcShardUtils().getShard(args.shard_manifest_path, args.shard_index)
+            molFilePath = manifestD["plan_list_path"]
+            resultPath = resultPath if resultPath else manifestD["result_path"]
+            searchType = searchType if searchType else manifestD["search_type"]
+            startRecord = shardD["start_record"]
+            endRecord = shardD["end_record"]
+            hitListPath = hitListPath if hitListPath else shardD["hit_list_path"]
+            logger.info("Shard %r records %r-%r of %s", args.shard_index, startRecord, endRecord, molFilePath)
+        changeManifestPath = args.change_manifest_path
+        if args.idempotent_write and not changeManifestPath:
+            if args.shard_manifest_path:
+                changeManifestPath = os.path.join(resultPath, "shards", "change-manifest-%s.json" % args.shard_index)
+            else:
+                changeManifestPath = os.path.join(resultPath, "change-manifest.json")
+        hashManifestPath = args.hash_manifest_path if args.hash_manifest_path else changeManifestPath
+        if args.stdin and searchType and "," in searchType:
+            # streamed requests select their own search type - --search_type is the single default
+            raise ValueError("--stdin accepts a single --search_type (got %r)" % searchType)
     except Exception as e:
         logger.exception("Argument processing problem %s", str(e))
         parser.print_help(sys.stderr)
         exit(1)
     #
     try:
-        os.environ["CSDHOME"] = csdHome
-        os.environ["LD_LIBRARY_PATH"] = "%s:%s/python%s/site-packages/ccdc/_lib:$LD_LIBRARY_PATH" % (pyLib, pyLib, pyVer)
-        os.environ["DYLD_LIBRARY_PATH"] = "%s/python%s/site-packages/ccdc/_lib" % (pyLib, pyVer)
-        os.environ["DYLD_FRAMEWORK_PATH"] = "%s/python%s/site-packages/ccdc/_lib" % (pyLib, pyVer)
+        setCcdcEnv(csdHome, pythonLibPath=pyLib, pythonVersion=pyVer)
 
         logger.info("Using CSDHOME %s", os.environ["CSDHOME"])
         logger.info("Using DYLD_LIBRARY_PATH %s", os.environ["DYLD_LIBRARY_PATH"])
         logger.info("Using DYLD_FRAMEWORK_PATH %s", os.environ["DYLD_FRAMEWORK_PATH"])
 
-        from rcsb.utils.ccdc.CcdcSearch import CcdcSearch  # pylint: disable=import-outside-toplevel
+        metadataTablePath = None
+        if args.metadata_table_dir:
+            from ccdc.io import csd_version  # pylint: disable=import-outside-toplevel
 
-        ccdcS = CcdcSearch(verbose=True)
+            metadataTablePath = CcdcMetadataTable.getTablePath(args.metadata_table_dir, csd_version())
+            if not os.access(metadataTablePath, os.R_OK):
+                numRecords = CcdcMetadataTable(metadataTablePath).buildFromCsd()
+                logger.info("Built metadata table %s (%d records)", metadataTablePath, numRecords)
+        ccdcS = CcdcSearch(
+            verbose=True,
+            tieredSearch=args.tiered_search,
+            compression=args.compression,
+            dedupComponents=args.dedup_components,
+            lazyComponents=args.lazy_components,
+            metadataTablePath=metadataTablePath,
+            permissiveSearch=args.permissive_search,
+            resultStorePath=args.result_store_path,
+            asyncWrite=args.async_write,
+            writeQueueSize=args.write_queue_size,
+            profileThreshold=args.profile_threshold,
+            idempotentWrite=args.idempotent_write,
+            hashManifestPath=hashManifestPath,
+            changeManifestPath=changeManifestPath,
+            resultLayout=args.result_layout,
+        )
+        if args.materialize_query_id:
+            for queryTargetId in args.materialize_query_id.split(","):
+                mol2L = ccdcS.materialize(queryTargetId, resultPath, identifier=args.materialize_identifier)
+                logger.info("Materialized %d components for %r", len(mol2L), queryTargetId)
+            ccdcS.close()
+            return
+        if args.stdin:
+            # Streaming mode - one searcher serves requests until the end of stdin (logging is written to stderr)
+            sD = CcdcSearchStream(ccdcS, resultPath, searchType=searchType).run(sys.stdin, sys.stdout)
+            ccdcS.close()
+            logger.info("Streamed searches %r", sD)
+            return
+        if args.bundle_path:
+            # Bundle records startRecord-endRecord are read lazily as one byte range
+            searchTypeL = searchType.split(",") if searchType else [searchType]
+            hitD = {}
+            for rangeD in openBundle(args.bundle_path).getRanges(recordsPerRange=sys.maxsize, startRecord=startRecord, endRecord=endRecord):
+                for st in searchTypeL:
+                    stResultPath = os.path.join(resultPath, st) if len(searchTypeL) > 1 else resultPath
+                    for queryTargetId, numHits in ccdcS.searchBundle(
+                        args.bundle_path, stResultPath, start=rangeD["start"], end=rangeD["end"], queryIdList=rangeD["query_ids"], searchType=st
+                    ).items():
+                        hitD[queryTargetId] = hitD.get(queryTargetId, 0) + (numHits or 0)
+            ccdcS.close()
+            hitL = [queryTargetId for queryTargetId, numHits in hitD.items() if numHits]
+            logger.info("%d bundle searches completed - matched %d", len(hitD), len(hitL))
+            if hitListPath:
+                ok = MarshalUtil().doExport(hitListPath, hitL, fmt="list")
+                logger.info("Wrote hit list (%r) to %s", ok, hitListPath)
+            return
         pL = ccdcS.getList(molFilePath, startRecord=startRecord, endRecord=endRecord)
         logger.info("Search file %s record length %r", molFilePath, len(pL) if pL else [])
         #
+        # Several search types (e.g. similarity,substructure) share one query read with results stored in <result_path>/<search_type>
+        searchTypeL = searchType.split(",") if searchType else [searchType]
+        progressP = CcdcProgressPublisher(args.progress_address, worker=args.progress_worker) if args.progress_address else None
         hitL = []
         for ii, queryTargetPath in enumerate(pL, 1):
             _, fn = os.path.split(queryTargetPath)
             queryTargetId, _ = os.path.splitext(fn)
             #
             logger.info("(%d/%d) Start search for %r %r", ii, len(pL), queryTargetId, queryTargetPath)
-            numHits = ccdcS.search(queryTargetId, queryTargetPath, resultPath, searchType=searchType)
+            startTime = time.time()
+            if args.similarity_thresholds and searchType == "similarity":
+                hitD = ccdcS.searchSweep(queryTargetId, queryTargetPath, resultPath, [float(tS) for tS in args.similarity_thresholds.split(",")])
+                numHits = max(hitD.values())
+            elif len(searchTypeL) > 1:
+                hitD = ccdcS.searchMulti(queryTargetId, queryTargetPath, {st: os.path.join(resultPath, st) for st in searchTypeL})
+                numHits = sum(hitD.values())
+            else:
+                numHits = ccdcS.search(queryTargetId, queryTargetPath, resultPath, searchType=searchType)
             if numHits:
                 hitL.append(queryTargetId)
+            if progressP:
+                progressP.queryDone(queryTargetId, numHits, time.time() - startTime)
+        if progressP:
+            progressP.close()
+        ccdcS.close()
         logger.info("%d searches completed - matched %d", len(pL), len(hitL))
+        if args.tiered_search:
+            logger.info("Similarity searches answered by tier %r", ccdcS.getTierStatistics())
         if hitListPath:
             mU = MarshalUtil()
             ok = mU.doExport(hitListPath, hitL, fmt="list")
             logger.info("Wrote hit list (%r) to %s", ok, hitListPath)
+        if args.profile_threshold is not None and not args.no_profile_report:
+            CcdcProfiler.writeReport(resultPath)
     except Exception as e:
         logger.exception("Failing with %s", str(e))
 
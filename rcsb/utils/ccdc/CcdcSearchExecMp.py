@@ -6,6 +6,13 @@
 # Version: 0.001
 #
 # Updated:
+#   18-Oct-2026 jdw add profileThreshold option with a run-level report of the slowest queries
+#   18-Oct-2026 jdw add live progress aggregated from worker events into a periodically written status file
+#   18-Oct-2026 jdw add numProc="auto" calibration of the number of processes and chunk size (CcdcAutoTune)
+#   18-Oct-2026 jdw add idempotentWrite option merging the change manifests of all chunks (CcdcChangeManifest)
+#   18-Oct-2026 jdw add resultLayout option with the result manifest written at the end of the run (CcdcResultLayout)
+#   18-Oct-2026 jdw dispatch query chunks on CcdcWorkerPool() in place of rcsb.utils.multiproc
+#   18-Oct-2026 jdw name the chunk working directories and progress workers by the pool process
 #
 ##
 """
@@ -19,18 +26,38 @@ __license__ = "Apache 2.0"
 
 # pylint: disable=redefined-outer-name
 
+import glob
 import logging
+import multiprocessing
+import resource
+import sys
 import time
 import os
 import os.path
 
+from rcsb.utils.ccdc.CcdcAutoTune import CcdcAutoTune
+from rcsb.utils.ccdc.CcdcChangeManifest import CcdcChangeManifest
+from rcsb.utils.ccdc.CcdcProfiler import CcdcProfiler
+from rcsb.utils.ccdc.CcdcProgress import CcdcProgressMonitor
+from rcsb.utils.ccdc.CcdcResultLayout import CcdcResultLayout
+from rcsb.utils.ccdc.CcdcWorkerPool import CcdcWorkerPool
 from rcsb.utils.io.ExecUtils import ExecUtils
 from rcsb.utils.io.MarshalUtil import MarshalUtil
-from rcsb.utils.multiproc.MultiProcUtil import MultiProcUtil
 
 logger = logging.getLogger(__name__)
 
 
+def _searchChunkWorker(payload):
+    """Pool task - search a chunk of query paths in a ccdc_search_cli shell (CcdcSearchExecWorker.search()).
+
+    The working directory (<resultPath>/<procName>) and the progress worker name are those of the pool
+    process (e.g. ccdc-worker-1), so the chunks run by a worker share its query list, hit list and log.
+    """
+    procName = multiprocessing.current_process().name
+    _, resultList, diagList = CcdcSearchExecWorker().search(payload["query_list"], procName, payload["options"], payload["options"]["resultPath"])
+    return resultList, diagList
+
+
 class CcdcSearchExecWorker(object):
     def __init__(self, verbose=True):
         self.__verbose = verbose
@@ -53,12 +80,17 @@ class CcdcSearchExecWorker(object):
             workingDir (str): path to working directory (not used)
 
         Returns:
-            (successList, resultList, []): success and result lists of mol2 paths with CCDC matches
+            (successList, resultList, diagList): success and result lists of mol2 paths with CCDC matches and
+                                                 the chunk timing and peak resident memory of the search shell
         """
         resultPath = optionsD["resultPath"]
         searchType = optionsD["searchType"]
         pythonRootPath = optionsD["pythonRootPath"]
         csdHome = optionsD["csdHome"]
+        profileThreshold = optionsD.get("profileThreshold")
+        progressAddress = optionsD.get("progressAddress")
+        idempotentWrite = optionsD.get("idempotentWrite", False)
+        resultLayout = optionsD.get("resultLayout", "flat")
         _ = workingDir
         resultList = []
         startTime = time.time()
@@ -84,9 +116,18 @@ class CcdcSearchExecWorker(object):
             logPath = os.path.join(resultPath, procName, "execlog.log")
 
             logger.info("cmdPath %r", cmdPath)
+            # the report of the slowest queries is written once by the parent when all chunks are done
+            profileOpt = " --profile_threshold %s --no_profile_report" % profileThreshold if profileThreshold is not None else ""
+            layoutOpt = " --result_layout %s" % resultLayout if resultLayout != "flat" else ""
+            progressOpt = " --progress_address %s --progress_worker %s" % (progressAddress, procName) if progressAddress else ""
+            idempotentOpt = ""
+            if idempotentWrite:
+                # each chunk writes its own change manifest merged at the end of the run
+                partPath = os.path.join(resultPath, procName, "change-manifest-%d.json" % len(glob.glob(os.path.join(resultPath, procName, "change-manifest-*.json"))))
+                idempotentOpt = " --idempotent_write --hash_manifest_path %s --change_manifest_path %s" % (os.path.join(resultPath, "change-manifest.json"), partPath)
             ok = exU.runShell(
-                "%s --mol_list_path %s --result_path %s --search_type %s --csdhome %s --hit_list_path %s"
-                % (cmdPath, queryListFilePath, resultPath, searchType, csdHome, hitListPath),
+                "%s --mol_list_path %s --result_path %s --search_type %s --csdhome %s --hit_list_path %s%s%s%s%s"
+                % (cmdPath, queryListFilePath, resultPath, searchType, csdHome, hitListPath, profileOpt, progressOpt, idempotentOpt, layoutOpt),
                 outPath=logPath,
                 outAppend=False,
                 timeOut=60,
@@ -100,7 +141,10 @@ class CcdcSearchExecWorker(object):
 
         endTime = time.time()
         logger.info("%s (result len %d) completed at %s (%.2f seconds)", procName, len(resultList), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - startTime)
-        return resultList, resultList, []
+        # peak resident size of the completed search shells in KB (Linux) or bytes (Darwin)
+        rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        diagD = {"proc_name": procName, "num_queries": len(dataList), "seconds": endTime - startTime, "max_rss_mb": rss / 1048576.0 if sys.platform == "darwin" else rss / 1024.0}
+        return resultList, resultList, [diagD]
 
 
 class CcdcSearchExecMp(object):
@@ -111,26 +155,140 @@ class CcdcSearchExecMp(object):
         self.__csdHome = csdHome
         #
 
-    def runSearch(self, molFilePathList, resultPath, searchType="similarity", numProc=4, chunkSize=10):
+    def runSearch(
+        self,
+        molFilePathList,
+        resultPath,
+        searchType="similarity",
+        numProc=4,
+        chunkSize=10,
+        profileThreshold=None,
+        profileTopN=20,
+        statusPath=None,
+        statusInterval=5.0,
+        maxProc=None,
+        idempotentWrite=False,
+        resultLayout="flat",
+    ):
         """Run CCDC search in multiprocess mode.
 
+        With numProc="auto" a short calibration searches a sample of the input at increasing numbers of
+        processes (CcdcAutoTune) measuring the throughput, per-query latency, worker memory and I/O wait,
+        and chooses the number of processes (and with chunkSize="auto" the chunk size) for the rest of the run.
+        The measurements and the decision are logged and stored in <resultPath>/search-tuning.json.
+
         Args:
             molFilePathList (list): input mol2/sdf path list to search
             resultPath (str): directory path to store results
             searchType (str, optional): search type (substructure|similarity). Defaults to "similarity".
-            numProc (int, optional): number of processes to invoke. Defaults to 4.
-            chunkSize (int, optional): work chunksize. Defaults to 10.
+            numProc (int or str, optional): number of processes to invoke or "auto" to calibrate. Defaults to 4.
+            chunkSize (int or str, optional): work chunksize or "auto" to calibrate. Defaults to 10.
+            profileThreshold (float, optional): store the profiles of queries taking at least this time (seconds) and write
+                a report of the slowest queries of all chunks to <resultPath>/query-profile-report.json. Defaults to None (no profiling).
+            profileTopN (int, optional): number of slowest queries in the profile report. Defaults to 20.
+            statusPath (str, optional): live progress status file (completed/total, throughput, ETA and worker utilization)
+                updated from the query events published by each worker. Defaults to <resultPath>/search-progress.json.
+            statusInterval (float, optional): status file update interval (seconds). Defaults to 5.0.
+            maxProc (int, optional): maximum number of processes in calibration. Defaults to None (number of CPUs).
+            idempotentWrite (bool, optional): write structure and index files only when their content has changed, comparing with
+                the hashes in the change manifest of the previous run, and write the change manifest of this run to
+                <resultPath>/change-manifest.json. Defaults to False.
+            resultLayout (str, optional): result directory layout (flat|hashed) - with the hashed layout the results of each query are
+                stored under two levels of hashed prefix directories and the result manifest <resultPath>/result-manifest.json mapping
+                each query identifier to its result directory is written at the end of the run. Defaults to "flat".
         """
         logger.info("Starting with molfile path list length %d", len(molFilePathList))
+        statusPath = statusPath if statusPath else os.path.join(resultPath, "search-progress.json")
+        progressM = None
         try:
-            pU = CcdcSearchExecWorker(verbose=self.__verbose)
-            mpu = MultiProcUtil(verbose=True)
-            mpu.setWorkingDir(resultPath)
-            mpu.setOptions(optionsD={"resultPath": resultPath, "searchType": searchType, "pythonRootPath": self.__pythonRootPath, "csdHome": self.__csdHome})
+            MarshalUtil().mkdir(resultPath)
+            partPattern = os.path.join(resultPath, "*", "change-manifest-*.json")
+            if idempotentWrite:
+                # remove the chunk manifests of an interrupted run
+                for pth in glob.glob(partPattern):
+                    os.remove(pth)
+            progressM = CcdcProgressMonitor(len(molFilePathList), statusPath, interval=statusInterval, verbose=self.__verbose)
+            progressM.start()
+            optionsD = {
+                "resultPath": resultPath,
+                "searchType": searchType,
+                "pythonRootPath": self.__pythonRootPath,
+                "csdHome": self.__csdHome,
+                "profileThreshold": profileThreshold,
+                "progressAddress": progressM.getAddress(),
+                "idempotentWrite": idempotentWrite,
+                "resultLayout": resultLayout,
+            }
             #
-            mpu.set(workerObj=pU, workerMethod="search")
-
-            ok, failList, resultList, _ = mpu.runMulti(dataList=molFilePathList, numProc=numProc, numResults=1, chunkSize=chunkSize)
-            logger.info("Run ended with status %r success count %d failures %r", ok, len(resultList[0]), len(failList))
+            dataList = molFilePathList
+            numMatched = 0
+            if numProc == "auto" or chunkSize == "auto":
+                trialL = []
+                aT = CcdcAutoTune(
+                    lambda queryList, nProc, cSize: self.__runTrial(optionsD, progressM, queryList, nProc, cSize, trialL),
+                    levelList=None if numProc == "auto" else [numProc],
+                    maxProc=maxProc,
+                    verbose=self.__verbose,
+                )
+                tunedProc, tunedChunk, dataList, tuneD = aT.calibrate(molFilePathList)
+                numProc = tunedProc if numProc == "auto" else numProc
+                chunkSize = tunedChunk if chunkSize == "auto" else chunkSize
+                numMatched = sum(trialL)
+                tuneD.update({"num_proc": numProc, "chunk_size": chunkSize, "num_sample_matched": numMatched})
+                MarshalUtil().doExport(os.path.join(resultPath, "search-tuning.json"), tuneD, fmt="json", indent=3)
+                logger.info("Continuing the remaining %d queries with %d processes chunk size %d", len(dataList), numProc, chunkSize)
+            if dataList:
+                resultList, failList, _ = self.__runChunks(optionsD, dataList, numProc, chunkSize)
+                logger.info("Run ended with status %r success count %d failures %r", not failList, len(resultList) + numMatched, len(failList))
+            if profileThreshold is not None:
+                CcdcProfiler.writeReport(resultPath, topN=profileTopN)
+            partL = sorted(glob.glob(partPattern)) if idempotentWrite else []
+            if partL:
+                CcdcChangeManifest.merge(partL, os.path.join(resultPath, "change-manifest.json"))
+                for pth in partL:
+                    os.remove(pth)
+            if resultLayout == "hashed":
+                CcdcResultLayout.writeManifest(resultPath)
         except Exception as e:
             logger.exception("Failing with %s", str(e))
+        if progressM is not None:
+            progressM.stop()
+
+    def __runChunks(self, optionsD, dataList, numProc, chunkSize):
+        """Search the input query paths in chunks of chunkSize queries on a pool of numProc processes.
+
+        Returns:
+            (list, list, list): query paths with matches, query paths of failed chunks and the diagnostics of each chunk
+        """
+        payloadL = []
+        for ii in range(0, len(dataList), chunkSize):
+            payloadL.append({"query_list": dataList[ii : ii + chunkSize], "options": optionsD})
+        resultList = []
+        failList = []
+        diagList = []
+        wp = CcdcWorkerPool(_searchChunkWorker, numProc=min(numProc, len(payloadL)) if payloadL else 1)
+        for taskIndex, result, errMsg, _ in wp.run(payloadL, chunkSize=1):
+            if errMsg or not result:
+                failList.extend(payloadL[taskIndex]["query_list"])
+                continue
+            resultList.extend(result[0])
+            diagList.extend(result[1])
+        return resultList, failList, diagList
+
+    def __runTrial(self, optionsD, progressM, queryList, numProc, chunkSize, trialL):
+        """Search a calibration sample and return its measurements (CcdcAutoTune trial function)."""
+        startD = progressM.getStatus()
+        resultList, _, diagList = self.__runChunks(optionsD, queryList, numProc, chunkSize)
+        trialL.append(len(resultList))
+        # allow the monitor to receive the last query events of the sample
+        endD = progressM.getStatus()
+        waitTime = time.time() + 2.0
+        while endD["num_completed"] - startD["num_completed"] < len(queryList) and time.time() < waitTime:
+            time.sleep(0.1)
+            endD = progressM.getStatus()
+        rD = {"num_chunks": len(diagList), "chunk_seconds": sum(dD["seconds"] for dD in diagList), "max_rss_mb": max([dD["max_rss_mb"] for dD in diagList] or [0.0])}
+        numCompleted = endD["num_completed"] - startD["num_completed"]
+        if numCompleted:
+            busySeconds = [sum(wD["busy_seconds"] for wD in sD["workers"].values()) for sD in (startD, endD)]
+            rD.update({"num_completed": numCompleted, "query_seconds": busySeconds[1] - busySeconds[0]})
+        return rD
@@ -6,13 +6,31 @@
 # Version: 0.001
 #
 # Updated:
+#   18-Oct-2026 jdw replace rcsb.utils.multiproc with a spawn/forkserver process pool that initializes
+#                   the ccdc API once per worker process.
+#   18-Oct-2026 jdw use CcdcWorkerPool() with worker recycling by query count or memory ceiling and
+#                   report per query resident memory in the run summary.
+#   18-Oct-2026 jdw add compression option for gzip/zstd compressed structure and index output
+#   18-Oct-2026 jdw add dedupComponents and lazyComponents options
+#   18-Oct-2026 jdw add metadataTablePath option shared by all workers
+#   18-Oct-2026 jdw add permissiveSearch option
+#   18-Oct-2026 jdw add resultStorePath option with the store flushed as each worker exits
+#   18-Oct-2026 jdw add asyncWrite option with pending output flushed as each worker exits
+#   18-Oct-2026 jdw add bundlePath option dispatching byte ranges of a multi-molecule SDF/mol2 bundle to workers
+#   18-Oct-2026 jdw add profileThreshold option with a run-level report of the slowest queries
+#   18-Oct-2026 jdw add resultLayout option with the result manifest written when all workers are done
+#   18-Oct-2026 jdw count the queries in each bundle byte range toward maxQueriesPerWorker
+#   18-Oct-2026 jdw flush buffered result store records and pending output at the end of each worker task
+#   18-Oct-2026 jdw accept a chemical component dictionary file (CIF) as bundlePath
 #
 ##
 """
 MP execution wrapper for substructure and similarity search against the CCDC local Python API -
 
-NOTE:  The latest ccdc API appears not compatible with rcsb.utils.multiproc and Python multiprocessing modules
-       so this code is not currently used.
+The ccdc API cannot be used across a fork() of an initialized process (e.g. rcsb.utils.multiproc).
+This wrapper runs searches in a pool of 'spawn' (or 'forkserver') worker processes (CcdcWorkerPool).  Each
+worker sets the CCDC environment, imports the ccdc API and creates one CcdcSearch instance in its initializer.
+The parent process never imports ccdc and search results are returned directly from the workers.
 
 """
 __docformat__ = "restructuredtext en"
@@ -20,87 +38,311 @@ __author__ = "John Westbrook"
 __email__ = "john.westbrook@rcsb.org"
 __license__ = "Apache 2.0"
 
-# pylint: disable=redefined-outer-name
+# pylint: disable=redefined-outer-name,global-statement
 
 import logging
 import time
 import os
 import os.path
 
-from rcsb.utils.ccdc.CcdcSearch import CcdcSearch
-from rcsb.utils.multiproc.MultiProcUtil import MultiProcUtil
+from rcsb.utils.ccdc.CcdcComponentReader import openBundle
+from rcsb.utils.ccdc.CcdcEnv import setCcdcEnv
+from rcsb.utils.ccdc.CcdcProfiler import CcdcProfiler
+from rcsb.utils.ccdc.CcdcResultLayout import CcdcResultLayout
+from rcsb.utils.ccdc.CcdcWorkerPool import CcdcWorkerPool
+from rcsb.utils.io.MarshalUtil import MarshalUtil
 
 logger = logging.getLogger(__name__)
 
+# Per-process worker state (set by the pool initializer in each worker)
+_WORKER_STATE = {}
 
-class CcdcSearchWorker(object):
-    def __init__(self, verbose=True):
-        self.__verbose = verbose
 
-    def __checkStop(self, path):
-        try:
-            if os.access(path, os.F_OK):
-                return True
-        except Exception:
-            pass
-        return False
-
-    def search(self, dataList, procName, optionsD, workingDir):
-        """"""
-        resultPath = optionsD["resultPath"]
-        searchType = optionsD["searchType"]
-        _ = workingDir
-        ky = None
+def _initWorker(optionsD):
+    """Worker initializer - set the CCDC environment, import the ccdc API and create the search instance once per worker."""
+    global _WORKER_STATE
+    if optionsD.get("csdHome"):
+        setCcdcEnv(optionsD["csdHome"], pythonLibPath=optionsD.get("pythonLibPath"), pythonVersion=optionsD.get("pythonVersion"))
+    from rcsb.utils.ccdc.CcdcSearch import CcdcSearch  # pylint: disable=import-outside-toplevel
+
+    ccdcS = CcdcSearch(
+        verbose=optionsD.get("verbose", True),
+        similarityThreshold=optionsD["similarityThreshold"],
+        rValueMaxPercent=optionsD["rValueMaxPercent"],
+        compression=optionsD.get("compression"),
+        dedupComponents=optionsD.get("dedupComponents"),
+        lazyComponents=optionsD.get("lazyComponents", False),
+        metadataTablePath=optionsD.get("metadataTablePath"),
+        permissiveSearch=optionsD.get("permissiveSearch", False),
+        resultStorePath=optionsD.get("resultStorePath"),
+        asyncWrite=optionsD.get("asyncWrite", False),
+        profileThreshold=optionsD.get("profileThreshold"),
+        resultLayout=optionsD.get("resultLayout", "flat"),
+    )
+    _WORKER_STATE = {"ccdcSearch": ccdcS, "optionsD": optionsD}
+    logger.info("Worker %d initialized with CSDHOME %r", os.getpid(), os.environ.get("CSDHOME"))
+
+
+def _exitWorker():
+    """Worker exit function - complete pending output and flush buffered results."""
+    if "ccdcSearch" in _WORKER_STATE:
+        _WORKER_STATE["ccdcSearch"].close()
+
+
+def _searchWorker(queryTargetPath):
+    """Search a single query molecule file in a worker process.
+
+    Returns:
+        (tuple): (queryTargetPath, queryTargetId, numHits, elapsed seconds, error message or None)
+    """
+    ccdcS = _WORKER_STATE["ccdcSearch"]
+    optionsD = _WORKER_STATE["optionsD"]
+    resultPath = optionsD["resultPath"]
+    _, fn = os.path.split(queryTargetPath)
+    queryTargetId, _ = os.path.splitext(fn)
+    startTime = time.time()
+    try:
+        if os.access(os.path.join(resultPath, "STOP"), os.F_OK):
+            return queryTargetPath, queryTargetId, 0, 0.0, "stopped"
+        numHits = ccdcS.search(
+            queryTargetId, queryTargetPath, resultPath, searchType=optionsD["searchType"], maxHits=optionsD["maxHits"], suppressMetals=optionsD["suppressMetals"]
+        )
+        # complete the output of the task before it is reported (a worker may be stopped before it exits)
+        ccdcS.flush()
+        return queryTargetPath, queryTargetId, numHits, time.time() - startTime, None
+    except Exception as e:
+        logger.exception("Failing for %r with %s", queryTargetId, str(e))
+        return queryTargetPath, queryTargetId, 0, time.time() - startTime, str(e)
+
+
+def _searchBundleWorker(rangeD):
+    """Search the query molecules in a byte range of a multi-molecule bundle in a worker process.
+
+    Returns:
+        (list): [(bundlePath, queryTargetId, numHits, elapsed seconds, error message or None), ...]
+    """
+    ccdcS = _WORKER_STATE["ccdcSearch"]
+    optionsD = _WORKER_STATE["optionsD"]
+    resultPath = optionsD["resultPath"]
+    bundlePath = optionsD["bundlePath"]
+    if os.access(os.path.join(resultPath, "STOP"), os.F_OK):
+        return [(bundlePath, queryTargetId, 0, 0.0, "stopped") for queryTargetId in rangeD["query_ids"]]
+    rL = []
+    bR = openBundle(bundlePath)
+    for queryTargetId, record in bR.iterRecords(start=rangeD["start"], end=rangeD["end"], queryIdList=rangeD["query_ids"]):
         startTime = time.time()
-        logger.info("starting %s at %s", procName, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
-        resultList = []
         try:
-            stopPath = os.path.join(resultPath, "STOP")
-            logger.info("%s search list length %d", procName, len(dataList))
-
-            for ii, queryTargetPath in enumerate(dataList):
-                _, fn = os.path.split(queryTargetPath)
-                queryTargetId, _ = os.path.splitext(fn)
-                parentId = queryTargetId.split("|")[0]
-                logger.info("%s starting %s (%s) (%d of %d)", procName, parentId, queryTargetId, ii + 1, len(dataList))
-                if self.__checkStop(stopPath):
-                    logger.info("%s stopping at %d of %d", procName, ii + 1, len(dataList))
-                    break
-                logger.info("%s search list %d of %d", procName, ii + 1, len(dataList))
-                try:
-                    vS = CcdcSearch(verbose=self.__verbose)
-                    numHits = vS.search(queryTargetId, queryTargetPath, resultPath, searchType=searchType)
-                    if numHits:
-                        resultList.append(queryTargetPath)
-                except Exception as e:
-                    logger.exception("Failing for %r with %s", ky, str(e))
-
+            numHits = ccdcS.searchRecord(
+                queryTargetId,
+                record,
+                resultPath,
+                fmt=bR.getFormat(),
+                queryTargetPath=bundlePath,
+                searchType=optionsD["searchType"],
+                maxHits=optionsD["maxHits"],
+                suppressMetals=optionsD["suppressMetals"],
+            )
+            rL.append((bundlePath, queryTargetId, numHits, time.time() - startTime, None))
         except Exception as e:
-            logger.exception("Failing for %r with %s", ky, str(e))
+            logger.exception("Failing for %r with %s", queryTargetId, str(e))
+            rL.append((bundlePath, queryTargetId, 0, time.time() - startTime, str(e)))
+    try:
+        ccdcS.flush()
+    except Exception as e:
+        logger.exception("Failing for %r with %s", rangeD["query_ids"], str(e))
+        rL = [(pth, queryTargetId, numHits, seconds, error or str(e)) for pth, queryTargetId, numHits, seconds, error in rL]
+    return rL
+
 
-        endTime = time.time()
-        logger.info(" %s completed at %s (%.2f seconds)", procName, time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - startTime)
-        return resultList, [], []
+def _getRangeQueryCount(rangeD):
+    """Return the number of queries in a bundle byte range (work units counted toward maxQueriesPerWorker)."""
+    return len(rangeD["query_ids"])
 
 
 class CcdcSearchMp(object):
-    def __init__(self, verbose=True):
-        """MP execution wrapper for variant search against the CCDC local Python API -"""
+    def __init__(self, csdHome=None, pythonRootPath=None, pythonVersion=None, startMethod="spawn", verbose=True):
+        """MP execution wrapper for search against the CCDC local Python API.
+
+        Args:
+            csdHome (str, optional): path to the CSD release (path to CSD_202x). Defaults to the current environment.
+            pythonRootPath (str, optional): path to the Python installation hosting the ccdc API. Defaults to $PYROOT.
+            pythonVersion (str, optional): Python library version. Defaults to "3.7".
+            startMethod (str, optional): multiprocessing start method (spawn|forkserver). Defaults to "spawn".
+            verbose (bool, optional): verbose logging. Defaults to True.
+        """
         self.__verbose = verbose
+        self.__csdHome = csdHome
+        self.__pythonLibPath = os.path.join(pythonRootPath, "lib") if pythonRootPath else None
+        self.__pythonVersion = pythonVersion
+        if startMethod not in ["spawn", "forkserver"]:
+            raise ValueError("Unsupported start method %r (spawn|forkserver)" % startMethod)
+        self.__startMethod = startMethod
         #
 
-    def runSearch(self, molFilePathList, resultPath, searchType="similarity", numProc=4, chunkSize=10):
-        """"""
-        logger.info("Starting with molfile path list length %d", len(molFilePathList))
+    def runSearch(
+        self,
+        molFilePathList,
+        resultPath,
+        searchType="similarity",
+        numProc=4,
+        chunkSize=10,
+        maxHits=50,
+        suppressMetals=False,
+        similarityThreshold=0.95,
+        rValueMaxPercent=10.0,
+        maxQueriesPerWorker=None,
+        maxWorkerRssMb=None,
+        summaryPath=None,
+        compression=None,
+        dedupComponents=None,
+        lazyComponents=False,
+        metadataTablePath=None,
+        permissiveSearch=False,
+        resultStorePath=None,
+        asyncWrite=False,
+        bundlePath=None,
+        profileThreshold=None,
+        profileTopN=20,
+        resultLayout="flat",
+    ):
+        """Run CCDC search in multiprocess mode.
+
+        Workers may be recycled after a number of queries or on crossing a resident memory ceiling.
+        Unfinished work held by a recycled worker is dispatched to its replacement.  The resident
+        memory sampled after each query is reported in the run summary.
+
+        With a multi-molecule query bundle (bundlePath), the bundle is divided into byte ranges of chunkSize
+        records (CcdcBundleReader) and each worker reads and searches the records in the ranges it is given.
+
+        Args:
+            molFilePathList (list): input mol2/sdf path list to search (ignored with bundlePath)
+            resultPath (str): directory path to store results
+            searchType (str, optional): search type (substructure|similarity). Defaults to "similarity".
+            numProc (int, optional): number of worker processes. Defaults to 4.
+            chunkSize (int, optional): number of queries dispatched to a worker at a time (records per byte range for a bundle). Defaults to 10.
+            maxHits (int, optional): maximum number of matches to return per query. Defaults to 50.
+            suppressMetals (bool, optional): filter structures containing metals. Defaults to False.
+            similarityThreshold (float, optional): similarity search threshold. Defaults to 0.95.
+            rValueMaxPercent (float, optional): maximum R-factor (percent) of matching structures. Defaults to 10.0.
+            maxQueriesPerWorker (int, optional): recycle a worker after this number of queries (for a bundle, after the byte range
+                in which the count is reached). Defaults to None (no limit).
+            maxWorkerRssMb (float, optional): recycle a worker when its resident memory exceeds this size (MB). Defaults to None (no limit).
+            summaryPath (str, optional): run summary path. Defaults to <resultPath>/search-run-summary.json.
+            compression (str, optional): compress structure and index output files (gzip|zstd). Defaults to None.
+            dedupComponents (str, optional): store each unique match component once per query result (exact|chemical). Defaults to None.
+            lazyComponents (bool, optional): record matched component and atom indices in place of writing structure files. Defaults to False.
+            metadataTablePath (str, optional): CSD entry metadata table (CcdcMetadataTable) mapped by all workers to annotate hits. Defaults to None.
+            permissiveSearch (bool, optional): search without quality criteria and record entry quality details for later filtering. Defaults to False.
+            resultStorePath (str, optional): run-wide SQLite result store (CcdcResultStore) receiving batched inserts from each worker. Defaults to None.
+            asyncWrite (bool, optional): write output from a background thread in each worker while the next query is searched. Defaults to False.
+            bundlePath (str, optional): multi-molecule SDF or mol2 query bundle with the query identifiers taken from the record titles, or a
+                chemical component dictionary file (CIF) with the query identifiers taken from the data block names. Defaults to None.
+            profileThreshold (float, optional): store the profiles of queries taking at least this time (seconds) with the query results and
+                write a report of the slowest queries of all workers to <resultPath>/query-profile-report.json. Defaults to None (no profiling).
+            profileTopN (int, optional): number of slowest queries in the profile report. Defaults to 20.
+            resultLayout (str, optional): result directory layout (flat|hashed) - with the hashed layout the results of each query are stored
+                under two levels of hashed prefix directories and the result manifest <resultPath>/result-manifest.json is written when
+                all workers are done. Defaults to "flat".
+
+        Returns:
+            (list): query paths with search matches (query identifiers for a bundle)
+        """
+        if bundlePath:
+            rangeL = openBundle(bundlePath).getRanges(recordsPerRange=chunkSize)
+            numQueries = sum(len(rangeD["query_ids"]) for rangeD in rangeL)
+            logger.info("Starting with bundle %s queries %d byte ranges %d", bundlePath, numQueries, len(rangeL))
+        else:
+            rangeL = []
+            numQueries = len(molFilePathList)
+            logger.info("Starting with molfile path list length %d", numQueries)
+        resultList = []
+        failList = []
+        queryL = []
+        startTime = time.time()
+        summaryPath = summaryPath if summaryPath else os.path.join(resultPath, "search-run-summary.json")
         try:
-            pU = CcdcSearchWorker(verbose=self.__verbose)
-            mpu = MultiProcUtil(verbose=True)
-            # mpu.setWorkingDir(resultPath)
-            mpu.setOptions(optionsD={"resultPath": resultPath, "searchType": searchType})
+            optionsD = {
+                "resultPath": resultPath,
+                "searchType": searchType,
+                "maxHits": maxHits,
+                "suppressMetals": suppressMetals,
+                "similarityThreshold": similarityThreshold,
+                "rValueMaxPercent": rValueMaxPercent,
+                "compression": compression,
+                "dedupComponents": dedupComponents,
+                "lazyComponents": lazyComponents,
+                "metadataTablePath": metadataTablePath,
+                "permissiveSearch": permissiveSearch,
+                "resultStorePath": resultStorePath,
+                "asyncWrite": asyncWrite,
+                "bundlePath": bundlePath,
+                "profileThreshold": profileThreshold,
+                "resultLayout": resultLayout,
+                "csdHome": self.__csdHome,
+                "pythonLibPath": self.__pythonLibPath,
+                "pythonVersion": self.__pythonVersion,
+                "verbose": self.__verbose,
+            }
+            if self.__csdHome:
+                # spawned workers inherit the parent environment
+                setCcdcEnv(self.__csdHome, pythonLibPath=self.__pythonLibPath, pythonVersion=self.__pythonVersion)
+            wp = CcdcWorkerPool(
+                _searchBundleWorker if bundlePath else _searchWorker,
+                initFunc=_initWorker,
+                initArgs=(optionsD,),
+                numProc=numProc,
+                startMethod=self.__startMethod,
+                maxTasksPerWorker=maxQueriesPerWorker,
+                maxRssMb=maxWorkerRssMb,
+                exitFunc=_exitWorker,
+                weightFunc=_getRangeQueryCount if bundlePath else None,
+            )
+            taskL = rangeL if bundlePath else molFilePathList
+            for taskIndex, result, errMsg, infoD in wp.run(taskL, chunkSize=1 if bundlePath else chunkSize):
+                if bundlePath:
+                    queryResultL = result if result else [(bundlePath, queryTargetId, 0, infoD["seconds"], errMsg) for queryTargetId in rangeL[taskIndex]["query_ids"]]
+                else:
+                    queryTargetPath = molFilePathList[taskIndex]
+                    queryResultL = [result] if result else [(queryTargetPath, os.path.splitext(os.path.basename(queryTargetPath))[0], 0, infoD["seconds"], errMsg)]
+                for queryTargetPath, queryTargetId, numHits, elapsed, errMsg in queryResultL:
+                    queryKey = queryTargetId if bundlePath else queryTargetPath
+                    if errMsg:
+                        failList.append(queryKey)
+                    elif numHits:
+                        resultList.append(queryKey)
+                    queryL.append(
+                        {
+                            "query_id": queryTargetId,
+                            "query_path": queryTargetPath,
+                            "num_hits": numHits,
+                            "seconds": round(elapsed, 4),
+                            "rss_mb": round(infoD["rss_mb"], 2) if infoD["rss_mb"] is not None else None,
+                            "worker_pid": infoD["pid"],
+                            "error": errMsg,
+                        }
+                    )
+                    logger.debug("(%d/%d) %s matched %d (%.2f seconds)", len(queryL), numQueries, queryTargetId, numHits, elapsed)
             #
-            mpu.set(workerObj=pU, workerMethod="search")
-
-            ok, failList, resultList, _ = mpu.runMulti(dataList=molFilePathList, numProc=numProc, numResults=1, chunkSize=chunkSize)
-            logger.info("run ended status %r success count %d failures %r", ok, len(resultList[0]), len(failList))
+            summaryD = {
+                "search_type": searchType,
+                "num_queries": numQueries,
+                "num_matched": len(resultList),
+                "num_failed": len(failList),
+                "num_proc": numProc,
+                "max_queries_per_worker": maxQueriesPerWorker,
+                "max_worker_rss_mb": maxWorkerRssMb,
+                "elapsed_seconds": round(time.time() - startTime, 4),
+                "workers": wp.getWorkerStatistics(),
+                "queries": queryL,
+            }
+            mU = MarshalUtil()
+            ok = mU.doExport(summaryPath, summaryD, fmt="json", indent=3)
+            logger.info("Wrote run summary (%r) to %s", ok, summaryPath)
+            if profileThreshold is not None:
+                CcdcProfiler.writeReport(resultPath, topN=profileTopN)
+            if resultLayout == "hashed":
+                CcdcResultLayout.writeManifest(resultPath)
         except Exception as e:
             logger.exception("Failing with %s", str(e))
+        logger.info("Run ended matched count %d failures %d (%.2f seconds)", len(resultList), len(failList), time.time() - startTime)
+        return resultList
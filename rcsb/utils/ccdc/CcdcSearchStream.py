@@ -0,0 +1,182 @@
+##
+# File:    CcdcSearchStream.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#   18-Oct-2026 jdw report the query result directory in the result layout of the result path
+#
+##
+"""
+Streaming JSON-lines request/response protocol for chemical component searches.
+
+Requests are read one JSON object per line and a JSON result line is written (and flushed) as
+each query completes, so a long-lived process keeps a single searcher (CcdcSearch) open while a
+pipeline feeds queries continuously and consumes results incrementally.
+
+Request (one of path, record or smarts is required):
+
+    {"id": "ATP", "path": "/data/ATP.mol2", "search_type": "similarity", "options": {"max_hits": 50}}
+    {"id": "Q1", "record": "<sdf or mol2 text>", "format": "sdf", "search_type": "substructure"}
+    {"id": "P1", "smarts": "c1ccccc1C(=O)O"}
+
+Supported options are max_hits, suppress_metals and normalize.  SMARTS queries are substructure
+searches.  Blank lines are ignored.
+
+Response (in request order):
+
+    {"id": "ATP", "status": "ok", "search_type": "similarity", "num_hits": 12, "result_path": "<result path>/ATP", "seconds": 3.2}
+    {"id": "Q2", "status": "error", "error": "<message>", "line": 7}
+
+This module does not depend on the ccdc API.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import json
+import logging
+import os
+import sys
+import time
+
+from rcsb.utils.ccdc.CcdcResultLayout import CcdcResultLayout
+
+logger = logging.getLogger(__name__)
+
+
+class CcdcSearchStream(object):
+    """Serve JSON-lines search requests with a single long-lived searcher."""
+
+    searchTypeList = ["similarity", "substructure"]
+    optionKeyList = ["max_hits", "suppress_metals", "normalize"]
+
+    def __init__(self, searcher, resultPath, searchType="similarity", maxHits=50, suppressMetals=False, verbose=True):
+        """Serve JSON-lines search requests.
+
+        Args:
+            searcher (obj): searcher instance (CcdcSearch)
+            resultPath (str): output path to match results
+            searchType (str, optional): search type for requests without a search_type. Defaults to "similarity".
+            maxHits (int, optional): maximum number of matches for requests without a max_hits option. Defaults to 50.
+            suppressMetals (bool, optional): filter structures containing metals for requests without a suppress_metals option. Defaults to False.
+            verbose (bool, optional): verbose logging. Defaults to True.
+        """
+        self.__searcher = searcher
+        self.__resultPath = resultPath
+        self.__searchType = searchType if searchType else "similarity"
+        self.__maxHits = maxHits
+        self.__suppressMetals = suppressMetals
+        self.__verbose = verbose
+
+    def run(self, ifh=None, ofh=None):
+        """Read requests until the end of the input stream and write a result line for each.
+
+        Args:
+            ifh (file, optional): request stream. Defaults to None (sys.stdin).
+            ofh (file, optional): result stream. Defaults to None (sys.stdout).
+
+        Returns:
+            (dict): {"num_requests", "num_errors", "num_matched"}
+        """
+        ifh = ifh if ifh is not None else sys.stdin
+        ofh = ofh if ofh is not None else sys.stdout
+        sD = {"num_requests": 0, "num_errors": 0, "num_matched": 0}
+        for lineNumber, line in enumerate(iter(ifh.readline, ""), 1):
+            if not line.strip():
+                continue
+            sD["num_requests"] += 1
+            try:
+                rD = self.processRequest(json.loads(line))
+            except ValueError as e:
+                rD = {"id": None, "status": "error", "error": "Invalid JSON request: %s" % str(e)}
+            if rD["status"] == "error":
+                rD["line"] = lineNumber
+                sD["num_errors"] += 1
+            elif rD["num_hits"]:
+                sD["num_matched"] += 1
+            ofh.write(json.dumps(rD) + "\n")
+            ofh.flush()
+        logger.info("Completed %d streamed requests (%d matched, %d failing)", sD["num_requests"], sD["num_matched"], sD["num_errors"])
+        return sD
+
+    def processRequest(self, requestD):
+        """Run the search for a single request.
+
+        Args:
+            requestD (dict): request {"id", "path"|"record"|"smarts", "format", "search_type", "options"}
+
+        Returns:
+            (dict): result {"id", "status", "search_type", "num_hits", "result_path", "seconds"} or {"id", "status", "error"}
+        """
+        queryTargetId = requestD.get("id") if isinstance(requestD, dict) else None
+        try:
+            queryTargetId, searchType, optD = self.__validate(requestD)
+            startTime = time.time()
+            if "smarts" in requestD:
+                numHits = self.__searcher.searchSmarts(queryTargetId, requestD["smarts"], self.__resultPath, maxHits=optD["max_hits"], suppressMetals=optD["suppress_metals"])
+            elif "record" in requestD:
+                numHits = self.__searcher.searchRecord(
+                    queryTargetId,
+                    requestD["record"],
+                    self.__resultPath,
+                    fmt=requestD.get("format", "sdf"),
+                    normalizeFlag=optD["normalize"],
+                    maxHits=optD["max_hits"],
+                    searchType=searchType,
+                    suppressMetals=optD["suppress_metals"],
+                )
+            else:
+                numHits = self.__searcher.search(
+                    queryTargetId,
+                    requestD["path"],
+                    self.__resultPath,
+                    normalizeFlag=optD["normalize"],
+                    maxHits=optD["max_hits"],
+                    searchType=searchType,
+                    suppressMetals=optD["suppress_metals"],
+                )
+            # results are complete on disk before they are reported
+            self.__searcher.flush()
+            return {
+                "id": queryTargetId,
+                "status": "ok",
+                "search_type": searchType,
+                "num_hits": numHits,
+                "result_path": CcdcResultLayout.fromResultPath(self.__resultPath).getQueryPath(self.__resultPath, queryTargetId) if numHits else None,
+                "seconds": round(time.time() - startTime, 4),
+            }
+        except Exception as e:
+            if self.__verbose:
+                logger.exception("Failing for request %r with %s", queryTargetId, str(e))
+            return {"id": queryTargetId, "status": "error", "error": str(e)}
+
+    def __validate(self, requestD):
+        """Return the query identifier, search type and options of a request or raise ValueError."""
+        if not isinstance(requestD, dict):
+            raise ValueError("Request is not a JSON object")
+        queryTargetId = requestD.get("id")
+        if not queryTargetId or not isinstance(queryTargetId, str) or os.sep in queryTargetId:
+            raise ValueError("Missing or invalid request id %r" % queryTargetId)
+        sourceL = [ky for ky in ["path", "record", "smarts"] if ky in requestD]
+        if len(sourceL) != 1:
+            raise ValueError("Request requires one of path, record or smarts (found %r)" % sourceL)
+        if "path" in requestD and not os.access(requestD["path"], os.R_OK):
+            raise ValueError("Query path %r is not readable" % requestD["path"])
+        searchType = requestD.get("search_type", "substructure" if "smarts" in requestD else self.__searchType)
+        if searchType not in self.searchTypeList or ("smarts" in requestD and searchType != "substructure"):
+            raise ValueError("Unsupported search type %r" % searchType)
+        optD = requestD.get("options") or {}
+        if not isinstance(optD, dict) or set(optD) - set(self.optionKeyList):
+            raise ValueError("Unsupported options %r (%s)" % (optD, ",".join(self.optionKeyList)))
+        return (
+            queryTargetId,
+            searchType,
+            {
+                "max_hits": int(optD.get("max_hits", self.__maxHits)),
+                "suppress_metals": bool(optD.get("suppress_metals", self.__suppressMetals)),
+                "normalize": bool(optD.get("normalize", True)),
+            },
+        )
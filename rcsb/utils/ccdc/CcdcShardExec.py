@@ -0,0 +1,63 @@
+##
+# File: CcdcShardExec.py
+# Date: 18-Oct-2026  jdw
+#
+#  Execution wrapper  --  shard planning and result merging for array jobs running ccdc_search_cli
+#
+#  Updates:
+#
+##
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import argparse
+import logging
+import sys
+
+from rcsb.utils.ccdc.CcdcShardUtils import CcdcShardUtils
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command")
+    #
+    planParser = subparsers.add_parser("plan", help="Split a molecule file list into cost balanced shards and write a shard manifest")
+    planParser.add_argument("--mol_list_path", required=True, help="Molecule file list path")
+    planParser.add_argument("--result_path", required=True, help="Search result directory path")
+    planParser.add_argument("--num_shards", required=True, type=int, help="Number of shards")
+    planParser.add_argument("--search_type", default="similarity", help="Search type (similarity|substructure)")
+    planParser.add_argument("--manifest_path", default=None, help="Shard manifest path (default: <result_path>/shards/shard-manifest.json)")
+    #
+    mergeParser = subparsers.add_parser("merge", help="Validate shard completeness and merge shard results into a run-level summary")
+    mergeParser.add_argument("--manifest_path", required=True, help="Shard manifest path")
+    mergeParser.add_argument("--summary_path", default=None, help="Run summary path (default: <result_path>/shards/run-summary.json)")
+    #
+    args = parser.parse_args()
+    if not args.command:
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+    #
+    try:
+        shU = CcdcShardUtils()
+        if args.command == "plan":
+            manifestD = shU.plan(args.mol_list_path, args.result_path, args.num_shards, manifestPath=args.manifest_path, searchType=args.search_type)
+            # Array job range for the scheduler (e.g. sbatch --array=1-N)
+            print("1-%d" % manifestD["num_shards"])
+        elif args.command == "merge":
+            summaryD = shU.merge(args.manifest_path, summaryPath=args.summary_path)
+            # Shards to re-run (e.g. sbatch --array=<spec>), empty when the run is complete
+            print(summaryD["missing_shards_array_spec"])
+            if not summaryD["complete"]:
+                sys.exit(2)
+    except Exception as e:
+        logger.exception("Failing with %s", str(e))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+##
+# File:    CcdcShardUtils.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#   18-Oct-2026 jdw merge results for several search types stored in <resultPath>/<searchType>
+#   18-Oct-2026 jdw read plain or compressed (gzip/zstd) match indices
+#   18-Oct-2026 jdw read match indices in the result layout of each result path and combine hashed layout result manifests
+#
+##
+"""
+Shard planning and result merging for cluster array jobs running ccdc_search_cli.
+
+The planner splits a molecule file list into shards balanced by an estimated search cost,
+writes a planned list in which each shard is a contiguous record range, and a manifest
+describing the ranges (--start_record/--end_record) and output paths for each shard.
+The merge step validates shard completeness and combines the shard hit lists and
+per-query match indices into a run-level summary.
+
+This module does not depend on the ccdc API.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import heapq
+import logging
+import os
+import time
+
+from rcsb.utils.ccdc.CcdcFileUtils import CcdcFileUtils
+from rcsb.utils.ccdc.CcdcResultLayout import CcdcResultLayout
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+
+logger = logging.getLogger(__name__)
+
+
+class CcdcShardUtils(object):
+    def __init__(self):
+        self.__mU = MarshalUtil()
+        self.__fileU = CcdcFileUtils()
+
+    def getQueryId(self, queryTargetPath):
+        """Return the query identifier for the input molecule file path (file name without extension)."""
+        _, fn = os.path.split(queryTargetPath)
+        queryTargetId, _ = os.path.splitext(fn)
+        return queryTargetId
+
+    def estimateCost(self, queryTargetPath):
+        """Estimate the relative search cost of the input query molecule file.
+
+        The estimate is the atom count read from the mol2 or SDF header, falling back to
+        the file size for other formats.  Missing files have zero cost.
+
+        Args:
+            queryTargetPath (str): path to the query molfile (sdf, mol2)
+
+        Returns:
+            (int): relative search cost
+        """
+        try:
+            if queryTargetPath.endswith(".mol2"):
+                with open(queryTargetPath, "r") as ifh:
+                    for line in ifh:
+                        if line.startswith("@<TRIPOS>MOLECULE"):
+                            next(ifh)
+                            return max(1, int(next(ifh).split()[0]))
+            elif queryTargetPath.endswith((".sdf", ".mol")):
+                with open(queryTargetPath, "r") as ifh:
+                    for _ in range(3):
+                        next(ifh)
+                    return max(1, int(next(ifh)[:3]))
+            return max(1, os.path.getsize(queryTargetPath) // 100)
+        except Exception as e:
+            logger.debug("Cost estimate failing for %r with %s", queryTargetPath, str(e))
+        return 1 if os.access(queryTargetPath, os.R_OK) else 0
+
+    def plan(self, molListPath, resultPath, numShards, manifestPath=None, searchType="similarity"):
+        """Split the input molecule file list into shards balanced by estimated cost.
+
+        Args:
+            molListPath (str): path to the list of query molecule file paths
+            resultPath (str): directory path to store search results
+            numShards (int): number of shards
+            manifestPath (str, optional): output manifest path. Defaults to <resultPath>/shards/shard-manifest.json.
+            searchType (str, optional): search type (substructure|similarity). Defaults to "similarity".
+
+        Returns:
+            (dict): shard manifest
+        """
+        pL = self.__mU.doImport(molListPath, fmt="list") or []
+        numShards = max(1, min(int(numShards), len(pL)))
+        shardPath = os.path.join(resultPath, "shards")
+        manifestPath = manifestPath if manifestPath else os.path.join(shardPath, "shard-manifest.json")
+        planListPath = os.path.join(shardPath, "shard-plan.list")
+        #
+        # Longest processing time first assignment to the least loaded shard
+        costL = sorted(((self.estimateCost(pth), ii, pth) for ii, pth in enumerate(pL)), reverse=True)
+        heap = [(0, jj) for jj in range(numShards)]
+        shardL = [[] for _ in range(numShards)]
+        shardCostL = [0] * numShards
+        for cost, ii, pth in costL:
+            load, jj = heapq.heappop(heap)
+            shardL[jj].append((ii, pth))
+            shardCostL[jj] += cost
+            heapq.heappush(heap, (load + cost, jj))
+        #
+        # Shards are written as contiguous ranges of the planned list preserving input order within each shard
+        planL = []
+        sL = []
+        for jj, itemL in enumerate(shardL, 1):
+            startRecord = len(planL) + 1
+            planL.extend([pth for _, pth in sorted(itemL)])
+            sL.append(
+                {
+                    "shard_index": jj,
+                    "start_record": startRecord,
+                    "end_record": len(planL),
+                    "num_queries": len(itemL),
+                    "estimated_cost": shardCostL[jj - 1],
+                    "hit_list_path": os.path.join(shardPath, "shard-%04d-hitList.list" % jj),
+                    "log_path": os.path.join(shardPath, "shard-%04d-execlog.log" % jj),
+                }
+            )
+        manifestD = {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+            "mol_list_path": molListPath,
+            "plan_list_path": planListPath,
+            "result_path": resultPath,
+            "search_type": searchType,
+            "num_queries": len(planL),
+            "num_shards": numShards,
+            "total_estimated_cost": sum(shardCostL),
+            "shards": sL,
+        }
+        ok1 = self.__mU.doExport(planListPath, planL, fmt="list")
+        ok2 = self.__mU.doExport(manifestPath, manifestD, fmt="json", indent=3)
+        logger.info("Planned %d queries in %d shards (cost min %r max %r) manifest %s (%r)", len(planL), numShards, min(shardCostL), max(shardCostL), manifestPath, ok1 and ok2)
+        return manifestD
+
+    def getShard(self, manifestPath, shardIndex):
+        """Return the manifest and the shard details for the input 1-based shard index."""
+        manifestD = self.__mU.doImport(manifestPath, fmt="json")
+        for sD in manifestD["shards"]:
+            if sD["shard_index"] == int(shardIndex):
+                return manifestD, sD
+        raise ValueError("Shard %r not found in %s" % (shardIndex, manifestPath))
+
+    def merge(self, manifestPath, summaryPath=None):
+        """Validate shard completeness and combine shard hit lists and per-query match indices into a run-level summary.
+
+        A shard is complete when its hit list has been written.  The combined hit list is written to
+        <resultPath>/shards/run-hitList.list. Incomplete shards are reported in the summary and written
+        to the list <resultPath>/shards/missing-shards.list for re-submission.
+
+        Args:
+            manifestPath (str): shard manifest path
+            summaryPath (str, optional): output summary path. Defaults to <resultPath>/shards/run-summary.json.
+
+        Returns:
+            (dict): run-level summary
+        """
+        manifestD = self.__mU.doImport(manifestPath, fmt="json")
+        resultPath = manifestD["result_path"]
+        shardPath = os.path.dirname(manifestD["plan_list_path"])
+        summaryPath = summaryPath if summaryPath else os.path.join(shardPath, "run-summary.json")
+        planL = self.__mU.doImport(manifestD["plan_list_path"], fmt="list") or []
+        #
+        missingL = []
+        hitIdL = []
+        numSearched = 0
+        for sD in manifestD["shards"]:
+            if not self.__mU.exists(sD["hit_list_path"]):
+                missingL.append(sD["shard_index"])
+                continue
+            numSearched += sD["num_queries"]
+            hitIdL.extend(self.__mU.doImport(sD["hit_list_path"], fmt="list") or [])
+        #
+        # Several search types store results in <resultPath>/<searchType>
+        searchTypeL = manifestD["search_type"].split(",")
+        searchPathL = [os.path.join(resultPath, st) for st in searchTypeL] if len(searchTypeL) > 1 else [resultPath]
+        layoutD = {searchPath: CcdcResultLayout.fromResultPath(searchPath) for searchPath in searchPathL}
+        for searchPath, layout in layoutD.items():
+            if layout.getLayout() == "hashed":
+                CcdcResultLayout.writeManifest(searchPath)
+        queryD = {}
+        for queryTargetId in sorted(set(hitIdL)):
+            indexPathL = []
+            rowL = []
+            for searchPath in searchPathL:
+                indexPath = self.__fileU.findPath(layoutD[searchPath].getIndexPath(searchPath, queryTargetId))
+                if indexPath:
+                    indexPathL.append(indexPath)
+                    rowL.extend(self.__fileU.readJson(indexPath) or [])
+            queryD[queryTargetId] = {
+                "index_paths": indexPathL,
+                "num_matches": len(rowL),
+                "identifiers": sorted({row["identifier"] for row in rowL if "identifier" in row}),
+            }
+        #
+        missingQueryL = []
+        for sD in manifestD["shards"]:
+            if sD["shard_index"] in missingL:
+                missingQueryL.extend(planL[sD["start_record"] - 1 : sD["end_record"]])
+        summaryD = {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+            "manifest_path": manifestPath,
+            "search_type": manifestD["search_type"],
+            "complete": not missingL,
+            "num_shards": manifestD["num_shards"],
+            "num_complete_shards": manifestD["num_shards"] - len(missingL),
+            "missing_shards": missingL,
+            "missing_shards_array_spec": ",".join([str(jj) for jj in missingL]),
+            "num_queries": manifestD["num_queries"],
+            "num_queries_searched": numSearched,
+            "num_queries_missing": len(missingQueryL),
+            "num_queries_matched": len(queryD),
+            "queries": queryD,
+        }
+        ok1 = self.__mU.doExport(summaryPath, summaryD, fmt="json", indent=3)
+        ok2 = self.__mU.doExport(os.path.join(shardPath, "missing-shards.list"), [str(jj) for jj in missingL], fmt="list")
+        self.__mU.doExport(os.path.join(shardPath, "run-hitList.list"), sorted(set(hitIdL)), fmt="list")
+        logger.info(
+            "Merged %d of %d shards (matched queries %d) missing shards %r summary %s (%r)",
+            summaryD["num_complete_shards"],
+            manifestD["num_shards"],
+            len(queryD),
+            missingL,
+            summaryPath,
+            ok1 and ok2,
+        )
+        return summaryD
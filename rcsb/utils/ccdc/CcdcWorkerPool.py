@@ -0,0 +1,271 @@
+##
+# File:    CcdcWorkerPool.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#   18-Oct-2026 jdw add optional worker exit function (e.g. to flush buffered results)
+#   18-Oct-2026 jdw add optional task weight function counting the work in each task toward maxTasksPerWorker
+#
+##
+"""
+Process pool with per-worker initialization, memory sampling and worker recycling.
+
+Workers are started with the 'spawn' (or 'forkserver') method and run an initializer once
+(e.g. to set the CCDC environment and import the ccdc API).  Work is dispatched to each worker
+in chunks through a private task queue, so the parent always knows the unfinished work held by
+every worker.  The resident memory of a worker is sampled after each task.  A worker is retired
+after a configured number of tasks or when its memory crosses a ceiling, and the unfinished part
+of its chunk is returned to the pending work and dispatched to a fresh worker.  Work held by a
+worker that exits unexpectedly (e.g. an OOM kill) is re-dispatched in the same way.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import collections
+import logging
+import multiprocessing
+import os
+import queue
+import resource
+import sys
+import time
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+def getRssMb():
+    """Return the current resident memory size of this process (MB)."""
+    try:
+        if psutil is not None:
+            return psutil.Process().memory_info().rss / 1048576.0
+        with open("/proc/self/statm") as ifh:
+            return int(ifh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1048576.0
+    except Exception:
+        pass
+    # peak resident size in KB (Linux) or bytes (Darwin)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1048576.0 if sys.platform == "darwin" else rss / 1024.0
+
+
+def _runExitFunc(exitFunc, pid):
+    try:
+        if exitFunc is not None:
+            exitFunc()
+    except Exception as e:
+        logger.exception("Worker %d exit function failing with %s", pid, str(e))
+
+
+def _workerMain(workerId, initFunc, initArgs, taskFunc, taskQueue, resultQueue, maxTasks, maxRssMb, exitFunc=None, weightFunc=None):
+    """Worker process loop - initialize once, then run task chunks until stopped or retired."""
+    pid = os.getpid()
+    try:
+        if initFunc is not None:
+            initFunc(*initArgs)
+    except Exception as e:
+        logger.exception("Worker %d initialization failing with %s", pid, str(e))
+        resultQueue.put(("init_error", workerId, pid, str(e)))
+        return
+    resultQueue.put(("ready", workerId, pid, getRssMb()))
+    numTasks = 0
+    while True:
+        chunk = taskQueue.get()
+        if chunk is None:
+            _runExitFunc(exitFunc, pid)
+            break
+        retireReason = None
+        for taskIndex, payload in chunk:
+            startTime = time.time()
+            try:
+                result, errMsg = taskFunc(payload), None
+            except Exception as e:
+                logger.exception("Worker %d task %d failing with %s", pid, taskIndex, str(e))
+                result, errMsg = None, str(e)
+            rssMb = getRssMb()
+            numTasks += weightFunc(payload) if weightFunc is not None else 1
+            resultQueue.put(("result", workerId, pid, taskIndex, result, errMsg, time.time() - startTime, rssMb))
+            if maxTasks and numTasks >= maxTasks:
+                retireReason = "max tasks %d" % numTasks
+            elif maxRssMb and rssMb > maxRssMb:
+                retireReason = "rss %.1f MB > %.1f MB" % (rssMb, maxRssMb)
+            if retireReason:
+                break
+        if retireReason:
+            _runExitFunc(exitFunc, pid)
+            resultQueue.put(("retire", workerId, pid, retireReason))
+            return
+
+
+class CcdcWorkerPool(object):
+    def __init__(self, taskFunc, initFunc=None, initArgs=(), numProc=4, startMethod="spawn", maxTasksPerWorker=None, maxRssMb=None, maxRetries=1, exitFunc=None, weightFunc=None):
+        """Process pool with per-worker initialization, memory sampling and worker recycling.
+
+        Args:
+            taskFunc (func): module level function applied to each task payload in a worker
+            initFunc (func, optional): module level function run once in each worker. Defaults to None.
+            initArgs (tuple, optional): arguments for initFunc. Defaults to ().
+            numProc (int, optional): number of worker processes. Defaults to 4.
+            startMethod (str, optional): multiprocessing start method (spawn|forkserver). Defaults to "spawn".
+            maxTasksPerWorker (int, optional): retire a worker after this number of tasks. Defaults to None (no limit).
+            maxRssMb (float, optional): retire a worker when its resident memory exceeds this size (MB). Defaults to None (no limit).
+            maxRetries (int, optional): number of times a task held by a worker that exits unexpectedly is re-dispatched. Defaults to 1.
+            exitFunc (func, optional): module level function run in each worker when it is stopped or retired. Defaults to None.
+            weightFunc (func, optional): module level function returning the number of work units in a task payload counted toward
+                maxTasksPerWorker (e.g. the queries in a bundle byte range). Defaults to None (one unit per task).
+        """
+        if startMethod not in ["spawn", "forkserver"]:
+            raise ValueError("Unsupported start method %r (spawn|forkserver)" % startMethod)
+        self.__ctx = multiprocessing.get_context(startMethod)
+        self.__taskFunc = taskFunc
+        self.__initFunc = initFunc
+        self.__initArgs = initArgs
+        self.__numProc = max(1, int(numProc))
+        self.__maxTasks = maxTasksPerWorker
+        self.__maxRssMb = maxRssMb
+        self.__maxRetries = maxRetries
+        self.__exitFunc = exitFunc
+        self.__weightFunc = weightFunc
+        self.__workerStatL = []
+
+    def getWorkerStatistics(self):
+        """Return a summary for each worker process started in the last run.
+
+        Returns:
+            (list): [{"worker_id", "pid", "num_tasks", "max_rss_mb", "busy_seconds", "exit_reason"}, ...]
+        """
+        return [dict(wD) for wD in self.__workerStatL]
+
+    def run(self, payloadList, chunkSize=1):
+        """Apply the task function to each payload in the worker pool.
+
+        Args:
+            payloadList (list): task payloads
+            chunkSize (int, optional): number of tasks dispatched to a worker at a time. Defaults to 1.
+
+        Yields:
+            (tuple): (taskIndex, result, error message or None, infoD) in completion order, where infoD
+                     contains the worker "pid", task "seconds" and worker "rss_mb" sampled after the task.
+        """
+        pendingQ = collections.deque(enumerate(payloadList))
+        chunkSize = max(1, int(chunkSize))
+        resultQueue = self.__ctx.Queue()
+        workerD = {}
+        retryD = {}
+        numDone = 0
+        nextWorkerId = 0
+        initError = None
+        lastCheck = time.time()
+        self.__workerStatL = []
+        try:
+            while numDone < len(payloadList):
+                # start workers to replace retired or failed workers while work remains
+                while initError is None and len(workerD) < min(self.__numProc, len(pendingQ) + sum(len(wD["held"]) for wD in workerD.values())):
+                    nextWorkerId += 1
+                    workerD[nextWorkerId] = self.__startWorker(nextWorkerId, resultQueue)
+                if initError is not None and not workerD:
+                    # no worker can be initialized - fail the remaining work
+                    while pendingQ:
+                        taskIndex, _ = pendingQ.popleft()
+                        numDone += 1
+                        yield taskIndex, None, initError, {"pid": None, "seconds": 0.0, "rss_mb": None}
+                    break
+                #
+                for workerId, wD in workerD.items():
+                    if wD["ready"] and not wD["held"] and pendingQ:
+                        chunk = [pendingQ.popleft() for _ in range(min(chunkSize, len(pendingQ)))]
+                        wD["held"] = collections.OrderedDict(chunk)
+                        wD["taskQueue"].put(chunk)
+                try:
+                    msg = resultQueue.get(timeout=0.5)
+                except queue.Empty:
+                    msg = None
+                #
+                # re-dispatch work held by workers that exited unexpectedly (allowing time to deliver queued messages)
+                if time.time() - lastCheck > 1.0:
+                    lastCheck = time.time()
+                    for wId in list(workerD.keys()):
+                        wD = workerD[wId]
+                        if wD["process"].is_alive():
+                            continue
+                        wD["deadSince"] = wD.get("deadSince", lastCheck)
+                        if lastCheck - wD["deadSince"] < 2.0:
+                            continue
+                        workerD.pop(wId)
+                        exitCode = wD["process"].exitcode
+                        self.__finishWorker(wD, "exit code %r" % exitCode)
+                        logger.warning("Worker %r exited unexpectedly (%r) holding %d tasks", wD["pid"], exitCode, len(wD["held"]))
+                        for taskIndex, payload in reversed(list(wD["held"].items())):
+                            retryD[taskIndex] = retryD.get(taskIndex, 0) + 1
+                            if retryD[taskIndex] > self.__maxRetries:
+                                numDone += 1
+                                yield taskIndex, None, "worker exited (%r)" % exitCode, {"pid": wD["pid"], "seconds": 0.0, "rss_mb": None}
+                            else:
+                                pendingQ.appendleft((taskIndex, payload))
+                if msg is None:
+                    continue
+                #
+                kind, workerId, pid = msg[0], msg[1], msg[2]
+                wD = workerD.get(workerId)
+                if wD is None:
+                    continue
+                if kind == "ready":
+                    wD["ready"] = True
+                    wD["pid"] = pid
+                    wD["stat"]["pid"] = pid
+                elif kind == "init_error":
+                    initError = "worker initialization failing with %s" % msg[3]
+                    workerD.pop(workerId)
+                    self.__finishWorker(wD, initError)
+                elif kind == "result":
+                    _, _, _, taskIndex, result, errMsg, seconds, rssMb = msg
+                    wD["held"].pop(taskIndex, None)
+                    wD["stat"]["num_tasks"] += 1
+                    wD["stat"]["busy_seconds"] += seconds
+                    wD["stat"]["max_rss_mb"] = max(wD["stat"]["max_rss_mb"], rssMb)
+                    numDone += 1
+                    yield taskIndex, result, errMsg, {"pid": pid, "seconds": seconds, "rss_mb": rssMb}
+                elif kind == "retire":
+                    workerD.pop(workerId)
+                    wD["process"].join(timeout=30)
+                    self.__finishWorker(wD, msg[3])
+                    # return the unfinished part of the chunk to the front of the pending work
+                    for item in reversed(list(wD["held"].items())):
+                        pendingQ.appendleft(item)
+                    logger.info("Retired worker %d (%s) after %d tasks", pid, msg[3], wD["stat"]["num_tasks"])
+        finally:
+            for wD in workerD.values():
+                try:
+                    wD["taskQueue"].put(None)
+                except Exception:
+                    pass
+            for wD in workerD.values():
+                wD["process"].join(timeout=30)
+                if wD["process"].is_alive():
+                    wD["process"].terminate()
+                self.__finishWorker(wD, "completed")
+
+    def __startWorker(self, workerId, resultQueue):
+        taskQueue = self.__ctx.Queue()
+        proc = self.__ctx.Process(
+            target=_workerMain,
+            args=(workerId, self.__initFunc, self.__initArgs, self.__taskFunc, taskQueue, resultQueue, self.__maxTasks, self.__maxRssMb, self.__exitFunc, self.__weightFunc),
+            name="ccdc-worker-%d" % workerId,
+        )
+        proc.daemon = True
+        proc.start()
+        statD = {"worker_id": workerId, "pid": proc.pid, "num_tasks": 0, "max_rss_mb": 0.0, "busy_seconds": 0.0, "start_time": time.time(), "exit_reason": None}
+        self.__workerStatL.append(statD)
+        return {"process": proc, "pid": proc.pid, "taskQueue": taskQueue, "ready": False, "held": collections.OrderedDict(), "stat": statD}
+
+    def __finishWorker(self, wD, reason):
+        if wD["stat"]["exit_reason"] is None:
+            wD["stat"]["exit_reason"] = reason
+            wD["stat"]["elapsed_seconds"] = time.time() - wD["stat"]["start_time"]
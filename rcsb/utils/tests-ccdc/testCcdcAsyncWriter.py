@@ -0,0 +1,148 @@
+##
+#
+# File:    testCcdcAsyncWriter.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for the bounded background writer -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import unittest
+import subprocess
+import sys
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcAsyncWriter import CcdcAsyncWriter
+from rcsb.utils.ccdc.CcdcFileUtils import CcdcFileUtils
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def _slowWriteText(filePath, text, latency=0.01):
+    """Write the input text with the per file latency of a network filesystem."""
+    time.sleep(latency)
+    return CcdcFileUtils().writeText(filePath, text)
+
+
+class CcdcAsyncWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output", "test_ccdc_async_writer")
+        if not os.path.exists(self.__workPath):
+            os.makedirs(self.__workPath)
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testOrderAndBackpressure(self):
+        """Test case:  queued writes complete in order, a full queue blocks the producer and failures are counted"""
+        try:
+            opL = []
+            aW = CcdcAsyncWriter(maxQueueSize=2)
+            for ii in range(20):
+                aW.submit(lambda ii=ii: (time.sleep(0.005), opL.append(ii)))
+            aW.submit(lambda: 1 / 0)
+            aW.flush()
+            self.assertEqual(opL, list(range(20)))
+            sD = aW.getStatistics()
+            logger.info("Writer statistics %r", sD)
+            self.assertEqual(sD["num_ops"], 21)
+            self.assertEqual(sD["num_errors"], 1)
+            self.assertEqual(sD["pending"], 0)
+            self.assertGreater(sD["blocked_seconds"], 0.0)
+            aW.close()
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testFlushOnExit(self):
+        """Test case:  pending writes are completed when the interpreter exits without close()"""
+        try:
+            fpL = [os.path.join(self.__workPath, "exit-%03d.txt" % ii) for ii in range(10)]
+            for fp in fpL:
+                if os.path.exists(fp):
+                    os.remove(fp)
+            script = "\n".join(
+                [
+                    "import sys",
+                    "sys.path.insert(0, %r)" % HERE,
+                    "from rcsb.utils.ccdc.CcdcAsyncWriter import CcdcAsyncWriter",
+                    "from testCcdcAsyncWriter import _slowWriteText",
+                    "aW = CcdcAsyncWriter(maxQueueSize=4)",
+                    "for fp in %r:" % fpL,
+                    "    aW.submit(_slowWriteText, fp, 'pending output', latency=0.05)",
+                ]
+            )
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join([TOPDIR] + sys.path))
+            subprocess.run([sys.executable, "-c", script], check=True, env=env, timeout=120)
+            self.assertTrue(all(os.path.exists(fp) for fp in fpL))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testOverlapBenchmark(self):
+        """Test case:  compare a sequence of searches with synchronous and background output"""
+        try:
+            numQueries = 10
+            numFiles = 5
+            searchSeconds = 0.05
+
+            def runQueries(writeFunc):
+                startTime = time.time()
+                for ii in range(numQueries):
+                    time.sleep(searchSeconds)
+                    for jj in range(numFiles):
+                        writeFunc(os.path.join(self.__workPath, "Q%02d_%03d.mol2" % (ii, jj)), "component %d %d" % (ii, jj))
+                return time.time() - startTime
+
+            syncSeconds = runQueries(_slowWriteText)
+            startTime = time.time()
+            aW = CcdcAsyncWriter(maxQueueSize=16)
+            runQueries(lambda fp, text: aW.submit(_slowWriteText, fp, text))
+            aW.close()
+            asyncSeconds = time.time() - startTime
+            logger.info("%d queries with synchronous output %.3f seconds with background output %.3f seconds", numQueries, syncSeconds, asyncSeconds)
+            self.assertLess(asyncSeconds, syncSeconds)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteAsyncWriterTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcAsyncWriterTests("testOrderAndBackpressure"))
+    suiteSelect.addTest(CcdcAsyncWriterTests("testFlushOnExit"))
+    suiteSelect.addTest(CcdcAsyncWriterTests("testOverlapBenchmark"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteAsyncWriterTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
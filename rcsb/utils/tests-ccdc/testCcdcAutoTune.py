@@ -0,0 +1,116 @@
+##
+#
+# File:    testCcdcAutoTune.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for the calibration of the number of processes and the chunk size of a multiprocess search -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import unittest
+import time
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcAutoTune import CcdcAutoTune, _getTotalMemoryMb
+from rcsb.utils.ccdc import __version__
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class _SimulatedSearch(object):
+    """Simulated search whose query latency grows with contention for the disk beyond two processes."""
+
+    def __init__(self, latency=0.02, startup=0.01, rssMb=100.0):
+        self.latency = latency
+        self.startup = startup
+        self.rssMb = rssMb
+        self.searchedL = []
+
+    def trial(self, queryList, numProc, chunkSize):
+        queryLatency = self.latency * (1.0 if numProc <= 2 else 1.2 * numProc / 2.0)
+        time.sleep(self.startup + chunkSize * queryLatency)
+        self.searchedL.extend(queryList)
+        return {
+            "num_completed": len(queryList),
+            "query_seconds": len(queryList) * queryLatency,
+            "chunk_seconds": numProc * (self.startup + chunkSize * queryLatency),
+            "num_chunks": numProc,
+            "max_rss_mb": self.rssMb,
+        }
+
+
+class CcdcAutoTuneTests(unittest.TestCase):
+    def setUp(self):
+        self.__dataList = ["query_%03d.mol2" % ii for ii in range(200)]
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testCalibrate(self):
+        """Test case:  escalation stops where the throughput gain levels off and the chunk size covers the startup overhead"""
+        try:
+            sS = _SimulatedSearch()
+            numProc, chunkSize, remainL, tuneD = CcdcAutoTune(sS.trial, maxProc=8, maxIoWait=1.0).calibrate(self.__dataList)
+            logger.info("Calibration %r", {ky: tuneD[ky] for ky in ["num_proc", "chunk_size", "reason", "num_sampled"]})
+            self.assertEqual([levelD["num_proc"] for levelD in tuneD["levels"]], [1, 2, 4])
+            self.assertEqual(numProc, 2)
+            # startup 0.01 seconds is at most 10% of a chunk of 0.02 second queries
+            self.assertEqual(chunkSize, 5)
+            self.assertEqual(tuneD["num_sampled"], 14)
+            self.assertEqual(len(remainL), len(self.__dataList) - 14)
+            # sampled queries are taken across the input and not searched again
+            self.assertEqual(sorted(sS.searchedL + remainL), self.__dataList)
+            self.assertGreater(max(sS.searchedL), "query_150")
+            self.assertAlmostEqual(tuneD["levels"][1]["chunk_overhead_seconds"], 0.01, places=3)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testCalibrateLimits(self):
+        """Test case:  worker memory limits the number of processes and small inputs skip calibration"""
+        try:
+            sS = _SimulatedSearch(latency=0.005, startup=0.0, rssMb=_getTotalMemoryMb() / 2.5)
+            numProc, _, _, tuneD = CcdcAutoTune(sS.trial, levelList=[1, 2, 4, 8], maxProc=8, maxIoWait=1.0).calibrate(self.__dataList)
+            logger.info("Calibration %r", {ky: tuneD[ky] for ky in ["num_proc", "chunk_size", "reason", "memory_proc_limit"]})
+            self.assertEqual(tuneD["memory_proc_limit"], 2)
+            self.assertLessEqual(numProc, 2)
+            self.assertLessEqual(max(levelD["num_proc"] for levelD in tuneD["levels"]), 4)
+            #
+            numProc, chunkSize, remainL, tuneD = CcdcAutoTune(sS.trial, maxProc=8).calibrate(self.__dataList[:4])
+            self.assertEqual((numProc, chunkSize, len(remainL), tuneD["num_sampled"]), (4, 1, 4, 0))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteAutoTuneTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcAutoTuneTests("testCalibrate"))
+    suiteSelect.addTest(CcdcAutoTuneTests("testCalibrateLimits"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteAutoTuneTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
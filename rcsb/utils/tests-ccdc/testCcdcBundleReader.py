@@ -0,0 +1,137 @@
+##
+#
+# File:    testCcdcBundleReader.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for the lazy reader of multi-molecule query bundles -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import glob
+import logging
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcBundleReader import CcdcBundleReader
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class CcdcBundleReaderTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output", "test_ccdc_bundle_reader")
+        self.__dataPath = os.path.join(HERE, "test-data")
+        if not os.path.exists(self.__workPath):
+            os.makedirs(self.__workPath)
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def __getSdfRecord(self, title, ii):
+        lineL = [title, "  rcsb-test", "", "  2  1  0  0  0  0  0  0  0  0999 V2000"]
+        lineL.append("    %.4f    0.0000    0.0000 C   0  0  0  0  0  0  0  0  0  0  0  0" % (ii / 100.0))
+        lineL.append("    1.5400    0.0000    0.0000 O   0  0  0  0  0  0  0  0  0  0  0  0")
+        lineL.extend(["  1  2  1  0", "M  END", "> <query_id>", title, "", "$$$$"])
+        return "\n".join(lineL) + "\n"
+
+    def testMol2Bundle(self):
+        """Test case:  index and read byte ranges of a mol2 bundle"""
+        try:
+            pthL = sorted(glob.glob(os.path.join(self.__dataPath, "molfiles-xyz", "*.mol2")))
+            textL = []
+            for pth in pthL:
+                with open(pth, "r") as ifh:
+                    text = ifh.read()
+                textL.append(text if text.endswith("\n") else text + "\n")
+            bundlePath = os.path.join(self.__workPath, "queries.mol2")
+            with open(bundlePath, "w") as ofh:
+                ofh.write("".join(textL))
+            #
+            bR = CcdcBundleReader(bundlePath)
+            recL = bR.getRecords()
+            self.assertEqual(len(recL), len(pthL))
+            self.assertEqual(len({rD["query_id"] for rD in recL}), len(recL))
+            self.assertEqual(recL[-1]["end"], os.path.getsize(bundlePath))
+            #
+            readL = []
+            for rangeD in bR.getRanges(recordsPerRange=4):
+                rL = list(bR.iterRecords(start=rangeD["start"], end=rangeD["end"], queryIdList=rangeD["query_ids"]))
+                self.assertEqual([queryId for queryId, _ in rL], rangeD["query_ids"])
+                readL.extend([record for _, record in rL])
+            self.assertEqual(readL, textL)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSdfBundle(self):
+        """Test case:  index an SDF bundle with query identifiers from record titles and select records by number"""
+        try:
+            numRecords = 2000
+            titleL = ["Q%05d" % ii for ii in range(numRecords)]
+            titleL[7] = ""
+            titleL[9] = titleL[8]
+            bundlePath = os.path.join(self.__workPath, "queries.sdf")
+            with open(bundlePath, "w") as ofh:
+                for ii, title in enumerate(titleL):
+                    ofh.write(self.__getSdfRecord(title, ii))
+            #
+            startTime = time.time()
+            bR = CcdcBundleReader(bundlePath)
+            recL = bR.getRecords()
+            logger.info("Indexed %d records in %.4f seconds", len(recL), time.time() - startTime)
+            self.assertEqual(len(recL), numRecords)
+            self.assertEqual(recL[0]["query_id"], "Q00000")
+            self.assertEqual(recL[7]["query_id"], "queries_000008")
+            self.assertEqual(recL[9]["query_id"], "Q00008_2")
+            #
+            rangeL = bR.getRanges(recordsPerRange=64)
+            self.assertEqual(sum(len(rangeD["query_ids"]) for rangeD in rangeL), numRecords)
+            self.assertEqual([rangeD["start"] for rangeD in rangeL[1:]], [rangeD["end"] for rangeD in rangeL[:-1]])
+            #
+            rangeL = bR.getRanges(recordsPerRange=numRecords, startRecord=101, endRecord=150)
+            self.assertEqual(len(rangeL), 1)
+            rL = list(bR.iterRecords(start=rangeL[0]["start"], end=rangeL[0]["end"]))
+            self.assertEqual([queryId for queryId, _ in rL], titleL[100:150])
+            self.assertEqual(rL[0][1], self.__getSdfRecord(titleL[100], 100))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteBundleReaderTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcBundleReaderTests("testMol2Bundle"))
+    suiteSelect.addTest(CcdcBundleReaderTests("testSdfBundle"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteBundleReaderTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
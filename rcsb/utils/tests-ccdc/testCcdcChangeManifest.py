@@ -0,0 +1,137 @@
+##
+#
+# File:    testCcdcChangeManifest.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for idempotent result writes skipping unchanged output and the per-run change manifest -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import shutil
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcChangeManifest import CcdcChangeManifest
+from rcsb.utils.ccdc.CcdcFileUtils import CcdcFileUtils
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class CcdcChangeManifestTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output", "test_ccdc_change_manifest")
+        if os.path.exists(self.__workPath):
+            shutil.rmtree(self.__workPath)
+        self.__dirPath = os.path.join(self.__workPath, "results", "ABC")
+        os.makedirs(self.__dirPath)
+        self.__manifestPath = os.path.join(self.__workPath, "results", "change-manifest.json")
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def __writeRun(self, compression, textD, rowL, hashManifestPath=None):
+        cM = CcdcChangeManifest(hashManifestPath=hashManifestPath)
+        fileU = CcdcFileUtils(compression=compression, changeManifest=cM)
+        for fn, text in textD.items():
+            fileU.writeText(os.path.join(self.__dirPath, fn), text)
+        fileU.writeJson(os.path.join(self.__dirPath, "ABC-index.json"), rowL)
+        return cM.write(self.__manifestPath)
+
+    def testIdempotentWrite(self):
+        """Test case:  unchanged files are not rewritten and changes are recorded in the change manifest"""
+        for compression in [None, "gzip"]:
+            try:
+                sfx = ".gz" if compression else ""
+                textD = {"ABC_XYZ01_001.mol2": "@<TRIPOS>MOLECULE\nXYZ01\n", "ABC_XYZ01_001.sdf": "XYZ01\n$$$$\n", "ABC_XYZ02_001.mol2": "@<TRIPOS>MOLECULE\nXYZ02\n"}
+                rowL = [{"identifier": "XYZ01", "match_number": 1}, {"identifier": "XYZ02", "match_number": 1}]
+                mD = self.__writeRun(compression, textD, rowL)
+                self.assertEqual((mD["num_added"], mD["num_modified"], mD["num_unchanged"]), (4, 0, 0))
+                mol2Path = os.path.join(self.__dirPath, "ABC_XYZ01_001.mol2" + sfx)
+                self.assertEqual(CcdcFileUtils().readText(mol2Path), textD["ABC_XYZ01_001.mol2"])
+                #
+                # an identical re-run (hashing the existing files) preserves the modification times
+                os.utime(mol2Path, (1000000000, 1000000000))
+                mD = self.__writeRun(compression, textD, rowL)
+                self.assertEqual((mD["num_added"], mD["num_modified"], mD["num_unchanged"], mD["num_stale"]), (0, 0, 4, 0))
+                self.assertEqual(os.path.getmtime(mol2Path), 1000000000)
+                #
+                # a changed match list with the hashes from the previous change manifest
+                textD["ABC_XYZ01_001.sdf"] = "XYZ01\nM  END\n$$$$\n"
+                del textD["ABC_XYZ02_001.mol2"]
+                mD = self.__writeRun(compression, textD, rowL[:1], hashManifestPath=self.__manifestPath)
+                self.assertEqual((mD["num_added"], mD["num_modified"], mD["num_unchanged"]), (0, 2, 1))
+                self.assertEqual(mD["files"][os.path.join(self.__dirPath, "ABC-index.json" + sfx)]["status"], "modified")
+                self.assertEqual(mD["stale"], [os.path.join(self.__dirPath, "ABC_XYZ02_001.mol2" + sfx)])
+                self.assertEqual(os.path.getmtime(mol2Path), 1000000000)
+                self.assertEqual(CcdcFileUtils().readJson(os.path.join(self.__dirPath, "ABC-index.json")), rowL[:1])
+                shutil.rmtree(self.__dirPath)
+                os.makedirs(self.__dirPath)
+            except Exception as e:
+                logger.exception("Failing with %s", str(e))
+                self.fail()
+
+    def testMergeManifests(self):
+        """Test case:  combine the change manifests of several processes and keep the run status of a file written twice"""
+        try:
+            cM = CcdcChangeManifest()
+            fileU = CcdcFileUtils(changeManifest=cM)
+            indexPath = os.path.join(self.__dirPath, "ABC-index.json")
+            fileU.writeJson(indexPath, [{"identifier": "XYZ01"}])
+            self.assertTrue(cM.hasPath(indexPath))
+            # an index appended later in the same run remains added
+            fileU.writeJson(indexPath, [{"identifier": "XYZ01"}, {"identifier": "XYZ02"}])
+            self.assertEqual(cM.getSummary(), {"added": 1, "modified": 0, "unchanged": 0})
+            cM.write(os.path.join(self.__workPath, "part-1.json"))
+            #
+            cM = CcdcChangeManifest()
+            otherPath = os.path.join(self.__workPath, "results", "DEF", "DEF-index.json")
+            os.makedirs(os.path.dirname(otherPath))
+            CcdcFileUtils(changeManifest=cM).writeJson(otherPath, [])
+            cM.write(os.path.join(self.__workPath, "part-2.json"))
+            #
+            mD = CcdcChangeManifest.merge([os.path.join(self.__workPath, "part-%d.json" % ii) for ii in [1, 2]], self.__manifestPath)
+            self.assertEqual((mD["num_manifests"], mD["num_added"], mD["num_stale"]), (2, 2, 0))
+            self.assertEqual(sorted(mD["files"]), sorted([indexPath, otherPath]))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteChangeManifestTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcChangeManifestTests("testIdempotentWrite"))
+    suiteSelect.addTest(CcdcChangeManifestTests("testMergeManifests"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteChangeManifestTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
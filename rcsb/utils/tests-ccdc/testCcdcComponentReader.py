@@ -0,0 +1,114 @@
+##
+#
+# File:    testCcdcComponentReader.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for the lazy reader of chemical component definitions as in-memory query molecules -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcBundleReader import CcdcBundleReader
+from rcsb.utils.ccdc.CcdcComponentReader import CcdcComponentReader, openBundle
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class CcdcComponentReaderTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output", "test_ccdc_component_reader")
+        self.__dataPath = os.path.join(HERE, "test-data")
+        self.__cifPath = os.path.join(self.__dataPath, "components-test.cif")
+        if not os.path.exists(self.__workPath):
+            os.makedirs(self.__workPath)
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testReadComponents(self):
+        """Test case:  index a components file and convert each definition to an SDF record"""
+        try:
+            cR = CcdcComponentReader(self.__cifPath)
+            recL = cR.getRecords()
+            self.assertEqual([rD["query_id"] for rD in recL], ["000", "GLC", "NH4", "UNL"])
+            self.assertEqual(recL[-1]["end"], os.path.getsize(self.__cifPath))
+            rangeL = cR.getRanges(recordsPerRange=2)
+            self.assertEqual([rangeD["query_ids"] for rangeD in rangeL], [["000", "GLC"], ["NH4", "UNL"]])
+            #
+            # the definition without atoms is skipped
+            recordD = {queryId: record for rangeD in rangeL for queryId, record in cR.iterRecords(start=rangeD["start"], end=rangeD["end"], queryIdList=rangeD["query_ids"])}
+            self.assertEqual(sorted(recordD), ["000", "GLC", "NH4"])
+            lineL = recordD["GLC"].splitlines()
+            self.assertEqual(lineL[0], "GLC")
+            self.assertEqual(lineL[2], "alpha-D-glucopyranose")
+            self.assertEqual(lineL[3][:6], " 24 24")
+            self.assertEqual(lineL[-2:], ["M  END", "$$$$"])
+            # model coordinates are used for the definition without ideal coordinates
+            self.assertEqual(recordD["000"].splitlines()[3][:6], "  9  8")
+            self.assertIn("M  CHG  1   1   1", recordD["NH4"])
+            self.assertEqual(recordD["NH4"].splitlines()[4].split()[3], "N")
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testPerComponentFile(self):
+        """Test case:  read a per-component definition file and select the reader for a bundle path"""
+        try:
+            cR = CcdcComponentReader(self.__cifPath)
+            recD = cR.getRecords()[1]
+            cifPath = os.path.join(self.__workPath, "GLC.cif")
+            with open(self.__cifPath, "rb") as ifh, open(cifPath, "wb") as ofh:
+                ifh.seek(recD["start"])
+                ofh.write(b"# per-component definition\n" + ifh.read(recD["end"] - recD["start"]))
+            rL = list(CcdcComponentReader(cifPath, coordinates="model").iterRecords())
+            self.assertEqual([queryId for queryId, _ in rL], ["GLC"])
+            self.assertEqual(CcdcComponentReader(cifPath).getRecords()[0]["start"], len(b"# per-component definition\n"))
+            #
+            self.assertTrue(isinstance(openBundle(cifPath), CcdcComponentReader))
+            self.assertTrue(isinstance(openBundle(os.path.join(self.__workPath, "queries.sdf")), CcdcBundleReader))
+            self.assertEqual(openBundle(cifPath).getFormat(), "sdf")
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteComponentReaderTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcComponentReaderTests("testReadComponents"))
+    suiteSelect.addTest(CcdcComponentReaderTests("testPerComponentFile"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteComponentReaderTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,141 @@
+##
+#
+# File:    testCcdcFileUtils.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for compressed streaming output writers and transparent readers -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import glob
+import io
+import logging
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcFileUtils import CcdcFileUtils, zstandard
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class NfsStandInFile(io.FileIO):
+    """Binary output file throttled to model a network filesystem (per file open latency and bandwidth)."""
+
+    openLatency = 0.002
+    bytesPerSecond = 5.0 * 1048576
+    bytesWritten = 0
+
+    def __init__(self, filePath, mode="wb"):
+        time.sleep(self.openLatency)
+        super(NfsStandInFile, self).__init__(filePath, mode)
+
+    def write(self, b):
+        n = super(NfsStandInFile, self).write(b)
+        NfsStandInFile.bytesWritten += n
+        time.sleep(n / self.bytesPerSecond)
+        return n
+
+
+def nfsOpener(filePath, mode):
+    return io.BufferedWriter(NfsStandInFile(filePath, mode))
+
+
+class CcdcFileUtilsTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output", "test_ccdc_file_utils")
+        self.__dataPath = os.path.join(HERE, "test-data")
+        if not os.path.exists(self.__workPath):
+            os.makedirs(self.__workPath)
+        self.__compressionL = [None, "gzip"] + (["zstd"] if zstandard is not None else [])
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testRoundTrip(self):
+        """Test case:  write and transparently read plain and compressed text and json"""
+        try:
+            text = "@<TRIPOS>MOLECULE\nABCDEF01\n" * 100
+            rowL = [{"target_id": "ATP", "identifier": "ABCDEF01", "match_number": 1}]
+            for compression in self.__compressionL:
+                fileU = CcdcFileUtils(compression=compression)
+                fp = os.path.join(self.__workPath, "round-trip.mol2")
+                outPath = fileU.writeText(fp, text)
+                self.assertTrue(os.path.exists(outPath))
+                self.assertEqual(outPath, fileU.getPath(fp))
+                # readers locate and decode the file with or without the compression suffix
+                self.assertEqual(CcdcFileUtils().readText(fp if compression is None else outPath), text)
+                jp = os.path.join(self.__workPath, "round-trip-%s-index.json" % compression)
+                fileU.writeJson(jp, rowL)
+                self.assertEqual(CcdcFileUtils().readJson(jp), rowL)
+                os.remove(outPath)
+            with self.assertRaises(ValueError):
+                CcdcFileUtils(compression="bzip2")
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testWriteBenchmark(self):
+        """Test case:  compare bytes written and elapsed time for plain and compressed output on a network filesystem stand-in"""
+        try:
+            textL = []
+            for pth in sorted(glob.glob(os.path.join(self.__dataPath, "molfiles-xyz", "*.mol2"))):
+                with open(pth, "r") as ifh:
+                    textL.append(ifh.read())
+            self.assertGreater(len(textL), 0)
+            textL = (textL * (200 // len(textL) + 1))[:200]
+            #
+            resultD = {}
+            for compression in self.__compressionL:
+                fileU = CcdcFileUtils(compression=compression, opener=nfsOpener)
+                NfsStandInFile.bytesWritten = 0
+                startTime = time.time()
+                for ii, text in enumerate(textL):
+                    fileU.writeText(os.path.join(self.__workPath, "bench-%s-%04d.mol2" % (compression, ii)), text)
+                fileU.writeJson(os.path.join(self.__workPath, "bench-%s-index.json" % compression), [{"match_number": ii} for ii in range(len(textL))])
+                resultD[compression] = (NfsStandInFile.bytesWritten, time.time() - startTime)
+                logger.info("Compression %-5s bytes written %10d elapsed %.3f seconds", compression, resultD[compression][0], resultD[compression][1])
+            #
+            for compression in self.__compressionL[1:]:
+                self.assertLess(resultD[compression][0], resultD[None][0])
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteFileUtilsTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcFileUtilsTests("testRoundTrip"))
+    suiteSelect.addTest(CcdcFileUtilsTests("testWriteBenchmark"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteFileUtilsTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -99,6 +99,20 @@ class CcdcGeomAnalTests(unittest.TestCase):
             logger.exception("FAILING with %s", str(e))
             self.fail()
 
+    def testGeomAnalComponents(self):
+        """Test case:  geometrical analysis of the chemical component definitions in a components file without query files"""
+        try:
+            cifPath = os.path.join(self.__dataPath, "components-test.cif")
+            cga = CcdcGeomAnal(verbose=self.__verbose, log=self.__lfh)
+            rD = cga.analBundle(cifPath)
+            self.assertEqual(sorted(rD), ["000", "GLC", "NH4"])
+            for queryTargetId, aD in rD.items():
+                self.assertIsNotNone(aD)
+                self.__printSummary(queryTargetId, aD, {})
+        except Exception as e:
+            logger.exception("FAILING with %s", str(e))
+            self.fail()
+
     def __printSummary(self, queryTargetId, rD, atomMap):
         """rD - dictionary of analysis results -
         atomMap - dictionary with mol2 to cc atom name mapping (optional)
@@ -145,6 +159,7 @@ def suiteGeoAnalTests():
     suiteSelect = unittest.TestSuite()
     suiteSelect.addTest(CcdcGeomAnalTests("testGeomAnalSettings"))
     suiteSelect.addTest(CcdcGeomAnalTests("testGeomAnalFromTargetList"))
+    suiteSelect.addTest(CcdcGeomAnalTests("testGeomAnalComponents"))
     return suiteSelect
 
 
@@ -0,0 +1,164 @@
+##
+#
+# File:    testCcdcHitRecord.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for the compact immutable search hit record -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import copy
+import logging
+import pickle
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcHitRecord import CcdcHitRecord, UNSET
+from rcsb.utils.io.IndexUtils import CcdcMatchIndex, CcdcMatchIndexInst
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class CcdcHitRecordTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output", "test_ccdc_hit_record")
+        self.__numHits = 200
+        self.__numComponents = 20
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def __getInstRows(self):
+        """Return substructure match index rows built as with CcdcMatchIndexInst and a copy for each component."""
+        rowL = []
+        for ii in range(self.__numHits):
+            hI = CcdcMatchIndexInst()
+            hI.setCsdVersion("5.43")
+            hI.setCsdDirectory("/data/csd")
+            hI.setTargetId("ATP")
+            hI.setTargetPath("/data/ATP.mol2")
+            hI.setIdentifier("REFC%03d" % ii)
+            hI.setMatchType("substructure")
+            hI.setRFactor(None if ii % 7 == 0 else 3.5)
+            hI.setChemicalName("compound %d" % ii)
+            hI.setTemperature("at 150 K")
+            hI.setRadiationSource("X-ray")
+            hI.setHasDisorder("N")
+            if ii % 3:
+                hI.setCitationDOI("10.1000/xyz.%d" % ii)
+            hI.setMatchedAtomLength(31)
+            for jj in range(1, self.__numComponents + 1):
+                hI.setMatchNumber(jj)
+                hI.setMol2Path("/results/ATP/ATP_REFC%03d_%03d.mol2" % (ii, jj))
+                hI.setMolPath("/results/ATP/ATP_REFC%03d_%03d.sdf" % (ii, jj))
+                rowL.append(copy.deepcopy(hI.get()))
+        return rowL
+
+    def __getRecords(self):
+        """Return the same substructure matches as hit records derived from a record for each hit."""
+        recL = []
+        for ii in range(self.__numHits):
+            hR = CcdcHitRecord(
+                csd_version="5.43",
+                csd_directory="/data/csd",
+                target_id="ATP",
+                target_path="/data/ATP.mol2",
+                identifier="REFC%03d" % ii,
+                match_type="substructure",
+                r_factor=None if ii % 7 == 0 else 3.5,
+                chemical_name="compound %d" % ii,
+                temperature="at 150 K",
+                radiation_source="X-ray",
+                has_disorder="N",
+                doi="10.1000/xyz.%d" % ii if ii % 3 else UNSET,
+                match_atoms=31,
+            )
+            for jj in range(1, self.__numComponents + 1):
+                recL.append(
+                    hR.replace(match_number=jj, mol2_file_path="/results/ATP/ATP_REFC%03d_%03d.mol2" % (ii, jj), mol_file_path="/results/ATP/ATP_REFC%03d_%03d.sdf" % (ii, jj))
+                )
+        return recL
+
+    def testIndexFormat(self):
+        """Test case:  records serialize to the match index records produced with CcdcMatchIndexInst"""
+        try:
+            instL = self.__getInstRows()
+            recL = self.__getRecords()
+            rowL = CcdcHitRecord.toRows(recL)
+            self.assertEqual(rowL, instL)
+            self.assertEqual([list(row.keys()) for row in rowL], [list(row.keys()) for row in instL])
+            self.assertEqual(recL[5].get(), instL[5])
+            self.assertEqual(CcdcHitRecord.fromRow(instL[5]), recL[5])
+            self.assertNotIn("doi", rowL[0])
+            self.assertIsNone(rowL[0]["r_factor"])
+            #
+            self.assertEqual(CcdcHitRecord.toRows(pickle.loads(pickle.dumps(recL[:10]))), instL[:10])
+            with self.assertRaises(AttributeError):
+                recL[0].identifier = "XXXXXX"
+            #
+            fp = os.path.join(self.__workPath, "ATP-index.json")
+            MarshalUtil().mkdir(self.__workPath)
+            cmI = CcdcMatchIndex(indexFilePath=fp)
+            cmI.clear()
+            cmI.load(rowL)
+            self.assertTrue(cmI.writeIndex())
+            self.assertEqual(MarshalUtil().doImport(fp, fmt="json"), instL)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testBuildCost(self):
+        """Test case:  compare the cost of building component records with copying CcdcMatchIndexInst dictionaries"""
+        try:
+            startTime = time.time()
+            instL = self.__getInstRows()
+            instSeconds = time.time() - startTime
+            startTime = time.time()
+            rowL = CcdcHitRecord.toRows(self.__getRecords())
+            recSeconds = time.time() - startTime
+            logger.info("Built %d component rows by copying in %.4f seconds and from hit records in %.4f seconds", len(instL), instSeconds, recSeconds)
+            self.assertEqual(len(rowL), len(instL))
+            self.assertLess(recSeconds, instSeconds)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteHitRecordTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcHitRecordTests("testIndexFormat"))
+    suiteSelect.addTest(CcdcHitRecordTests("testBuildCost"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteHitRecordTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,129 @@
+##
+#
+# File:    testCcdcHitTable.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for re-filtering stored search hits with the columnar hit table -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcFileUtils import CcdcFileUtils
+from rcsb.utils.ccdc.CcdcHitTable import CcdcHitTable
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class CcdcHitTableTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output", "test_ccdc_hit_table")
+        self.__resultPath = os.path.join(self.__workPath, "permissive")
+        self.__filteredPath = os.path.join(self.__workPath, "filtered")
+        self.__mU = MarshalUtil()
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def __writePermissiveHits(self):
+        """Write match indices as from a permissive similarity search for three queries."""
+        rowL = []
+        for ii in range(300):
+            queryTargetId = ["ATP", "HEM", "NAG"][ii % 3]
+            rowL.append(
+                {
+                    "target_id": queryTargetId,
+                    "identifier": "REFC%02d" % (ii % 97),
+                    "match_type": "similarity",
+                    "match_number": 1,
+                    "similarity_score": 0.80 + (ii % 20) / 100.0,
+                    "r_factor": None if ii % 23 == 0 else 2.0 + (ii % 15),
+                    "temperature": "at %d K" % (100 + ii % 200) if ii % 7 else None,
+                    "radiation_source": "Neutron" if ii % 13 == 0 else "X-ray",
+                    "has_disorder": "Y" if ii % 4 == 0 else "N",
+                    "has_3d_coordinates": ii % 9 != 0,
+                    "is_organic": ii % 5 != 0,
+                    "has_metals": ii % 5 == 0,
+                }
+            )
+        for queryTargetId in ["ATP", "HEM", "NAG"]:
+            fp = os.path.join(self.__resultPath, queryTargetId, queryTargetId + "-index.json")
+            self.__mU.doExport(fp, [row for row in rowL if row["target_id"] == queryTargetId], fmt="json", indent=3)
+        return rowL
+
+    def testFilterStoredHits(self):
+        """Test case:  apply stricter quality filters to stored hits and write match indices"""
+        try:
+            rowL = self.__writePermissiveHits()
+            hT = CcdcHitTable.fromIndexFiles(self.__resultPath)
+            self.assertEqual(len(hT), len(rowL))
+            #
+            # Filters equivalent to the default search settings (rValueMaxPercent=10.0)
+            fT = hT.filter(maxRFactor=10.0, noDisorder=True, has3dCoordinates=True)
+            expL = [row for row in rowL if row["r_factor"] is not None and row["r_factor"] <= 10.0 and row["has_disorder"] == "N" and row["has_3d_coordinates"]]
+            self.assertEqual(len(fT), len(expL))
+            #
+            fT = hT.filter(maxRFactor=5.0, minTemperature=150.0, maxTemperature=250.0, radiationSources=["X-ray"], organicOnly=True, noMetals=True, minSimilarity=0.9)
+            self.assertGreater(len(fT), 0)
+            for row in fT.getRows():
+                self.assertLessEqual(row["r_factor"], 5.0)
+                self.assertTrue(150 <= int(row["temperature"].split()[1]) <= 250)
+                self.assertEqual(row["radiation_source"], "X-ray")
+                self.assertFalse(row["has_metals"])
+                self.assertGreaterEqual(row["similarity_score"], 0.9)
+            # filtered columns are those of the selected rows
+            for ky in CcdcHitTable.floatColumnL + CcdcHitTable.flagColumnL + CcdcHitTable.stringColumnL:
+                self.assertEqual(str(fT.getColumn(ky).tolist()), str(CcdcHitTable(fT.getRows()).getColumn(ky).tolist()))
+            #
+            countD = fT.writeIndices(self.__filteredPath)
+            fileU = CcdcFileUtils()
+            for queryTargetId, numHits in countD.items():
+                self.assertEqual(len(fileU.readJson(os.path.join(self.__filteredPath, queryTargetId, queryTargetId + "-index.json"))), numHits)
+            #
+            tablePath = os.path.join(self.__workPath, "hit-table.npz")
+            self.assertTrue(hT.save(tablePath))
+            self.assertEqual(len(CcdcHitTable.load(tablePath).filter(maxRFactor=10.0, noDisorder=True, has3dCoordinates=True)), len(expL))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteHitTableTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcHitTableTests("testFilterStoredHits"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteHitTableTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
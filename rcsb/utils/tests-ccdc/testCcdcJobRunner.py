@@ -0,0 +1,130 @@
+##
+#
+# File:    testCcdcJobRunner.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for job specifications running mixed search and analysis tasks on a shared worker pool -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import glob
+import logging
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcJobRunner import CcdcJobRunner
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class CcdcJobRunnerTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output", "test_ccdc_job_runner")
+        self.__dataPath = os.path.join(HERE, "test-data")
+        self.__molFilePath = os.path.join(self.__dataPath, "molfiles")
+        self.__specPath = os.path.join(self.__workPath, "job-spec.json")
+        self.__queryListFilePath = os.path.join(self.__workPath, "query_list.txt")
+        MarshalUtil().doExport(self.__queryListFilePath, sorted(glob.glob(os.path.join(self.__molFilePath, "*.mol2")))[1:5], fmt="list")
+        self.__specD = {
+            "result_path": "./results",
+            "queries": {"mol_list_path": "./query_list.txt", "bundle_path": os.path.join(self.__dataPath, "components-test.cif")},
+            "smarts": [{"id": "P1", "smarts": "c1ccccc1C(=O)O"}, {"id": "P2", "smarts": "[#6]-[#8]-[#1]"}],
+            "tasks": [
+                {"type": "similarity", "max_hits": 10},
+                {"type": "substructure", "name": "substructure-organic", "suppress_metals": True, "max_hits": 10},
+                {"type": "geometry"},
+                {"type": "smarts", "max_hits": 10},
+            ],
+            "num_proc": 2,
+        }
+        MarshalUtil().doExport(self.__specPath, self.__specD, fmt="json", indent=3)
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testPlanJob(self):
+        """Test case:  validate a job specification and interleave the SMARTS patterns with the query molecules"""
+        try:
+            jR = CcdcJobRunner(specPath=self.__specPath)
+            specD = jR.getSpec()
+            self.assertEqual(specD["result_path"], os.path.join(self.__workPath, "results"))
+            self.assertEqual([taskD["name"] for taskD in specD["tasks"]], ["similarity", "substructure-organic", "geometry", "smarts"])
+            self.assertEqual([taskD["normalize"] for taskD in specD["tasks"]], [True, True, False, True])
+            #
+            unitL = jR.getUnits()
+            self.assertEqual([unitD["kind"] for unitD in unitL], ["molecule"] * 2 + ["smarts"] + ["molecule"] * 4 + ["smarts"] + ["molecule"] * 2)
+            queryIdL = [unitD["query_id"] for unitD in unitL if unitD["kind"] == "molecule"]
+            self.assertEqual(queryIdL[-4:], ["000", "GLC", "NH4", "UNL"])
+            self.assertEqual(len(set(queryIdL)), len(queryIdL))
+            self.assertEqual(jR.getPlan()["num_molecules"], 8)
+            #
+            # records of the bundle are selected with start_record/end_record
+            specD = dict(self.__specD, queries={"bundle_path": os.path.join(self.__dataPath, "components-test.cif"), "start_record": 2, "end_record": 3})
+            unitL = CcdcJobRunner(specD=specD).getUnits()
+            self.assertEqual([unitD["query_id"] for unitD in unitL], ["GLC", "P1", "NH4", "P2"])
+            #
+            for tD in [{"type": "docking"}, {"type": "smarts", "name": "similarity"}]:
+                with self.assertRaises(ValueError):
+                    CcdcJobRunner(specD=dict(self.__specD, tasks=[{"type": "similarity"}, tD]))
+            with self.assertRaises(ValueError):
+                CcdcJobRunner(specD=dict(self.__specD, queries={}))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testRunJob(self):
+        """Test case:  run similarity, substructure, geometry and SMARTS tasks on a shared worker pool"""
+        try:
+            jR = CcdcJobRunner(specPath=self.__specPath, csdHome=os.environ["CSDHOME"], pythonRootPath=os.environ["CSD_PYTHON_ROOT_PATH"])
+            summaryD = jR.run()
+            self.assertEqual(summaryD["num_units"], 10)
+            self.assertEqual(summaryD["tasks"]["similarity"]["num_queries"], 8)
+            self.assertEqual(summaryD["tasks"]["smarts"]["num_queries"], 2)
+            # the component without atoms is not read
+            self.assertEqual(summaryD["num_failed"], 3)
+            self.assertGreaterEqual(summaryD["tasks"]["smarts"]["num_matched"], 1)
+            self.assertTrue(os.access(os.path.join(self.__workPath, "results", "geometry", "GLC-geometry.json"), os.R_OK))
+            self.assertTrue(os.access(os.path.join(self.__workPath, "results", "job-summary.json"), os.R_OK))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteJobRunnerTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcJobRunnerTests("testPlanJob"))
+    suiteSelect.addTest(CcdcJobRunnerTests("testRunJob"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteJobRunnerTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
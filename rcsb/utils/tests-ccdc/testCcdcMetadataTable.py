@@ -0,0 +1,180 @@
+##
+#
+# File:    testCcdcMetadataTable.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for the memory-mapped CSD entry metadata table -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import random
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcMetadataTable import CcdcMetadataTable
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class CcdcMetadataTableTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output", "test_ccdc_metadata_table")
+        self.__tablePath = CcdcMetadataTable.getTablePath(self.__workPath, "5.43")
+        self.__numEntries = 50000
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def __getEntries(self):
+        rL = []
+        for ii in range(self.__numEntries):
+            rL.append(
+                {
+                    "identifier": "%s%02d" % ("".join(chr(65 + (ii // 26 ** jj) % 26) for jj in range(6)), ii % 3),
+                    "r_factor": None if ii % 17 == 0 else round(2.0 + (ii % 80) / 10.0, 2),
+                    "chemical_name": "catena-(bis(μ-chloro)-compound %d)" % ii,
+                    "temperature": "at %d K" % (100 + ii % 200),
+                    "radiation_source": "X-ray" if ii % 11 else "Neutron",
+                    "doi": "10.1000/xyz.%d" % ii if ii % 5 else None,
+                }
+            )
+        return rL
+
+    def testBuildAndLookup(self):
+        """Test case:  build the table and look up entry metadata by refcode"""
+        try:
+            entryL = self.__getEntries()
+            mdt = CcdcMetadataTable(self.__tablePath)
+            self.assertEqual(mdt.build(entryL, "5.43"), len(entryL))
+            self.assertTrue(mdt.open())
+            self.assertEqual(mdt.getCsdVersion(), "5.43")
+            self.assertEqual(mdt.getRecordCount(), len(entryL))
+            for rD in random.sample(entryL, 1000):
+                mD = mdt.get(rD["identifier"])
+                self.assertIsNotNone(mD)
+                for ky in ["r_factor", "chemical_name", "temperature", "radiation_source", "doi"]:
+                    self.assertEqual(mD[ky], rD[ky])
+            self.assertIsNone(mdt.get("ZZZZZZ99"))
+            mdt.close()
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testJsonExportBenchmark(self):
+        """Test case:  compare the cost of hit annotation from the mapped table and from an in-memory JSON metadata export
+
+        This is not the baseline replaced by the table (reading each hit entry with the ccdc API) - see testEntryReaderBenchmark().
+        """
+        try:
+            entryL = self.__getEntries()
+            CcdcMetadataTable(self.__tablePath).build(entryL, "5.43")
+            jsonPath = os.path.join(self.__workPath, "csd-entry-metadata.json")
+            mU = MarshalUtil()
+            mU.doExport(jsonPath, {rD["identifier"]: rD for rD in entryL}, fmt="json")
+            hitL = [rD["identifier"] for rD in random.choices(entryL, k=20000)]
+            #
+            startTime = time.time()
+            mdt = CcdcMetadataTable(self.__tablePath)
+            mdt.open()
+            tableOpen = time.time() - startTime
+            startTime = time.time()
+            for identifier in hitL:
+                mdt.get(identifier)
+            tablePerHit = (time.time() - startTime) / len(hitL)
+            mdt.close()
+            #
+            startTime = time.time()
+            metaD = mU.doImport(jsonPath, fmt="json")
+            jsonOpen = time.time() - startTime
+            startTime = time.time()
+            for identifier in hitL:
+                _ = dict(metaD[identifier])
+            jsonPerHit = (time.time() - startTime) / len(hitL)
+            #
+            logger.info("Mapped table open %.6f seconds annotation %.2f microseconds per hit", tableOpen, tablePerHit * 1.0e6)
+            logger.info("JSON export load %.6f seconds annotation %.2f microseconds per hit", jsonOpen, jsonPerHit * 1.0e6)
+            self.assertLess(tableOpen, jsonOpen)
+            self.assertLess(tablePerHit, 1.0e-3)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testEntryReaderBenchmark(self):
+        """Test case:  compare the cost of hit annotation from the mapped table and from the CSD entries (requires the ccdc API)"""
+        try:
+            from ccdc.io import EntryReader  # pylint: disable=import-outside-toplevel
+
+            reader = EntryReader("CSD")
+            entryL = []
+            for entry in reader:
+                try:
+                    entryL.append(CcdcMetadataTable.getEntryMetadata(entry))
+                except Exception:
+                    continue
+                if len(entryL) >= 5000:
+                    break
+            CcdcMetadataTable(self.__tablePath).build(entryL, "5.43")
+            hitL = [rD["identifier"] for rD in random.choices(entryL, k=2000)]
+            #
+            startTime = time.time()
+            mdt = CcdcMetadataTable(self.__tablePath)
+            mdt.open()
+            for identifier in hitL:
+                mdt.get(identifier)
+            tablePerHit = (time.time() - startTime) / len(hitL)
+            mdt.close()
+            #
+            # the baseline annotation path reads each hit entry from the database
+            startTime = time.time()
+            for identifier in hitL:
+                CcdcMetadataTable.getEntryMetadata(reader.entry(identifier))
+            entryPerHit = (time.time() - startTime) / len(hitL)
+            #
+            logger.info("Mapped table annotation %.2f microseconds per hit", tablePerHit * 1.0e6)
+            logger.info("EntryReader annotation %.2f microseconds per hit", entryPerHit * 1.0e6)
+            self.assertLess(tablePerHit, entryPerHit)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteMetadataTableTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcMetadataTableTests("testBuildAndLookup"))
+    suiteSelect.addTest(CcdcMetadataTableTests("testJsonExportBenchmark"))
+    suiteSelect.addTest(CcdcMetadataTableTests("testEntryReaderBenchmark"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteMetadataTableTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
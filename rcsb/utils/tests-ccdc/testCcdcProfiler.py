@@ -0,0 +1,145 @@
+##
+#
+# File:    testCcdcProfiler.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for the opt-in per-query profiler and the slowest-queries report -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import glob
+import logging
+import pstats
+import shutil
+import subprocess
+import sys
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcProfiler import CcdcProfiler
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def _scoreCandidates(numCandidates):
+    return sum(ii * ii % 7 for ii in range(numCandidates))
+
+
+def _slowQuery(numCandidates, latency):
+    """Query spending its time in a scoring loop and a wait for the database."""
+    time.sleep(latency)
+    return _scoreCandidates(numCandidates)
+
+
+class CcdcProfilerTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output", "test_ccdc_profiler")
+        if os.path.exists(self.__workPath):
+            shutil.rmtree(self.__workPath)
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testProfileSlowQueries(self):
+        """Test case:  profiles are stored for queries over the threshold and timings are recorded for all queries"""
+        try:
+            prof = CcdcProfiler(thresholdSeconds=0.1)
+            for queryTargetId, latency in [("FAST1", 0.0), ("SLOW1", 0.2), ("FAST2", 0.01)]:
+                with prof.profile(queryTargetId, self.__workPath) as infoD:
+                    # nested queries are timed with the enclosing query
+                    with prof.profile(queryTargetId + "_INNER", self.__workPath):
+                        _slowQuery(1000, latency)
+                    infoD.update({"search_type": "similarity", "num_atoms": len(queryTargetId), "num_hits": 2})
+            #
+            self.assertFalse(os.path.exists(os.path.join(self.__workPath, "FAST1")))
+            profilePath = os.path.join(self.__workPath, "SLOW1", "SLOW1-profile.pstats")
+            self.assertTrue(os.access(profilePath, os.R_OK))
+            self.assertGreater(pstats.Stats(profilePath).total_tt, 0.1)
+            #
+            reportD = CcdcProfiler.writeReport(self.__workPath, topN=2)
+            self.assertTrue(os.access(os.path.join(self.__workPath, "query-profile-report.json"), os.R_OK))
+            self.assertEqual(reportD["num_queries"], 3)
+            self.assertEqual(reportD["num_profiled"], 1)
+            self.assertEqual([rD["target_id"] for rD in reportD["slowest"]], ["SLOW1", "FAST2"])
+            slowD = reportD["slowest"][0]
+            self.assertEqual((slowD["num_atoms"], slowD["num_hits"]), (5, 2))
+            self.assertEqual(slowD["profile_path"], profilePath)
+            self.assertIn("time.sleep", slowD["top_functions"][0]["function"])
+            self.assertIn("_slowQuery", slowD["dominant_stack"][0]["function"])
+            self.assertIn("time.sleep", slowD["dominant_stack"][-1]["function"])
+            self.assertNotIn("top_functions", reportD["slowest"][1])
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testReportAcrossProcesses(self):
+        """Test case:  the report collects the query timings written by separate processes"""
+        try:
+            script = "\n".join(
+                [
+                    "import sys",
+                    "sys.path.insert(0, %r)" % HERE,
+                    "from rcsb.utils.ccdc.CcdcProfiler import CcdcProfiler",
+                    "from testCcdcProfiler import _slowQuery",
+                    "prof = CcdcProfiler(thresholdSeconds=0.05, verbose=False)",
+                    "for ii in range(3):",
+                    "    with prof.profile('Q%s_%d' % (sys.argv[1], ii), sys.argv[2]):",
+                    "        _slowQuery(10, 0.04 * ii)",
+                ]
+            )
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join([TOPDIR] + sys.path))
+            prL = [subprocess.Popen([sys.executable, "-c", script, str(jj), os.path.join(self.__workPath, "chunk_%d" % jj)], env=env) for jj in range(3)]
+            self.assertEqual([pr.wait(timeout=120) for pr in prL], [0, 0, 0])
+            # an incomplete line from a process still writing its summary is skipped
+            summaryPath = glob.glob(os.path.join(self.__workPath, "chunk_0", CcdcProfiler.summaryPrefix + "*.jsonl"))[0]
+            with open(summaryPath, "a") as ofh:
+                ofh.write('{"target_id": "Q0_3", "sec')
+            #
+            reportD = CcdcProfiler.getReport(self.__workPath, topN=3)
+            logger.info("Report %r", [(rD["target_id"], rD["seconds"]) for rD in reportD["slowest"]])
+            self.assertEqual(reportD["num_queries"], 9)
+            self.assertEqual(reportD["num_profiled"], 3)
+            self.assertEqual(sorted(rD["target_id"] for rD in reportD["slowest"]), ["Q0_2", "Q1_2", "Q2_2"])
+            self.assertEqual(len({rD["pid"] for rD in reportD["slowest"]}), 3)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteProfilerTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcProfilerTests("testProfileSlowQueries"))
+    suiteSelect.addTest(CcdcProfilerTests("testReportAcrossProcesses"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteProfilerTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
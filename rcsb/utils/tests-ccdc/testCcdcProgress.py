@@ -0,0 +1,117 @@
+##
+#
+# File:    testCcdcProgress.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for live progress and throughput aggregation across search workers -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import subprocess
+import sys
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcProgress import CcdcProgressMonitor
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class CcdcProgressTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output", "test_ccdc_progress")
+        MarshalUtil().mkdir(self.__workPath)
+        self.__statusPath = os.path.join(self.__workPath, "search-progress.json")
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testWorkerProgress(self):
+        """Test case:  query events published by worker processes are aggregated into a live status file"""
+        try:
+            numWorkers = 3
+            numQueries = 8
+            script = "\n".join(
+                [
+                    "import sys, time",
+                    "from rcsb.utils.ccdc.CcdcProgress import CcdcProgressPublisher",
+                    "pub = CcdcProgressPublisher(sys.argv[1], worker=sys.argv[2])",
+                    "for ii in range(%d):" % numQueries,
+                    "    latency = 0.05 if sys.argv[2] != 'worker_3' else 0.01",
+                    "    time.sleep(latency)",
+                    "    pub.queryDone('Q%s_%d' % (sys.argv[2], ii), ii % 2, latency, error='failed' if ii == 7 else None)",
+                    "pub.close()",
+                ]
+            )
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join([TOPDIR] + sys.path))
+            numTotal = numWorkers * numQueries + 6
+            pM = CcdcProgressMonitor(numTotal, self.__statusPath, interval=0.1)
+            pM.start()
+            prL = [subprocess.Popen([sys.executable, "-c", script, pM.getAddress(), "worker_%d" % (jj + 1)], env=env) for jj in range(numWorkers)]
+            self.assertEqual([pr.wait(timeout=120) for pr in prL], [0] * numWorkers)
+            time.sleep(0.3)
+            #
+            # live view while the run is incomplete
+            liveD = MarshalUtil().doImport(self.__statusPath, fmt="json")
+            logger.info("Live status %r", {ky: liveD[ky] for ky in ["num_completed", "queries_per_second", "eta_seconds"]})
+            self.assertEqual(liveD["state"], "running")
+            self.assertEqual(liveD["num_completed"], numWorkers * numQueries)
+            self.assertGreater(liveD["queries_per_second"], 0.0)
+            self.assertGreater(liveD["eta_seconds"], 0.0)
+            #
+            statusD = pM.stop()
+            self.assertEqual(MarshalUtil().doImport(self.__statusPath, fmt="json")["state"], "completed")
+            self.assertEqual(statusD["num_total"], numTotal)
+            self.assertEqual(statusD["num_completed"], numWorkers * numQueries)
+            self.assertEqual(statusD["num_failed"], numWorkers)
+            self.assertEqual(statusD["num_matched"], numWorkers * 3)
+            self.assertEqual(sorted(statusD["workers"]), ["worker_1", "worker_2", "worker_3"])
+            wD = statusD["workers"]["worker_1"]
+            self.assertEqual(wD["num_completed"], numQueries)
+            self.assertEqual(wD["last_query_id"], "Qworker_1_7")
+            self.assertAlmostEqual(wD["busy_seconds"], numQueries * 0.05, places=3)
+            self.assertGreater(wD["utilization"], 0.0)
+            self.assertLessEqual(wD["utilization"], 1.0)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteProgressTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcProgressTests("testWorkerProgress"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteProgressTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,138 @@
+##
+#
+# File:    testCcdcResultLayout.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for the flat and hash-sharded result directory layouts and the top-level result manifest -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import glob
+import logging
+import shutil
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcHitTable import CcdcHitTable
+from rcsb.utils.ccdc.CcdcResultLayout import CcdcResultLayout
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class CcdcResultLayoutTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output", "test_ccdc_result_layout")
+        if os.path.exists(self.__workPath):
+            shutil.rmtree(self.__workPath)
+        self.__resultPath = os.path.join(self.__workPath, "results")
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def __getRows(self, numQueries):
+        return [{"target_id": "Q%05d" % ii, "identifier": "REFC%02d" % jj, "match_type": "similarity", "match_number": 1} for ii in range(numQueries) for jj in range(2)]
+
+    def testLayoutPaths(self):
+        """Test case:  query result paths in the flat and hashed layouts"""
+        try:
+            prefix = CcdcResultLayout.getPrefix("ATP")
+            self.assertRegex(prefix, r"^[0-9a-f]{2}%s[0-9a-f]{2}$" % os.sep)
+            self.assertEqual(CcdcResultLayout.getPrefix("ATP"), prefix)
+            hL = CcdcResultLayout("hashed")
+            self.assertEqual(hL.getQueryPath(self.__resultPath, "ATP"), os.path.join(self.__resultPath, prefix, "ATP"))
+            self.assertEqual(hL.getIndexPath(self.__resultPath, "ATP"), os.path.join(self.__resultPath, prefix, "ATP", "ATP-index.json"))
+            fL = CcdcResultLayout()
+            self.assertEqual(fL.getQueryPath(self.__resultPath, "ATP"), os.path.join(self.__resultPath, "ATP"))
+            self.assertFalse(fL.register(self.__resultPath, "ATP"))
+            self.assertEqual(CcdcResultLayout.fromResultPath(self.__resultPath).getLayout(), "flat")
+            with self.assertRaises(ValueError):
+                CcdcResultLayout("nested")
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testHashedResults(self):
+        """Test case:  write, list and reload match indices in the hashed layout with the result manifest"""
+        try:
+            rowL = self.__getRows(300)
+            countD = CcdcHitTable(rowL).writeIndices(self.__resultPath, compression="gzip", layout=CcdcResultLayout("hashed"))
+            self.assertEqual(len(countD), 300)
+            # no per-query directories at the top level and at most 256 prefix directories at each level
+            topL = [fn for fn in os.listdir(self.__resultPath) if os.path.isdir(os.path.join(self.__resultPath, fn))]
+            self.assertTrue(all(len(fn) == 2 for fn in topL))
+            self.assertLessEqual(len(topL), 256)
+            self.assertEqual(CcdcResultLayout.fromResultPath(self.__resultPath).getLayout(), "hashed")
+            #
+            # queries are listed from the part file before the result manifest is written
+            self.assertEqual(len(glob.glob(os.path.join(self.__resultPath, CcdcResultLayout.partPrefix + "*.jsonl"))), 1)
+            self.assertEqual(len(CcdcResultLayout.getManifest(self.__resultPath)), 300)
+            mD = CcdcResultLayout.writeManifest(self.__resultPath)
+            self.assertEqual((mD["layout"], mD["num_queries"]), ("hashed", 300))
+            self.assertEqual(mD["queries"]["Q00007"], os.path.join(CcdcResultLayout.getPrefix("Q00007"), "Q00007"))
+            self.assertEqual(glob.glob(os.path.join(self.__resultPath, CcdcResultLayout.partPrefix + "*.jsonl")), [])
+            self.assertEqual(MarshalUtil().doImport(os.path.join(self.__resultPath, CcdcResultLayout.manifestFileName), fmt="json")["num_queries"], 300)
+            #
+            # a later run adds queries to the result manifest
+            CcdcHitTable(self.__getRows(310)[600:]).writeIndices(self.__resultPath, layout=CcdcResultLayout("hashed"))
+            self.assertEqual(CcdcResultLayout.writeManifest(self.__resultPath)["num_queries"], 310)
+            self.assertEqual(len(CcdcResultLayout.getIndexPaths(self.__resultPath)), 310)
+            hT = CcdcHitTable.fromIndexFiles(self.__resultPath)
+            self.assertEqual(len(hT), 620)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testFlatResults(self):
+        """Test case:  list plain and compressed match indices in the flat layout"""
+        try:
+            rowL = self.__getRows(10)
+            CcdcHitTable(rowL[:10]).writeIndices(self.__resultPath)
+            CcdcHitTable(rowL[6:]).writeIndices(self.__resultPath, compression="gzip")
+            pathL = CcdcResultLayout.getIndexPaths(self.__resultPath)
+            self.assertEqual(len(pathL), 10)
+            self.assertEqual(pathL[0], os.path.join(self.__resultPath, "Q00000", "Q00000-index.json"))
+            self.assertFalse(os.path.exists(os.path.join(self.__resultPath, CcdcResultLayout.layoutFileName)))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteResultLayoutTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcResultLayoutTests("testLayoutPaths"))
+    suiteSelect.addTest(CcdcResultLayoutTests("testHashedResults"))
+    suiteSelect.addTest(CcdcResultLayoutTests("testFlatResults"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteResultLayoutTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
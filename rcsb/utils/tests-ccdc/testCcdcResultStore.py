@@ -0,0 +1,154 @@
+##
+#
+# File:    testCcdcResultStore.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for the run-wide SQLite result store with batched inserts from worker processes -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcResultStore import CcdcResultStore
+from rcsb.utils.ccdc.CcdcWorkerPool import CcdcWorkerPool
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+_WORKER_STATE = {}
+
+
+def _getMatchRows(queryTargetId):
+    """Return match index records as from a similarity search for the input query."""
+    ii = int(queryTargetId[1:])
+    rowL = []
+    for jj in range(40):
+        rowL.append(
+            {
+                "target_id": queryTargetId,
+                "identifier": "REFC%02d" % ((ii + jj) % 50),
+                "match_type": "similarity",
+                "match_number": 1,
+                "similarity_score": 0.70 + (jj % 30) / 100.0,
+                "r_factor": 2.0 + (jj % 8),
+                "chemical_name": "compound %d" % jj,
+            }
+        )
+    return rowL
+
+
+def _initWorker(dbPath):
+    _WORKER_STATE["store"] = CcdcResultStore(dbPath, batchSize=100)
+
+
+def _exitWorker():
+    _WORKER_STATE["store"].close()
+
+
+def _insertTask(queryTargetId):
+    rowL = _getMatchRows(queryTargetId)
+    _WORKER_STATE["store"].addMatches(rowL, queryTargetId=queryTargetId, matchType="similarity")
+    return len(rowL)
+
+
+class CcdcResultStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output", "test_ccdc_result_store")
+        if not os.path.exists(self.__workPath):
+            os.makedirs(self.__workPath)
+        self.__queryIdL = ["Q%03d" % ii for ii in range(60)]
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def __removeStore(self, dbPath):
+        for pth in [dbPath, dbPath + "-wal", dbPath + "-shm"]:
+            if os.path.exists(pth):
+                os.remove(pth)
+
+    def testConcurrentInserts(self):
+        """Test case:  batched inserts from concurrent worker processes and reverse lookups"""
+        try:
+            dbPath = os.path.join(self.__workPath, "results-mp.sqlite")
+            self.__removeStore(dbPath)
+            wp = CcdcWorkerPool(_insertTask, initFunc=_initWorker, initArgs=(dbPath,), numProc=4, maxTasksPerWorker=7, exitFunc=_exitWorker)
+            rL = list(wp.run(self.__queryIdL, chunkSize=3))
+            self.assertTrue(all(r[2] is None for r in rL))
+            #
+            expL = [row for queryTargetId in self.__queryIdL for row in _getMatchRows(queryTargetId)]
+            rS = CcdcResultStore(dbPath)
+            self.assertEqual(rS.count(), len(expL))
+            self.assertEqual(rS.count(matchType="similarity", minSimilarity=0.9), len([row for row in expL if row["similarity_score"] >= 0.9]))
+            self.assertEqual(rS.getQueryIds("REFC07"), sorted({row["target_id"] for row in expL if row["identifier"] == "REFC07"}))
+            self.assertEqual(len(rS.getIdentifiers("Q010")), 40)
+            self.assertEqual(len(rS.getQueryCounts(matchType="similarity")), len(self.__queryIdL))
+            mL = rS.getMatches(queryTargetId="Q010", identifier="REFC10")
+            self.assertEqual(len(mL), 1)
+            self.assertEqual(mL[0]["chemical_name"], "compound 0")
+            rS.close()
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testImportIndexFiles(self):
+        """Test case:  load stored match indices and replace rather than duplicate repeated matches"""
+        try:
+            resultPath = os.path.join(self.__workPath, "results")
+            mU = MarshalUtil()
+            numRows = 0
+            for queryTargetId in self.__queryIdL[:10]:
+                rowL = _getMatchRows(queryTargetId)
+                mU.doExport(os.path.join(resultPath, queryTargetId, queryTargetId + "-index.json"), rowL, fmt="json", indent=3)
+                numRows += len(rowL)
+            dbPath = os.path.join(self.__workPath, "results-import.sqlite")
+            self.__removeStore(dbPath)
+            rS = CcdcResultStore(dbPath)
+            self.assertEqual(rS.importIndexFiles(resultPath), numRows)
+            self.assertEqual(rS.importIndexFiles(resultPath), numRows)
+            self.assertEqual(rS.count(), numRows)
+            self.assertEqual(rS.getQueryCounts()["Q003"], 40)
+            rS.close()
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteResultStoreTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcResultStoreTests("testConcurrentInserts"))
+    suiteSelect.addTest(CcdcResultStoreTests("testImportIndexFiles"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteResultStoreTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
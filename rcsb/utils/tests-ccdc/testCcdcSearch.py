@@ -25,10 +25,15 @@ import os
 import os.path
 import platform
 import resource
+import shutil
 
+from rcsb.utils.ccdc.CcdcFileUtils import CcdcFileUtils
+from rcsb.utils.ccdc.CcdcHitTable import CcdcHitTable
+from rcsb.utils.ccdc.CcdcProfiler import CcdcProfiler
+from rcsb.utils.ccdc.CcdcResultLayout import CcdcResultLayout
 from rcsb.utils.ccdc.CcdcSearch import CcdcSearch
 from rcsb.utils.ccdc import __version__
-
+from rcsb.utils.io.MarshalUtil import MarshalUtil
 
 HERE = os.path.abspath(os.path.dirname(__file__))
 TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
@@ -75,6 +80,55 @@ class CcdcSearchTests(unittest.TestCase):
             logger.exception("Failing with %s", str(e))
             self.fail()
 
+    def testSmartsBatchSearch(self):
+        """Test case:  CCDC SMARTS substructure search for a batch of patterns in one pass"""
+        try:
+            smartsList = self.__smartsList + [("001", "c1ccccc1[N+](=O)[O-]"), ("002", "[Na+].[Cl-]")]
+            vS = CcdcSearch(verbose=self.__verbose)
+            hitD = vS.searchSmartsBatch(smartsList, self.__smartsResultPath, maxHits=5)
+            self.assertEqual(len(hitD), len(smartsList))
+            for queryTargetId, numHits in hitD.items():
+                logger.info("%s matched %d", queryTargetId, numHits)
+                if numHits:
+                    rowL = CcdcFileUtils().readJson(os.path.join(vS.getQueryResultPath(self.__smartsResultPath, queryTargetId), queryTargetId + "-index.json"))
+                    self.assertLessEqual(len({row["identifier"] for row in rowL}), 5)
+            # match counts are not limited by maxHits as in searchSmarts()
+            queryTargetId, smarts = smartsList[1]
+            self.assertEqual(hitD[queryTargetId], vS.searchSmarts(queryTargetId, smarts, os.path.join(self.__workPath, "ccdc_ss_smarts_single"), maxHits=5))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSmartsElementScreen(self):
+        """Test case:  element requirements of SMARTS patterns ignore recursive SMARTS and negated primitives"""
+        try:
+            self.assertEqual(CcdcSearch.getSmartsElementCounts("COC(=O)O"), {"C": 2, "O": 3})
+            self.assertEqual(CcdcSearch.getSmartsElementCounts("ClCc1ccccc1[N+](=O)[O-]"), {"Cl": 1, "C": 7, "N": 1, "O": 2})
+            # Cl appears only in a negated recursive SMARTS - molecules without chlorine match
+            self.assertEqual(CcdcSearch.getSmartsElementCounts("[C;!$([CH2]Cl)]"), {})
+            self.assertEqual(CcdcSearch.getSmartsElementCounts("[$(C[Cl])]Br"), {"Br": 1})
+            self.assertEqual(CcdcSearch.getSmartsElementCounts("[!#6]C"), {"C": 1})
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testComponentMembership(self):
+        """Test case:  map match atoms to components when component atom labels are duplicated"""
+        try:
+            # two copies of the same ligand (labels C1 O1) and a water (O1) distinguished by coordinates
+            atomL = [("C1", (0.0, 0.0, 0.0)), ("O1", (1.2, 0.0, 0.0)), ("C1", (5.0, 0.0, 0.0)), ("O1", (6.2, 0.0, 0.0)), ("O1", (9.0, 0.0, 0.0))]
+            componentL = [[atomL[4]], [atomL[2], atomL[3]], [atomL[0], atomL[1]]]
+            membershipL = CcdcSearch.getComponentMembership(atomL, componentL)
+            self.assertEqual(membershipL, [2, 2, 1, 1, 0])
+            # a match on the second ligand selects only its component
+            self.assertEqual(sorted({membershipL[ii] for ii in [2, 3]}), [1])
+            # without distinguishing keys atoms are assigned to components in order
+            self.assertEqual(CcdcSearch.getComponentMembership(["C1", "O1", "C1", "O1"], [["C1", "O1"], ["C1", "O1"]]), [0, 0, 1, 1])
+            self.assertEqual(CcdcSearch.getComponentMembership(["C1", "N1"], [["C1"]]), [0, None])
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
     def testSimilaritySearch(self):
         """Test case:  CCDC similarity search"""
         try:
@@ -92,6 +146,184 @@ class CcdcSearchTests(unittest.TestCase):
             logger.exception("Failing with %s", str(e))
             self.fail()
 
+    def testSimilaritySearchHashed(self):
+        """Test case:  CCDC similarity search with results stored in the hashed layout and listed in the result manifest"""
+        try:
+            pL = sorted(glob.glob(os.path.join(self.__molFilePath, "*.mol2")))
+            resultPath = os.path.join(self.__workPath, "test_chem_comp_ccdc_sim_hashed")
+            vS = CcdcSearch(verbose=self.__verbose, resultLayout="hashed")
+            hitL = []
+            for queryTargetPath in pL:
+                queryTargetId, _ = os.path.splitext(os.path.basename(queryTargetPath))
+                if vS.search(queryTargetId, queryTargetPath, resultPath, searchType="similarity"):
+                    hitL.append(queryTargetId)
+                    self.assertTrue(os.access(vS.getQueryResultPath(resultPath, queryTargetId), os.R_OK))
+            vS.close()
+            mD = CcdcResultLayout.writeManifest(resultPath)
+            self.assertEqual(sorted(mD["queries"]), sorted(hitL))
+            self.assertEqual(len(CcdcHitTable.fromIndexFiles(resultPath).getRows()) > 0, len(hitL) > 0)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSimilaritySearchPermissive(self):
+        """Test case:  CCDC similarity search in permissive mode stores every match regardless of maxHits"""
+        try:
+            pL = sorted(glob.glob(os.path.join(self.__molFilePath, "*.mol2")))
+            resultPath = os.path.join(self.__workPath, "test_chem_comp_ccdc_sim_permissive")
+            # match indices are appended to - start from an empty result path
+            if os.path.exists(resultPath):
+                shutil.rmtree(resultPath)
+            vS = CcdcSearch(verbose=self.__verbose, permissiveSearch=True)
+            numHits = 0
+            for queryTargetPath in pL:
+                queryTargetId, _ = os.path.splitext(os.path.basename(queryTargetPath))
+                numHits += vS.search(queryTargetId, queryTargetPath, resultPath, maxHits=2, searchType="similarity")
+            vS.close()
+            self.assertEqual(len(CcdcHitTable.fromIndexFiles(resultPath)), numHits)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSubStructureSearchIdempotent(self):
+        """Test case:  CCDC substructure search re-run in idempotent write mode leaves unchanged output untouched"""
+        try:
+            pL = sorted(glob.glob(os.path.join(self.__molFilePath, "*.mol2")))[:3]
+            resultPath = os.path.join(self.__workPath, "test_chem_comp_ccdc_idempotent_ss")
+            manifestPath = os.path.join(resultPath, "change-manifest.json")
+            mtimeD = {}
+            for ii in range(2):
+                vS = CcdcSearch(verbose=self.__verbose, idempotentWrite=True, hashManifestPath=manifestPath if ii else None, changeManifestPath=manifestPath)
+                for queryTargetPath in pL:
+                    queryTargetId, _ = os.path.splitext(os.path.basename(queryTargetPath))
+                    vS.search(queryTargetId, queryTargetPath, resultPath, searchType="substructure")
+                vS.close()
+                mD = MarshalUtil().doImport(manifestPath, fmt="json")
+                logger.info("Run %d change statistics %r", ii + 1, vS.getChangeStatistics())
+                if ii == 0:
+                    self.assertGreater(len(mD["files"]), 0)
+                    mtimeD = {pth: os.path.getmtime(pth) for pth in mD["files"]}
+                else:
+                    self.assertEqual((mD["num_added"], mD["num_modified"], mD["num_stale"]), (0, 0, 0))
+                    self.assertEqual(mD["num_unchanged"], len(mtimeD))
+                    self.assertEqual({pth: os.path.getmtime(pth) for pth in mD["files"]}, mtimeD)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSimilaritySweep(self):
+        """Test case:  CCDC similarity search for several thresholds from a single search"""
+        try:
+            pL = glob.glob(os.path.join(self.__molFilePath, "*.mol2"))
+            resultPath = os.path.join(self.__workPath, "test_chem_comp_ccdc_sim_sweep")
+            thresholdL = [0.95, 0.9, 0.85]
+            vS = CcdcSearch(verbose=self.__verbose)
+            for queryTargetPath in pL:
+                _, fn = os.path.split(queryTargetPath)
+                queryTargetId, _ = os.path.splitext(fn)
+                rD = vS.searchSweep(queryTargetId, queryTargetPath, resultPath, thresholdL)
+                self.assertEqual(sorted(rD.keys()), sorted(thresholdL))
+                self.assertTrue(rD[0.95] <= rD[0.9] <= rD[0.85])
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSimilaritySweepRepeated(self):
+        """Test case:  a repeated similarity sweep of a query replaces the stored scores and returns the same counts"""
+        try:
+            pL = sorted(glob.glob(os.path.join(self.__molFilePath, "*.mol2")))[:3]
+            resultPath = os.path.join(self.__workPath, "test_chem_comp_ccdc_sim_sweep_repeat")
+            thresholdL = [0.95, 0.85]
+            vS = CcdcSearch(verbose=self.__verbose)
+            for queryTargetPath in pL:
+                queryTargetId, _ = os.path.splitext(os.path.basename(queryTargetPath))
+                indexPath = os.path.join(resultPath, "all-scores", queryTargetId, queryTargetId + "-index.json")
+                numL = []
+                for _ in range(2):
+                    rD = vS.searchSweep(queryTargetId, queryTargetPath, resultPath, thresholdL)
+                    numL.append((rD, len(CcdcFileUtils().readJson(indexPath) or [])))
+                self.assertEqual(numL[0], numL[1])
+            vS.close()
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSimilaritySearchProfile(self):
+        """Test case:  CCDC similarity search storing the profiles of slow queries with a report of the slowest queries"""
+        try:
+            pL = glob.glob(os.path.join(self.__molFilePath, "*.mol2"))
+            resultPath = os.path.join(self.__workPath, "test_chem_comp_ccdc_sim_profile")
+            vS = CcdcSearch(verbose=self.__verbose, profileThreshold=0.0)
+            for queryTargetPath in pL:
+                _, fn = os.path.split(queryTargetPath)
+                queryTargetId, _ = os.path.splitext(fn)
+                vS.search(queryTargetId, queryTargetPath, resultPath, searchType="similarity")
+                self.assertTrue(os.access(os.path.join(resultPath, queryTargetId, queryTargetId + "-profile.pstats"), os.R_OK))
+            reportD = CcdcProfiler.writeReport(resultPath, topN=3)
+            self.assertEqual(reportD["num_queries"], len(pL))
+            self.assertTrue(all(rD["num_atoms"] and rD["dominant_stack"] for rD in reportD["slowest"]))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSimilaritySearchBundle(self):
+        """Test case:  CCDC similarity search for each query molecule in a multi-molecule mol2 bundle"""
+        try:
+            pL = sorted(glob.glob(os.path.join(self.__molFilePath, "*.mol2")))
+            bundlePath = os.path.join(self.__workPath, "query-bundle.mol2")
+            if not os.path.exists(self.__workPath):
+                os.makedirs(self.__workPath)
+            with open(bundlePath, "w") as ofh:
+                for queryTargetPath in pL:
+                    with open(queryTargetPath, "r") as ifh:
+                        text = ifh.read()
+                    ofh.write(text if text.endswith("\n") else text + "\n")
+            resultPath = os.path.join(self.__workPath, "test_chem_comp_ccdc_sim_bundle")
+            vS = CcdcSearch(verbose=self.__verbose)
+            rD = vS.searchBundle(bundlePath, resultPath, searchType="similarity")
+            self.assertEqual(len(rD), len(pL))
+            self.assertTrue(all(numHits is not None for numHits in rD.values()))
+            for queryTargetId, numHits in rD.items():
+                if numHits:
+                    self.assertTrue(os.access(os.path.join(resultPath, queryTargetId, queryTargetId + "-index.json"), os.R_OK))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSimilaritySearchComponents(self):
+        """Test case:  CCDC similarity search for each chemical component definition in a components file without query files"""
+        try:
+            cifPath = os.path.join(HERE, "test-data", "components-test.cif")
+            resultPath = os.path.join(self.__workPath, "test_chem_comp_ccdc_sim_components")
+            vS = CcdcSearch(verbose=self.__verbose)
+            rD = vS.searchBundle(cifPath, resultPath, searchType="similarity")
+            self.assertEqual(sorted(rD), ["000", "GLC", "NH4"])
+            self.assertTrue(all(numHits is not None for numHits in rD.values()))
+            self.assertGreater(rD["GLC"], 0)
+            self.assertTrue(os.access(os.path.join(resultPath, "GLC", "GLC-index.json"), os.R_OK))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testTieredSimilaritySearch(self):
+        """Test case:  CCDC similarity search with the text search fast tier"""
+        try:
+            pL = glob.glob(os.path.join(self.__molFilePath, "*.mol2"))
+            logger.info("search list length %d", len(pL))
+            #
+            vS = CcdcSearch(verbose=self.__verbose, tieredSearch=True)
+            for queryTargetPath in pL:
+                _, fn = os.path.split(queryTargetPath)
+                queryTargetId, _ = os.path.splitext(fn)
+                logger.info("search for %r", queryTargetId)
+                vS.search(queryTargetId, queryTargetPath, self.__simResultPath, searchType="similarity")
+            tierD = vS.getTierStatistics()
+            logger.info("Searches answered by tier %r", tierD)
+            self.assertEqual(sum(tierD.values()), len(pL))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
     def testSubStructureSearch(self):
         """Test case:  CCDC substructure search"""
         try:
@@ -109,12 +341,94 @@ class CcdcSearchTests(unittest.TestCase):
             logger.exception("Failing with %s", str(e))
             self.fail()
 
+    def testSubStructureSearchDedup(self):
+        """Test case:  CCDC substructure search storing each unique match component once"""
+        try:
+            pL = glob.glob(os.path.join(self.__molFilePath, "*.mol2"))
+            resultPath = os.path.join(self.__workPath, "test_chem_comp_ccdc_dedup_ss")
+            fileU = CcdcFileUtils()
+            vS = CcdcSearch(verbose=self.__verbose, dedupComponents="exact")
+            for queryTargetPath in pL:
+                _, fn = os.path.split(queryTargetPath)
+                queryTargetId, _ = os.path.splitext(fn)
+                numHits = vS.search(queryTargetId, queryTargetPath, resultPath, searchType="substructure")
+                if not numHits:
+                    continue
+                rowL = fileU.readJson(os.path.join(resultPath, queryTargetId, queryTargetId + "-index.json"))
+                hashD = {}
+                for row in rowL:
+                    self.assertIn("component_hash", row)
+                    self.assertEqual(hashD.setdefault(row["component_hash"], row["mol2_file_path"]), row["mol2_file_path"])
+                    self.assertTrue(fileU.exists(row["mol2_file_path"]))
+                logger.info("%s stored %d unique of %d match components", queryTargetId, len(hashD), len(rowL))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSubStructureSearchLazy(self):
+        """Test case:  CCDC substructure search recording match atom indices with structure files written on demand"""
+        try:
+            pL = glob.glob(os.path.join(self.__molFilePath, "*.mol2"))
+            resultPath = os.path.join(self.__workPath, "test_chem_comp_ccdc_lazy_ss")
+            fileU = CcdcFileUtils()
+            vS = CcdcSearch(verbose=self.__verbose, lazyComponents=True)
+            for queryTargetPath in pL:
+                _, fn = os.path.split(queryTargetPath)
+                queryTargetId, _ = os.path.splitext(fn)
+                numHits = vS.search(queryTargetId, queryTargetPath, resultPath, searchType="substructure")
+                if not numHits:
+                    continue
+                indexPath = os.path.join(resultPath, queryTargetId, queryTargetId + "-index.json")
+                rowL = fileU.readJson(indexPath)
+                self.assertTrue(all("component_index" in row and row["match_atom_indices"] and not row.get("mol2_file_path") for row in rowL))
+                #
+                mol2L = vS.materialize(queryTargetId, resultPath, identifier=rowL[0]["identifier"])
+                self.assertGreaterEqual(len(mol2L), 1)
+                self.assertTrue(all(fileU.exists(fp) for fp in mol2L))
+                rowL = fileU.readJson(indexPath)
+                self.assertTrue(all(row.get("mol2_file_path") for row in rowL if row["identifier"] == rowL[0]["identifier"]))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testCombinedSearch(self):
+        """Test case:  CCDC similarity and substructure search sharing each query read"""
+        try:
+            pL = glob.glob(os.path.join(self.__molFilePath, "*.mol2"))
+            logger.info("search list length %d", len(pL))
+            #
+            vS = CcdcSearch(verbose=self.__verbose)
+            for queryTargetPath in pL:
+                _, fn = os.path.split(queryTargetPath)
+                queryTargetId, _ = os.path.splitext(fn)
+                logger.info("search for %r", queryTargetId)
+                rD = vS.searchMulti(queryTargetId, queryTargetPath, {"similarity": self.__simResultPath, "substructure": self.__ssResultPath})
+                self.assertEqual(sorted(rD.keys()), ["similarity", "substructure"])
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
 
 def suiteSearchTests():
     suiteSelect = unittest.TestSuite()
     suiteSelect.addTest(CcdcSearchTests("testSimilaritySearch"))
+    suiteSelect.addTest(CcdcSearchTests("testTieredSimilaritySearch"))
+    suiteSelect.addTest(CcdcSearchTests("testSimilaritySweep"))
+    suiteSelect.addTest(CcdcSearchTests("testSimilaritySweepRepeated"))
+    suiteSelect.addTest(CcdcSearchTests("testSimilaritySearchBundle"))
+    suiteSelect.addTest(CcdcSearchTests("testSimilaritySearchComponents"))
+    suiteSelect.addTest(CcdcSearchTests("testSimilaritySearchProfile"))
+    suiteSelect.addTest(CcdcSearchTests("testSimilaritySearchHashed"))
+    suiteSelect.addTest(CcdcSearchTests("testSimilaritySearchPermissive"))
     suiteSelect.addTest(CcdcSearchTests("testSubStructureSearch"))
+    suiteSelect.addTest(CcdcSearchTests("testSubStructureSearchDedup"))
+    suiteSelect.addTest(CcdcSearchTests("testSubStructureSearchLazy"))
+    suiteSelect.addTest(CcdcSearchTests("testSubStructureSearchIdempotent"))
     suiteSelect.addTest(CcdcSearchTests("testSmartsSearch"))
+    suiteSelect.addTest(CcdcSearchTests("testSmartsBatchSearch"))
+    suiteSelect.addTest(CcdcSearchTests("testSmartsElementScreen"))
+    suiteSelect.addTest(CcdcSearchTests("testComponentMembership"))
+    suiteSelect.addTest(CcdcSearchTests("testCombinedSearch"))
     return suiteSelect
 
 
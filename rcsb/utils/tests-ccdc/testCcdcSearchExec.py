@@ -18,7 +18,9 @@ __email__ = "john.westbrook@rcsb.org"
 __license__ = "Apache 2.0"
 
 import glob
+import json
 import logging
+import subprocess
 import unittest
 import time
 import os
@@ -88,10 +90,34 @@ class CcdcSearchExecTests(unittest.TestCase):
             logger.exception("Failing with %s", str(e))
             self.fail()
 
+    def testSearchExecStdin(self):
+        """Test case:  search cli streaming JSON-lines requests from stdin"""
+        try:
+            mL = sorted(glob.glob(os.path.join(self.__molFileDirPath, "*.mol2")))
+            requestL = [json.dumps({"id": "Q%03d" % ii, "path": fp, "search_type": "substructure"}) for ii, fp in enumerate(mL)]
+            requestL.append(json.dumps({"id": "P001", "smarts": "c1ccccc1"}))
+            cmdPath = os.path.join(TOPDIR, "rcsb", "utils", "ccdc", "CcdcSearchExec.py")
+            pr = subprocess.run(
+                [self.__pythonBinPath, cmdPath, "--stdin", "--result_path", self.__ssResultPath, "--csdhome", self.__csdHome],
+                input="\n".join(requestL) + "\n",
+                stdout=subprocess.PIPE,
+                universal_newlines=True,
+                timeout=600,
+                check=True,
+            )
+            rL = [json.loads(line) for line in pr.stdout.splitlines()]
+            logger.info("Streamed results %r", rL)
+            self.assertEqual([rD["id"] for rD in rL], [json.loads(req)["id"] for req in requestL])
+            self.assertTrue(all(rD["status"] == "ok" for rD in rL))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
 
 def suiteSearchExecTests():
     suiteSelect = unittest.TestSuite()
     suiteSelect.addTest(CcdcSearchExecTests("testSearchExec"))
+    suiteSelect.addTest(CcdcSearchExecTests("testSearchExecStdin"))
     return suiteSelect
 
 
@@ -26,6 +26,7 @@ import platform
 import resource
 
 from rcsb.utils.ccdc.CcdcSearchExecMp import CcdcSearchExecMp
+from rcsb.utils.io.MarshalUtil import MarshalUtil
 
 from rcsb.utils.ccdc import __version__
 
@@ -72,10 +73,43 @@ class CcdcSearchMpTests(unittest.TestCase):
             logger.exception("Failing with %s", str(e))
             self.fail()
 
+    def testSubStructureSearchExecMpProgress(self):
+        """Test case:  CCDC substructure search with run progress aggregated across workers"""
+        try:
+            pL = glob.glob(os.path.join(self.__molFilePath, "*.mol2"), recursive=True)
+            csmp = CcdcSearchExecMp(pythonRootPath=self.__pythonRootPath, csdHome=self.__csdHome)
+            statusPath = os.path.join(self.__ssResultPath, "search-progress.json")
+            csmp.runSearch(pL, self.__ssResultPath, searchType="substructure", numProc=2, chunkSize=2, statusPath=statusPath, statusInterval=1.0)
+            statusD = MarshalUtil().doImport(statusPath, fmt="json")
+            logger.info("Final status %r", {ky: statusD[ky] for ky in ["num_completed", "num_matched", "queries_per_second", "num_workers"]})
+            self.assertEqual(statusD["state"], "completed")
+            self.assertEqual(statusD["num_completed"], len(pL))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSimilaritySearchExecMpAuto(self):
+        """Test case:  CCDC similarity search with the number of processes and chunk size from a calibration"""
+        try:
+            pL = glob.glob(os.path.join(self.__molFilePath, "*.mol2"), recursive=True)
+            csmp = CcdcSearchExecMp(pythonRootPath=self.__pythonRootPath, csdHome=self.__csdHome)
+            csmp.runSearch(pL, self.__simResultPath, searchType="similarity", numProc="auto", chunkSize="auto", maxProc=4, statusInterval=1.0)
+            tuneD = MarshalUtil().doImport(os.path.join(self.__simResultPath, "search-tuning.json"), fmt="json")
+            logger.info("Tuning %r", {ky: tuneD[ky] for ky in ["num_proc", "chunk_size", "reason", "num_sampled"]})
+            self.assertGreaterEqual(tuneD["num_proc"], 1)
+            self.assertGreaterEqual(tuneD["chunk_size"], 1)
+            statusD = MarshalUtil().doImport(os.path.join(self.__simResultPath, "search-progress.json"), fmt="json")
+            self.assertEqual(statusD["num_completed"], len(pL))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
 
 def suiteSearchTests():
     suiteSelect = unittest.TestSuite()
     suiteSelect.addTest(CcdcSearchMpTests("testSubStructureSearchExecMp"))
+    suiteSelect.addTest(CcdcSearchMpTests("testSubStructureSearchExecMpProgress"))
+    suiteSelect.addTest(CcdcSearchMpTests("testSimilaritySearchExecMpAuto"))
     return suiteSelect
 
 
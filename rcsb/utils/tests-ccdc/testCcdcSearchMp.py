@@ -0,0 +1,163 @@
+##
+#
+# File:    testCcdcSearchMp.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for chemical component search (in-process spawn pool) against the CCDC local Python API -
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import glob
+import logging
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcResultStore import CcdcResultStore
+from rcsb.utils.ccdc.CcdcSearchMp import CcdcSearchMp
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class CcdcSearchMpTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output")
+        self.__dataPath = os.path.join(HERE, "test-data")
+        self.__cachePath = os.path.join(HERE, "test-output", "CACHE")
+        self.__molFilePath = os.path.join(self.__dataPath, "molfiles")
+        self.__pythonRootPath = os.path.join(os.environ["CSD_PYTHON_ROOT_PATH"])
+        self.__csdHome = os.environ["CSDHOME"]
+        #
+        self.__simResultPath = os.path.join(self.__workPath, "test_chem_comp_ccdc_sim_mp")
+        self.__ssResultPath = os.path.join(self.__workPath, "test_chem_comp_ccdc_ss_mp")
+        #
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testSubStructureSearchMp(self):
+        """Test case:  CCDC substructure search (spawn pool)"""
+        try:
+            pL = glob.glob(os.path.join(self.__molFilePath, "*.mol2"), recursive=True)
+            logger.info("search list length %d", len(pL))
+            #
+            csmp = CcdcSearchMp(csdHome=self.__csdHome, pythonRootPath=self.__pythonRootPath)
+            rL = csmp.runSearch(pL, self.__ssResultPath, searchType="substructure", numProc=2, chunkSize=2)
+            self.assertGreaterEqual(len(rL), 1)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSubStructureSearchMpRecycle(self):
+        """Test case:  CCDC substructure search (spawn pool) recycling workers by query count and memory ceiling"""
+        try:
+            pL = glob.glob(os.path.join(self.__molFilePath, "*.mol2"), recursive=True)
+            logger.info("search list length %d", len(pL))
+            #
+            csmp = CcdcSearchMp(csdHome=self.__csdHome, pythonRootPath=self.__pythonRootPath)
+            summaryPath = os.path.join(self.__ssResultPath, "search-run-summary.json")
+            rL = csmp.runSearch(pL, self.__ssResultPath, searchType="substructure", numProc=2, chunkSize=2, maxQueriesPerWorker=2, maxWorkerRssMb=4000, summaryPath=summaryPath)
+            self.assertGreaterEqual(len(rL), 1)
+            summaryD = MarshalUtil().doImport(summaryPath, fmt="json")
+            self.assertEqual(len(summaryD["queries"]), len(pL))
+            self.assertTrue(all(qD["rss_mb"] for qD in summaryD["queries"]))
+            self.assertGreaterEqual(len(summaryD["workers"]), len(pL) // 2)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSimilaritySearchMp(self):
+        """Test case:  CCDC similarity search (forkserver pool)"""
+        try:
+            pL = glob.glob(os.path.join(self.__molFilePath, "*.mol2"), recursive=True)
+            logger.info("search list length %d", len(pL))
+            #
+            csmp = CcdcSearchMp(csdHome=self.__csdHome, pythonRootPath=self.__pythonRootPath, startMethod="forkserver")
+            rL = csmp.runSearch(pL, self.__simResultPath, searchType="similarity", numProc=2, chunkSize=1)
+            self.assertGreaterEqual(len(rL), 1)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSimilaritySearchMpBundle(self):
+        """Test case:  CCDC similarity search (spawn pool) for byte ranges of a multi-molecule mol2 bundle"""
+        try:
+            pL = sorted(glob.glob(os.path.join(self.__molFilePath, "*.mol2")))
+            bundlePath = os.path.join(self.__workPath, "query-bundle-mp.mol2")
+            if not os.path.exists(self.__workPath):
+                os.makedirs(self.__workPath)
+            with open(bundlePath, "w") as ofh:
+                for queryTargetPath in pL:
+                    with open(queryTargetPath, "r") as ifh:
+                        text = ifh.read()
+                    ofh.write(text if text.endswith("\n") else text + "\n")
+            logger.info("bundle length %d", len(pL))
+            #
+            csmp = CcdcSearchMp(csdHome=self.__csdHome, pythonRootPath=self.__pythonRootPath)
+            summaryPath = os.path.join(self.__simResultPath, "search-bundle-summary.json")
+            rL = csmp.runSearch(None, self.__simResultPath, searchType="similarity", numProc=2, chunkSize=2, summaryPath=summaryPath, bundlePath=bundlePath)
+            self.assertGreaterEqual(len(rL), 1)
+            summaryD = MarshalUtil().doImport(summaryPath, fmt="json")
+            self.assertEqual(len(summaryD["queries"]), len(pL))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testSimilaritySearchMpResultStore(self):
+        """Test case:  CCDC similarity search (spawn pool) with matches inserted in the result store as each query completes"""
+        try:
+            pL = glob.glob(os.path.join(self.__molFilePath, "*.mol2"), recursive=True)
+            storePath = os.path.join(self.__simResultPath, "search-results.sqlite")
+            summaryPath = os.path.join(self.__simResultPath, "search-store-summary.json")
+            csmp = CcdcSearchMp(csdHome=self.__csdHome, pythonRootPath=self.__pythonRootPath)
+            csmp.runSearch(pL, self.__simResultPath, searchType="similarity", numProc=2, chunkSize=2, summaryPath=summaryPath, resultStorePath=storePath)
+            summaryD = MarshalUtil().doImport(summaryPath, fmt="json")
+            countD = CcdcResultStore(storePath).getQueryCounts(matchType="similarity")
+            for qD in summaryD["queries"]:
+                if not qD["error"]:
+                    self.assertIn(qD["query_id"], countD)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteSearchTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcSearchMpTests("testSubStructureSearchMp"))
+    suiteSelect.addTest(CcdcSearchMpTests("testSubStructureSearchMpRecycle"))
+    suiteSelect.addTest(CcdcSearchMpTests("testSimilaritySearchMp"))
+    suiteSelect.addTest(CcdcSearchMpTests("testSimilaritySearchMpBundle"))
+    suiteSelect.addTest(CcdcSearchMpTests("testSimilaritySearchMpResultStore"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteSearchTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
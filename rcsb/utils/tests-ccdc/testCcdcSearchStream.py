@@ -0,0 +1,147 @@
+##
+#
+# File:    testCcdcSearchStream.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for the streaming JSON-lines search request/response protocol -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import io
+import json
+import logging
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+import subprocess
+import sys
+
+from rcsb.utils.ccdc.CcdcSearchStream import CcdcSearchStream
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class _RecordingSearcher(object):
+    """Searcher recording each call and returning the length of the query identifier as the number of matches."""
+
+    def __init__(self):
+        self.callL = []
+        self.numFlush = 0
+
+    def search(self, queryTargetId, queryTargetPath, resultPath, **kwargs):
+        self.callL.append(("search", queryTargetId, queryTargetPath, kwargs))
+        return len(queryTargetId)
+
+    def searchRecord(self, queryTargetId, record, resultPath, **kwargs):
+        self.callL.append(("searchRecord", queryTargetId, record, kwargs))
+        return 0
+
+    def searchSmarts(self, queryTargetId, smarts, resultPath, **kwargs):
+        self.callL.append(("searchSmarts", queryTargetId, smarts, kwargs))
+        if smarts == "fail":
+            raise RuntimeError("bad pattern")
+        return len(queryTargetId)
+
+    def flush(self):
+        self.numFlush += 1
+
+
+class CcdcSearchStreamTests(unittest.TestCase):
+    def setUp(self):
+        self.__molFilePath = os.path.join(HERE, "test-data", "molfiles", "GLC.mol2")
+        self.__resultPath = os.path.join(HERE, "test-output", "test_ccdc_search_stream")
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testRequestResponse(self):
+        """Test case:  a result line is written for each request in request order with invalid requests reported as errors"""
+        try:
+            requestL = [
+                json.dumps({"id": "GLC", "path": self.__molFilePath, "options": {"max_hits": 5}}),
+                "",
+                json.dumps({"id": "Q1", "record": "Q1\n  test\n", "format": "sdf", "search_type": "substructure"}),
+                json.dumps({"id": "P12", "smarts": "c1ccccc1", "options": {"suppress_metals": True}}),
+                "{not json",
+                json.dumps({"id": "X1", "path": self.__molFilePath, "smarts": "CC"}),
+                json.dumps({"id": "X2", "path": self.__molFilePath, "search_type": "exact"}),
+                json.dumps({"id": "X3", "path": self.__molFilePath, "options": {"max_hit": 5}}),
+                json.dumps({"id": "X4", "path": os.path.join(self.__resultPath, "missing.mol2")}),
+                json.dumps({"path": self.__molFilePath}),
+                json.dumps({"id": "P2", "smarts": "fail"}),
+            ]
+            sR = _RecordingSearcher()
+            ofh = io.StringIO()
+            sD = CcdcSearchStream(sR, self.__resultPath, verbose=False).run(io.StringIO("\n".join(requestL) + "\n"), ofh)
+            rL = [json.loads(line) for line in ofh.getvalue().splitlines()]
+            logger.info("Stream summary %r", sD)
+            self.assertEqual(sD, {"num_requests": 10, "num_errors": 7, "num_matched": 2})
+            self.assertEqual([rD["id"] for rD in rL], ["GLC", "Q1", "P12", None, "X1", "X2", "X3", "X4", None, "P2"])
+            self.assertEqual([rD["status"] for rD in rL], ["ok"] * 3 + ["error"] * 7)
+            self.assertEqual(rL[0]["num_hits"], 3)
+            self.assertEqual(rL[0]["result_path"], os.path.join(self.__resultPath, "GLC"))
+            self.assertIsNone(rL[1]["result_path"])
+            self.assertEqual(rL[2]["search_type"], "substructure")
+            self.assertEqual(rL[3]["line"], 5)
+            self.assertEqual(rL[-1]["error"], "bad pattern")
+            #
+            self.assertEqual([cT[0] for cT in sR.callL], ["search", "searchRecord", "searchSmarts", "searchSmarts"])
+            self.assertEqual(sR.callL[0][3], {"normalizeFlag": True, "maxHits": 5, "searchType": "similarity", "suppressMetals": False})
+            self.assertEqual(sR.callL[1][3]["fmt"], "sdf")
+            self.assertEqual(sR.callL[2][3], {"maxHits": 50, "suppressMetals": True})
+            self.assertEqual(sR.numFlush, 3)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testStdinSearchTypeList(self):
+        """Test case:  the CLI streaming mode rejects a list of default search types"""
+        try:
+            env = dict(os.environ, PYTHONPATH=TOPDIR)
+            cmdL = [sys.executable, "-m", "rcsb.utils.ccdc.CcdcSearchExec", "--stdin", "--search_type", "similarity,substructure", "--result_path", self.__resultPath]
+            cmdL.extend(["--csdhome", HERE, "--python_lib_path", HERE])
+            pr = subprocess.run(cmdL, input="", stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, env=env, timeout=600, check=False)
+            self.assertEqual(pr.returncode, 1)
+            self.assertIn("--stdin accepts a single --search_type", pr.stderr)
+            self.assertEqual(pr.stdout, "")
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteSearchStreamTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcSearchStreamTests("testRequestResponse"))
+    suiteSelect.addTest(CcdcSearchStreamTests("testStdinSearchTypeList"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteSearchStreamTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
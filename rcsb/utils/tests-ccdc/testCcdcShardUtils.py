@@ -0,0 +1,119 @@
+##
+#
+# File:    testCcdcShardUtils.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for shard planning and merging of ccdc_search_cli array jobs -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import glob
+import logging
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcShardUtils import CcdcShardUtils
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class CcdcShardUtilsTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output")
+        self.__dataPath = os.path.join(HERE, "test-data")
+        self.__molFilePath = os.path.join(self.__dataPath, "molfiles-xyz")
+        self.__resultPath = os.path.join(self.__workPath, "test_chem_comp_ccdc_shard")
+        self.__molListPath = os.path.join(self.__workPath, "shard_query_list.txt")
+        self.__mU = MarshalUtil()
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testPlanAndMerge(self):
+        """Test case:  plan shards, simulate partial shard output and merge"""
+        try:
+            pL = sorted(glob.glob(os.path.join(self.__molFilePath, "*.mol2")))
+            ok = self.__mU.doExport(self.__molListPath, pL, fmt="list")
+            self.assertTrue(ok)
+            #
+            shU = CcdcShardUtils()
+            manifestD = shU.plan(self.__molListPath, self.__resultPath, 3, searchType="substructure")
+            self.assertEqual(manifestD["num_shards"], 3)
+            self.assertEqual(manifestD["num_queries"], len(pL))
+            # shards are contiguous and cover the planned list
+            planL = self.__mU.doImport(manifestD["plan_list_path"], fmt="list")
+            self.assertEqual(sorted(planL), pL)
+            nextRecord = 1
+            for sD in manifestD["shards"]:
+                self.assertEqual(sD["start_record"], nextRecord)
+                nextRecord = sD["end_record"] + 1
+            self.assertEqual(nextRecord, len(pL) + 1)
+            costL = [sD["estimated_cost"] for sD in manifestD["shards"]]
+            self.assertLessEqual(max(costL) - min(costL), max(shU.estimateCost(pth) for pth in pL))
+            #
+            # Simulate the output of the first two shards
+            manifestPath = os.path.join(self.__resultPath, "shards", "shard-manifest.json")
+            for sD in manifestD["shards"]:
+                if os.path.exists(sD["hit_list_path"]):
+                    os.remove(sD["hit_list_path"])
+            for sD in manifestD["shards"][:2]:
+                queryTargetId = shU.getQueryId(planL[sD["start_record"] - 1])
+                fp = os.path.join(self.__resultPath, queryTargetId, queryTargetId + "-index.json")
+                self.__mU.doExport(fp, [{"target_id": queryTargetId, "identifier": "ABCDEF01", "match_number": 1}], fmt="json", indent=3)
+                self.__mU.doExport(sD["hit_list_path"], [queryTargetId], fmt="list")
+            #
+            summaryD = shU.merge(manifestPath)
+            self.assertFalse(summaryD["complete"])
+            self.assertEqual(summaryD["missing_shards"], [3])
+            self.assertEqual(summaryD["num_queries_matched"], 2)
+            self.assertEqual(summaryD["num_queries_missing"], manifestD["shards"][2]["num_queries"])
+            for qD in summaryD["queries"].values():
+                self.assertEqual(qD["identifiers"], ["ABCDEF01"])
+            #
+            # Complete the missing shard
+            self.__mU.doExport(manifestD["shards"][2]["hit_list_path"], [], fmt="list")
+            summaryD = shU.merge(manifestPath)
+            self.assertTrue(summaryD["complete"])
+            self.assertEqual(summaryD["missing_shards_array_spec"], "")
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteShardTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcShardUtilsTests("testPlanAndMerge"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteShardTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,133 @@
+##
+#
+# File:    testCcdcStartup.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Startup benchmarks - module import and list handling without the ccdc API and first query latency -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import glob
+import json
+import logging
+import subprocess
+import sys
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.io.MarshalUtil import MarshalUtil
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class CcdcStartupTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output", "test_ccdc_startup")
+        self.__molFilePath = os.path.join(HERE, "test-data", "molfiles")
+        self.__queryListFilePath = os.path.join(self.__workPath, "query_list.txt")
+        MarshalUtil().doExport(self.__queryListFilePath, sorted(glob.glob(os.path.join(self.__molFilePath, "*.mol2"))), fmt="list")
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def __runScript(self, lineList):
+        """Run the script in a fresh interpreter and return the JSON object printed on its last output line."""
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([TOPDIR] + sys.path))
+        pr = subprocess.run([sys.executable, "-c", "\n".join(lineList)], stdout=subprocess.PIPE, universal_newlines=True, env=env, timeout=600, check=True)
+        return json.loads(pr.stdout.strip().splitlines()[-1])
+
+    def testImportWithoutCcdc(self):
+        """Test case:  search, analysis, exec and planning modules import and read query lists without importing ccdc"""
+        try:
+            rD = self.__runScript(
+                [
+                    "import json, sys, time",
+                    "t0 = time.time()",
+                    "from rcsb.utils.ccdc.CcdcSearch import CcdcSearch",
+                    "from rcsb.utils.ccdc.CcdcGeomAnal import CcdcGeomAnal",
+                    "import rcsb.utils.ccdc.CcdcSearchExec",
+                    "from rcsb.utils.ccdc.CcdcShardUtils import CcdcShardUtils",
+                    "t1 = time.time()",
+                    "pL = CcdcSearch().getList(%r, startRecord=1, endRecord=2)" % self.__queryListFilePath,
+                    "cga = CcdcGeomAnal()",
+                    "t2 = time.time()",
+                    "ccdcL = [ky for ky in sys.modules if ky == 'ccdc' or ky.startswith('ccdc.')]",
+                    "print(json.dumps({'import_seconds': t1 - t0, 'list_seconds': t2 - t1, 'num_paths': len(pL), 'ccdc_modules': ccdcL}))",
+                ]
+            )
+            logger.info("Imported modules in %.4f seconds and read the query list in %.4f seconds", rD["import_seconds"], rD["list_seconds"])
+            self.assertEqual(rD["num_paths"], 2)
+            self.assertEqual(rD["ccdc_modules"], [])
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testFirstQueryLatency(self):
+        """Test case:  benchmark the module import, ccdc API import with the first query and a following query"""
+        try:
+            pL = sorted(glob.glob(os.path.join(self.__molFilePath, "*.mol2")))[:2]
+            resultPath = os.path.join(self.__workPath, "ccdc_sim")
+            rD = self.__runScript(
+                [
+                    "import json, os, sys, time",
+                    "t0 = time.time()",
+                    "from rcsb.utils.ccdc.CcdcSearch import CcdcSearch",
+                    "vS = CcdcSearch(verbose=False)",
+                    "t1 = time.time()",
+                    "tL = []",
+                    "for fp in %r:" % pL,
+                    "    ts = time.time()",
+                    "    vS.search(os.path.splitext(os.path.basename(fp))[0], fp, %r, searchType='similarity')" % resultPath,
+                    "    tL.append(time.time() - ts)",
+                    "print(json.dumps({'import_seconds': t1 - t0, 'first_query_seconds': tL[0], 'next_query_seconds': tL[1]}))",
+                ]
+            )
+            logger.info(
+                "Module import %.4f seconds first query (with ccdc import) %.4f seconds next query %.4f seconds",
+                rD["import_seconds"],
+                rD["first_query_seconds"],
+                rD["next_query_seconds"],
+            )
+            self.assertLess(rD["import_seconds"], rD["first_query_seconds"])
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteStartupTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcStartupTests("testImportWithoutCcdc"))
+    suiteSelect.addTest(CcdcStartupTests("testFirstQueryLatency"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteStartupTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,150 @@
+##
+#
+# File:    testCcdcWorkerPool.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updated:
+#
+##
+"""
+Test cases for the worker pool with memory sampling and worker recycling -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import unittest
+import time
+import os
+import os.path
+import platform
+import resource
+
+from rcsb.utils.ccdc.CcdcWorkerPool import CcdcWorkerPool
+from rcsb.utils.ccdc import __version__
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Memory retained by the worker process across tasks (simulates RSS growth)
+_RETAINED = []
+
+
+def _growTask(sizeMb):
+    _RETAINED.append(bytearray(int(sizeMb * 1048576)))
+    return os.getpid()
+
+
+def _getTaskWeight(sizeList):
+    return len(sizeList)
+
+
+def _growListTask(sizeList):
+    return [_growTask(sizeMb) for sizeMb in sizeList][-1]
+
+
+def _crashOnceTask(markerPath):
+    if not os.path.exists(markerPath):
+        with open(markerPath, "w") as ofh:
+            ofh.write("crashed")
+        os._exit(1)  # pylint: disable=protected-access
+    return os.getpid()
+
+
+class CcdcWorkerPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = os.path.join(HERE, "test-output")
+        if not os.path.exists(self.__workPath):
+            os.makedirs(self.__workPath)
+        self.__startTime = time.time()
+        logger.info("Starting %s (%s) at %s", self.id(), __version__, time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        unitS = "MB" if platform.system() == "Darwin" else "GB"
+        rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info("Maximum resident memory size %.4f %s", rusageMax / 10 ** 6, unitS)
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testRecycleByTaskCount(self):
+        """Test case:  workers are recycled after a fixed number of tasks without losing work"""
+        try:
+            wp = CcdcWorkerPool(_growTask, numProc=2, maxTasksPerWorker=3)
+            rL = list(wp.run([1] * 10, chunkSize=2))
+            self.assertEqual(sorted(r[0] for r in rL), list(range(10)))
+            self.assertTrue(all(r[2] is None for r in rL))
+            wL = wp.getWorkerStatistics()
+            self.assertGreaterEqual(len(wL), 4)
+            self.assertTrue(all(wD["num_tasks"] <= 3 for wD in wL))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testRecycleByTaskWeight(self):
+        """Test case:  workers are recycled after a number of work units counted over multi-unit tasks"""
+        try:
+            wp = CcdcWorkerPool(_growListTask, numProc=1, maxTasksPerWorker=4, weightFunc=_getTaskWeight)
+            rL = list(wp.run([[1, 1, 1]] * 4, chunkSize=1))
+            self.assertEqual(sorted(r[0] for r in rL), list(range(4)))
+            self.assertTrue(all(r[2] is None for r in rL))
+            # each worker is retired after its second task (6 units)
+            wL = wp.getWorkerStatistics()
+            self.assertEqual(len(wL), 2)
+            self.assertTrue(all(wD["num_tasks"] == 2 for wD in wL))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testRecycleByMemory(self):
+        """Test case:  workers are recycled when crossing the memory ceiling"""
+        try:
+            wp = CcdcWorkerPool(_growTask, numProc=1, maxRssMb=60.0)
+            rL = list(wp.run([25] * 6, chunkSize=6))
+            self.assertEqual(sorted(r[0] for r in rL), list(range(6)))
+            self.assertTrue(all(r[3]["rss_mb"] > 0 for r in rL))
+            wL = wp.getWorkerStatistics()
+            logger.info("Worker statistics %r", wL)
+            self.assertGreaterEqual(len(wL), 2)
+            self.assertTrue(any(wD["exit_reason"].startswith("rss") for wD in wL))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testRedispatchOnWorkerExit(self):
+        """Test case:  work held by a worker that exits unexpectedly is re-dispatched"""
+        try:
+            markerPath = os.path.join(self.__workPath, "worker-crash-marker.txt")
+            if os.path.exists(markerPath):
+                os.remove(markerPath)
+            wp = CcdcWorkerPool(_crashOnceTask, numProc=1)
+            rL = list(wp.run([markerPath] * 3, chunkSize=3))
+            self.assertEqual(sorted(r[0] for r in rL), list(range(3)))
+            self.assertTrue(all(r[2] is None for r in rL))
+            self.assertEqual(len(wp.getWorkerStatistics()), 2)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteWorkerPoolTests():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(CcdcWorkerPoolTests("testRecycleByTaskCount"))
+    suiteSelect.addTest(CcdcWorkerPoolTests("testRecycleByTaskWeight"))
+    suiteSelect.addTest(CcdcWorkerPoolTests("testRecycleByMemory"))
+    suiteSelect.addTest(CcdcWorkerPoolTests("testRedispatchOnWorkerExit"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteWorkerPoolTests()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
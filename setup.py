@@ -41,14 +41,16 @@ setup(
     entry_points={
         "console_scripts": [
             "ccdc_search_cli=rcsb.utils.ccdc.CcdcSearchExec:main",
+            "ccdc_shard_cli=rcsb.utils.ccdc.CcdcShardExec:main",
+            "ccdc_job_cli=rcsb.utils.ccdc.CcdcJobExec:main",
         ]
     },
     #  The following is somewhat flakey --
     dependency_links=[],
     install_requires=[
         "mmcif >= 0.61",
+        "numpy",
         "rcsb.utils.io >= 0.99",
-        "rcsb.utils.multiproc >= 0.18",
     ],
     packages=find_packages(exclude=["rcsb.mock-data", "rcsb.utils.tests-ccdc", "tests.*"]),
     package_data={
@@ -60,7 +62,7 @@ setup(
     tests_require=["tox"],
     #
     # Not configured ...
-    extras_require={"dev": ["check-manifest"], "test": ["coverage"]},
+    extras_require={"dev": ["check-manifest"], "test": ["coverage"], "zstd": ["zstandard"]},
     # Added for
     command_options={"build_sphinx": {"project": ("setup.py", thisPackage), "version": ("setup.py", version), "release": ("setup.py", version)}},
     # This setting for namespace package support -